@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse, Response
+
+from app.api.deps import verify_api_key
+from app.utils.profiling import CapturedProfile, profile_buffer
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(verify_api_key)])
+
+SORT_KEYS = {"cumulative", "tottime", "calls", "ncalls", "time"}
+
+
+def _get_profile(profile_id: str) -> CapturedProfile:
+    profile = profile_buffer.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found (it may have been rotated out)",
+        )
+    return profile
+
+
+@router.get("/profiles")
+async def list_profiles():
+    return {"profiles": profile_buffer.list()}
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def profile_report(
+    profile_id: str,
+    sort: str = Query("cumulative"),
+    limit: int = Query(40, ge=1, le=500),
+):
+    if sort not in SORT_KEYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"sort must be one of {sorted(SORT_KEYS)}",
+        )
+    return _get_profile(profile_id).report(sort=sort, limit=limit)
+
+
+@router.get("/profiles/{profile_id}/download")
+async def download_profile(profile_id: str):
+    profile = _get_profile(profile_id)
+    return Response(
+        profile.dump(),
+        media_type="application/octet-stream",
+        headers={
+            "Content-Disposition": f'attachment; filename="{profile.id}.prof"'
+        },
+    )
+
+
+@router.delete("/profiles")
+async def clear_profiles():
+    return {"removed": profile_buffer.clear()}
@@ -1,16 +1,41 @@
 import hmac
+from typing import Optional
+
 from fastapi import Header, HTTPException, status
 from app.config import API_KEY
+from app.core.admission import api_key_limiter
+from app.utils.metrics import ADMISSION
+
+
+def is_valid_api_key(value: Optional[str]) -> bool:
+    return bool(API_KEY and value) and hmac.compare_digest(value, API_KEY)
 
 
-def verify_api_key(x_api_key: str = Header(...)):
+async def verify_api_key(x_api_key: str = Header(...)):
     if not API_KEY:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="API key not configured on server",
         )
-    if not hmac.compare_digest(x_api_key, API_KEY):
+    if not is_valid_api_key(x_api_key):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key",
         )
+
+
+def charge_api_key(x_api_key: str, cost: int = 1) -> None:
+    """Take `cost` tokens from the key's bucket or raise 429."""
+    if not api_key_limiter.allow(x_api_key, cost):
+        ADMISSION.inc(decision="rate_limited_key")
+        retry_after = api_key_limiter.retry_after(cost)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(max(1, round(retry_after)))},
+        )
+
+
+async def rate_limit_api_key(x_api_key: str = Header(...)):
+    """Per-key token bucket; use after verify_api_key."""
+    charge_api_key(x_api_key)
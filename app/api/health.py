@@ -1,11 +1,43 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from datetime import datetime
 
+from app.api.deps import verify_api_key
+from app.api.honeypot import conversation_agent, conversation_summarizer
+from app.llm.providers.circuit_breaker import breaker_states
+from app.llm.providers.local_llm import batcher_stats
+
 router = APIRouter()
 
 @router.get("/health")
-def health_check():
+async def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat()
     }
+
+
+@router.get("/health/reply-cache")
+async def reply_cache_stats(_: None = Depends(verify_api_key)):
+    cache = conversation_agent.reply_cache
+    return {
+        "enabled": cache is not None,
+        **(cache.stats() if cache is not None else {}),
+    }
+
+
+@router.get("/health/llm")
+async def llm_provider_stats(_: None = Depends(verify_api_key)):
+    generator = conversation_agent.generate_text
+    streamer = conversation_agent.stream_text
+    return {
+        "admission": conversation_agent.admission.stats(),
+        "circuits": breaker_states(),
+        "hedging": generator.stats() if hasattr(generator, "stats") else None,
+        "streamHedging": streamer.stats() if hasattr(streamer, "stats") else None,
+        "localBatching": batcher_stats(),
+        "summaries": (
+            conversation_summarizer.stats()
+            if conversation_summarizer is not None
+            else None
+        ),
+    }
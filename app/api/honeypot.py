@@ -1,64 +1,181 @@
+import asyncio
+import json
 import logging
-from fastapi import APIRouter, Depends
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from fastapi import APIRouter, BackgroundTasks, Depends, Header
+from fastapi.responses import StreamingResponse
 from datetime import datetime
+from pydantic import ValidationError
 
-from app.storage.models import HoneypotRequest, HoneypotResponse, Message
-from app.api.deps import verify_api_key
+from app.storage.models import (
+    HoneypotBatchItemResult,
+    HoneypotBatchRequest,
+    HoneypotBatchResponse,
+    HoneypotRequest,
+    HoneypotResponse,
+    Message,
+    SessionState,
+)
+from app.api.deps import charge_api_key, rate_limit_api_key, verify_api_key
+from app.config import (
+    BATCH_MAX_CONCURRENCY,
+    SCAN_MAX_MESSAGE_CHARS,
+    SCRIPT_INDEX_ENABLED,
+    SUMMARY_ENABLED,
+)
+from app.core.admission import session_limiter
+from app.core.ioc_index import ioc_index
 from app.core.session_manager import session_manager
-from app.core.scam_detector import ScamDetector
+from app.core.scam_detector import build_scam_detector
+from app.core.script_index import Script, script_index as default_script_index
 from app.core.persona import PersonaManager
 from app.llm.chains.conversation_chain import ConversationAgent
 from app.core.intelligence import IntelligenceExtractor
-from app.services.callback import send_final_result
+from app.llm.summarizer import ConversationSummarizer
+from app.services.callback import build_payload
+from app.services.outbox import get_outbox
+from app.utils.metrics import ADMISSION, STAGE_SECONDS, TURN_SECONDS
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-scam_detector = ScamDetector()
-conversation_agent = ConversationAgent()
+scam_detector = build_scam_detector()
+script_index = default_script_index if SCRIPT_INDEX_ENABLED else None
+conversation_agent = ConversationAgent(script_index=script_index)
 intelligence_extractor = IntelligenceExtractor()
+conversation_summarizer = (
+    ConversationSummarizer(
+        session_manager.store, conversation_agent.generate_background_text
+    )
+    if SUMMARY_ENABLED
+    else None
+)
 
 
-@router.post("/honeypot", response_model=HoneypotResponse)
-def honeypot_endpoint(
+Verdict = Tuple[bool, List[str], float]
+
+
+async def _begin_turn(
     payload: HoneypotRequest,
-    _: None = Depends(verify_api_key),
-):
-    session = session_manager.get_or_create(payload.sessionId)
+    verdict: Optional[Verdict] = None,
+) -> Tuple[SessionState, Optional[Script]]:
+    """
+    Load the session, record the scammer message, match it against
+    known scripts and run detection, unless `verdict` was already
+    computed for this message.
+    """
+    with STAGE_SECONDS.time(stage="session"):
+        session = await session_manager.get_or_create(payload.sessionId)
 
-    # ── Add incoming scammer message to server-side history
-    session_manager.add_message(session, payload.message)
+        # ── Add incoming scammer message to server-side history
+        await session_manager.add_message(session, payload.message)
 
-    # ── Scam detection (every turn, until scam is confirmed)
-    if not session.scamDetected:
-        is_scam, categories, confidence = scam_detector.detect_scam(
-            payload.message.text
+    # ── Intelligence extraction from the scammer message, up front so
+    # that a reply that never completes cannot lose it
+    with STAGE_SECONDS.time(stage="extract"):
+        session.extractedIntelligence = intelligence_extractor.update(
+            session, [payload.message], ioc_index
         )
+
+    # Detection and fingerprinting look at a bounded prefix only
+    text = payload.message.text[:SCAN_MAX_MESSAGE_CHARS]
+
+    script = None
+    if script_index is not None:
+        with STAGE_SECONDS.time(stage="fingerprint"):
+            script = script_index.observe(text)
+
+    # ── Scam detection (every turn, until scam is confirmed); a known
+    # script reuses a positive verdict. A negative one is never reused:
+    # a variant of a benign message may add the link that makes it a scam.
+    if not session.scamDetected:
+        if script is not None and script.verdict is not None:
+            is_scam, categories, confidence = script.verdict
+            categories = list(categories)
+        else:
+            if verdict is None:
+                with STAGE_SECONDS.time(stage="detect"):
+                    verdict = scam_detector.detect_scam(text)
+            is_scam, categories, confidence = verdict
+            if script is not None and is_scam:
+                script.verdict = (is_scam, list(categories), confidence)
         if is_scam:
             persona_key = PersonaManager.select_persona(categories)
             session_manager.set_scam(
                 session, is_scam, categories, confidence, persona=persona_key
             )
 
-    # ── Generate agent reply
-    reply_text = conversation_agent.generate_response({
-        "conversationHistory": [m.dict() for m in session.conversationHistory],
+    return session, script
+
+
+def _allow_llm(session_id: str) -> bool:
+    # A session flooding messages still gets a reply, just not an LLM one
+    allow_llm = session_limiter.allow(session_id)
+    if not allow_llm:
+        ADMISSION.inc(decision="rate_limited_session")
+    return allow_llm
+
+
+def _agent_input(session: SessionState, script: Optional[Script]) -> dict:
+    session_id = session.sessionId
+    return {
+        # Charged only when the reply needs the LLM: cached, scripted
+        # and early-naive replies are free
+        "allowLLM": lambda: _allow_llm(session_id),
+        "scriptId": script.id if script is not None else None,
+        "conversationHistory": session.conversationHistory.as_dicts(),
         "scamCategories": session.scamCategories,
         "persona": session.persona or "confused_elderly",
-    })
+        "conversationSummary": session.conversationSummary,
+        "unsummarizedMessages": (
+            session.totalMessagesExchanged - session.summarizedUpTo
+        ),
+    }
 
-    reply_message = Message(
-        sender="agent",
-        text=reply_text,
-        timestamp=int(datetime.utcnow().timestamp() * 1000),
-    )
 
-    session_manager.add_message(session, reply_message)
+def _schedule_summary(
+    session: SessionState, background_tasks: BackgroundTasks
+) -> None:
+    """Runs after the response has been sent."""
+    if conversation_summarizer is not None and conversation_summarizer.is_due(
+        session
+    ):
+        background_tasks.add_task(
+            conversation_summarizer.maybe_summarize, session.sessionId
+        )
+
 
-    # ── Intelligence extraction (every turn, uses server-side history)
-    intelligence = intelligence_extractor.extract(session.conversationHistory)
-    session.extractedIntelligence = intelligence
+async def _finish_turn(
+    session: SessionState,
+    reply_text: str,
+) -> Optional[Message]:
+    """
+    Record the agent reply, extract IOCs and queue the callback. An
+    empty `reply_text` (a stream cut off before any text) records no
+    reply but still queues the callback and saves the session.
+    """
+    reply_message = None
+    if reply_text:
+        reply_message = Message(
+            sender="agent",
+            text=reply_text,
+            timestamp=int(datetime.utcnow().timestamp() * 1000),
+        )
+
+        with STAGE_SECONDS.time(stage="session"):
+            await session_manager.add_message(session, reply_message)
+
+        # Kept out of the cross-session index: replies are LLM text,
+        # reused across sessions, and an invented number or UPI ID in
+        # one would link every session that received it
+        with STAGE_SECONDS.time(stage="extract"):
+            session.extractedIntelligence = intelligence_extractor.update(
+                session, [reply_message]
+            )
+    intelligence = session.extractedIntelligence
 
     # ── Callback trigger conditions
     has_actionable_ioc = (
@@ -68,7 +185,7 @@ def honeypot_endpoint(
     )
 
     should_send = (
-        not session.callbackSent
+        not session.callbackQueued
         and session.scamDetected
         and (
             has_actionable_ioc
@@ -76,13 +193,233 @@ def honeypot_endpoint(
         )
     )
 
+    # Delivery happens in the outbox worker; callbackSent is set there
+    # once the callback endpoint confirms receipt.
     if should_send:
-        success = send_final_result(session, intelligence)
-        if success:
-            session.callbackSent = True
+        with STAGE_SECONDS.time(stage="callback"):
+            await asyncio.to_thread(
+                get_outbox().enqueue, build_payload(session, intelligence)
+            )
+        session.callbackQueued = True
+
+    with STAGE_SECONDS.time(stage="save"):
+        await session_manager.save(session)
+
+    return reply_message
+
+
+async def _handle_turn(
+    payload: HoneypotRequest,
+    background_tasks: BackgroundTasks,
+    verdict: Optional[Verdict] = None,
+) -> Message:
+    session, script = await _begin_turn(payload, verdict)
+
+    # ── Generate agent reply
+    with STAGE_SECONDS.time(stage="llm"):
+        reply_text = await conversation_agent.generate_response(
+            _agent_input(session, script)
+        )
+
+    reply_message = await _finish_turn(session, reply_text)
+    _schedule_summary(session, background_tasks)
+    return reply_message
+
+
+@router.post("/honeypot", response_model=HoneypotResponse)
+async def honeypot_endpoint(
+    payload: HoneypotRequest,
+    background_tasks: BackgroundTasks,
+    _: None = Depends(verify_api_key),
+    __: None = Depends(rate_limit_api_key),
+):
+    with TURN_SECONDS.time(endpoint="honeypot"):
+        reply_message = await _handle_turn(payload, background_tasks)
 
     return HoneypotResponse(
         sessionId=payload.sessionId,
         status="success",
         message=reply_message,
     )
+
+
+@router.post("/honeypot/batch", response_model=HoneypotBatchResponse)
+async def honeypot_batch_endpoint(
+    batch: HoneypotBatchRequest,
+    background_tasks: BackgroundTasks,
+    x_api_key: str = Header(...),
+    _: None = Depends(verify_api_key),
+):
+    """
+    Many /honeypot turns in one call. Turns of the same session run in
+    the order given; different sessions run concurrently (at most
+    BATCH_MAX_CONCURRENCY at a time), so their LLM calls overlap and
+    can be batched by the provider. Each item gets its own result, in
+    request order; a failing item does not affect the others.
+
+    Rate limits count turns, not calls: the API key is charged one token
+    per item, and each session once per batch for all its turns, which
+    then all get an LLM reply or none do.
+
+    Scam detection runs once for the whole batch, through the
+    detector's `detect_batch`.
+    """
+    charge_api_key(x_api_key, len(batch.items))
+
+    results: List[HoneypotBatchItemResult] = [None] * len(batch.items)
+    payloads: List[Tuple[int, HoneypotRequest]] = []
+
+    for index, item in enumerate(batch.items):
+        if not isinstance(item, dict):
+            results[index] = HoneypotBatchItemResult(
+                index=index,
+                status="error",
+                error=f"item must be an object, not {type(item).__name__}",
+            )
+            continue
+        try:
+            payload = HoneypotRequest.model_validate(item)
+        except ValidationError as e:
+            session_id = item.get("sessionId")
+            results[index] = HoneypotBatchItemResult(
+                index=index,
+                sessionId=session_id if isinstance(session_id, str) else None,
+                status="error",
+                error="; ".join(
+                    f"{'.'.join(map(str, err['loc']))}: {err['msg']}"
+                    for err in e.errors()
+                ),
+            )
+            continue
+        payloads.append((index, payload))
+
+    # One vectorized pass; verdicts for turns of sessions already known
+    # to be scams go unused
+    with STAGE_SECONDS.time(stage="detect"):
+        verdicts = scam_detector.detect_batch(
+            [p.message.text[:SCAN_MAX_MESSAGE_CHARS] for _, p in payloads]
+        )
+
+    by_session: Dict[str, List[Tuple[int, HoneypotRequest, Verdict]]] = {}
+    for (index, payload), verdict in zip(payloads, verdicts):
+        by_session.setdefault(payload.sessionId, []).append(
+            (index, payload, verdict)
+        )
+
+    slots = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+    async def run_session(
+        turns: List[Tuple[int, HoneypotRequest, Verdict]]
+    ) -> None:
+        async with slots:
+            for index, payload, verdict in turns:
+                try:
+                    with TURN_SECONDS.time(endpoint="honeypot_batch"):
+                        reply_message = await _handle_turn(
+                            payload, background_tasks, verdict
+                        )
+                except Exception as e:
+                    logger.exception(
+                        "Batch item %d (session %s) failed", index, payload.sessionId
+                    )
+                    results[index] = HoneypotBatchItemResult(
+                        index=index,
+                        sessionId=payload.sessionId,
+                        status="error",
+                        error=f"{type(e).__name__}: {e}",
+                    )
+                else:
+                    results[index] = HoneypotBatchItemResult(
+                        index=index,
+                        sessionId=payload.sessionId,
+                        status="success",
+                        message=reply_message,
+                    )
+
+    await asyncio.gather(*(run_session(turns) for turns in by_session.values()))
+    return HoneypotBatchResponse(results=results)
+
+
+# Turn completions running outside their request; referenced until done
+_finishing: Set[asyncio.Task] = set()
+
+
+def _finish_in_task(
+    session: SessionState, reply_text: str
+) -> "asyncio.Task[Optional[Message]]":
+    """
+    Run _finish_turn in a task of its own, so that it completes even if
+    the request that started it is cancelled by a client disconnect.
+    """
+    task = asyncio.create_task(_finish_turn(session, reply_text))
+    _finishing.add(task)
+    task.add_done_callback(_finishing.discard)
+    return task
+
+
+def _log_finish_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(
+            "Finishing an interrupted stream turn failed", exc_info=task.exception()
+        )
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/honeypot/stream")
+async def honeypot_stream_endpoint(
+    payload: HoneypotRequest,
+    background_tasks: BackgroundTasks,
+    _: None = Depends(verify_api_key),
+    __: None = Depends(rate_limit_api_key),
+):
+    """
+    Same turn as /honeypot, with the agent reply sent as server-sent
+    events: `token` events carry reply text as it is generated, and a
+    final `done` event carries the HoneypotResponse. The callback and
+    session save run after the reply stream has finished; if the client
+    disconnects first, they still run, in the background, with the text
+    produced so far.
+    """
+    turn_started = time.perf_counter()
+    session, script = await _begin_turn(payload)
+    agent_input = _agent_input(session, script)
+
+    async def events():
+        parts = []
+        llm_started = time.perf_counter()
+        try:
+            async for delta in conversation_agent.stream_response(agent_input):
+                parts.append(delta)
+                yield _sse("token", {"text": delta})
+        except BaseException:
+            # Client went away mid-stream (this generator is being
+            # cancelled or closed): record what was produced anyway
+            _finish_in_task(session, "".join(parts)).add_done_callback(
+                _log_finish_failure
+            )
+            raise
+        STAGE_SECONDS.observe(time.perf_counter() - llm_started, stage="llm")
+
+        reply_message = await asyncio.shield(
+            _finish_in_task(session, "".join(parts))
+        )
+        _schedule_summary(session, background_tasks)
+        response = HoneypotResponse(
+            sessionId=payload.sessionId,
+            status="success",
+            message=reply_message,
+        )
+        yield _sse("done", response.model_dump(mode="json"))
+        TURN_SECONDS.observe(
+            time.perf_counter() - turn_started, endpoint="honeypot_stream"
+        )
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=background_tasks,
+    )
@@ -0,0 +1,44 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.api.deps import verify_api_key
+from app.api.honeypot import script_index
+from app.core.ioc_index import IOC_KINDS, ioc_index
+
+router = APIRouter(prefix="/intel", dependencies=[Depends(verify_api_key)])
+
+
+@router.get("/iocs")
+async def lookup_ioc(
+    value: str = Query(..., min_length=1),
+    kind: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=10_000),
+):
+    """
+    Sessions that used an IOC (UPI ID, phone number, link or domain,
+    account number), most recently seen first. Without `kind`, every
+    kind the value can be normalized to is searched.
+    """
+    if kind is not None and kind not in IOC_KINDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"kind must be one of {sorted(IOC_KINDS)}",
+        )
+
+    matches = []
+    for k in [kind] if kind else IOC_KINDS:
+        normalized, sessions = ioc_index.lookup(k, value, limit)
+        if sessions:
+            matches.append({"kind": k, "value": normalized, "sessions": sessions})
+    return {"query": value, "matches": matches}
+
+
+@router.get("/scripts")
+async def recurring_scripts(limit: int = Query(20, ge=1, le=1000)):
+    """Recurring scammer scripts, most frequently seen first."""
+    return {
+        "enabled": script_index is not None,
+        **(script_index.stats() if script_index is not None else {}),
+        "scripts": script_index.top(limit) if script_index is not None else [],
+    }
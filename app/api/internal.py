@@ -0,0 +1,51 @@
+import asyncio
+from typing import Dict, List
+
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel, Field
+
+from app.api.deps import verify_api_key
+from app.core.session_manager import session_manager
+from app.services.outbox import get_outbox
+
+# Worker-to-dispatcher endpoints used to hand sessions over when the
+# worker pool is resized (see app/cluster). A session is copied with
+# export + import, and removed from its old worker only once the new
+# one holds it; undelivered callbacks move with it.
+router = APIRouter(prefix="/internal", dependencies=[Depends(verify_api_key)])
+
+
+class SessionIds(BaseModel):
+    sessionIds: List[str]
+
+
+class SessionBundle(BaseModel):
+    sessions: List[Dict]
+    # Undelivered outbox rows, by session id
+    callbacks: Dict[str, Dict] = Field(default_factory=dict)
+
+
+@router.get("/sessions")
+async def list_sessions():
+    return {"sessionIds": session_manager.store.session_ids()}
+
+
+@router.post("/sessions/export")
+async def export_sessions(body: SessionIds):
+    sessions = await session_manager.store.export_sessions(body.sessionIds)
+    callbacks = await asyncio.to_thread(get_outbox().export_pending, body.sessionIds)
+    return {"sessions": sessions, "callbacks": callbacks}
+
+
+@router.post("/sessions/import")
+async def import_sessions(body: SessionBundle):
+    await asyncio.to_thread(get_outbox().import_pending, body.callbacks)
+    imported = await session_manager.store.import_sessions(body.sessions)
+    return {"imported": imported}
+
+
+@router.post("/sessions/remove")
+async def remove_sessions(body: SessionIds):
+    removed = await session_manager.store.remove_sessions(body.sessionIds)
+    await asyncio.to_thread(get_outbox().remove_pending, body.sessionIds)
+    return {"removed": removed}
@@ -0,0 +1,95 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.api.deps import verify_api_key
+from app.api.honeypot import conversation_agent, script_index
+from app.core.ioc_index import ioc_index
+from app.core.session_manager import session_manager
+from app.llm.providers.circuit_breaker import breaker_states
+from app.services.outbox import get_outbox
+from app.utils.metrics import REGISTRY, Gauge
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def _reply_cache_stats() -> dict:
+    cache = conversation_agent.reply_cache
+    return cache.stats() if cache is not None else {}
+
+
+def _hedge_stats() -> dict:
+    generator = conversation_agent.generate_text
+    return generator.stats() if hasattr(generator, "stats") else {}
+
+
+# Scrape-time gauges over state owned elsewhere
+Gauge(
+    "honeypot_sessions",
+    "Live sessions held by this process.",
+    callback=lambda: session_manager.store.stats().get("sessions"),
+)
+Gauge(
+    "honeypot_history_bytes",
+    "UTF-8 bytes of conversation history held in memory.",
+    callback=lambda: session_manager.store.stats().get("historyBytes"),
+)
+Gauge(
+    "honeypot_callback_outbox_pending",
+    "Callbacks queued but not yet delivered or abandoned.",
+    callback=lambda: get_outbox().pending_count(),
+)
+Gauge(
+    "honeypot_reply_cache",
+    "Reply cache entry count and lifetime hit/miss/eviction totals.",
+    labels=("stat",),
+    callback=_reply_cache_stats,
+)
+Gauge(
+    "honeypot_llm_circuit_state",
+    "LLM provider circuit state (0 closed, 1 half-open, 2 open).",
+    labels=("provider",),
+    callback=lambda: {
+        name: _CIRCUIT_STATES[state["state"]]
+        for name, state in breaker_states().items()
+    },
+)
+Gauge(
+    "honeypot_llm_hedge_wins",
+    "Hedged LLM requests won by each provider.",
+    labels=("provider",),
+    callback=lambda: _hedge_stats().get("wins"),
+)
+
+Gauge(
+    "honeypot_ioc_index",
+    "Cross-session IOC index size: distinct values, postings, sessions.",
+    labels=("stat",),
+    callback=ioc_index.stats,
+)
+Gauge(
+    "honeypot_script_index",
+    "Recurring-script index: scripts held and lifetime match/miss/skip/eviction totals.",
+    labels=("stat",),
+    callback=lambda: script_index.stats() if script_index is not None else {},
+)
+Gauge(
+    "honeypot_llm_admission",
+    "Reply LLM calls running (inFlight) and waiting for a slot (waiting).",
+    labels=("state",),
+    callback=lambda: {
+        k: v
+        for k, v in conversation_agent.admission.stats().items()
+        if k in ("inFlight", "waiting")
+    },
+)
+
+
+@router.get("/metrics")
+async def metrics(_: None = Depends(verify_api_key)):
+    return PlainTextResponse(
+        REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE
+    )
@@ -0,0 +1,577 @@
+import asyncio
+import itertools
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+from fastapi import Depends, FastAPI, HTTPException, Request, status
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.background import BackgroundTask
+
+from app.api.deps import verify_api_key
+from app.cluster.hash_ring import ConsistentHashRing
+from app.config import CALLBACK_OUTBOX_PATH, HISTORY_SPILL_DIR
+
+logger = logging.getLogger(__name__)
+
+READY_TIMEOUT_SECONDS = 60.0
+DRAIN_TIMEOUT_SECONDS = 30.0
+PROXY_TIMEOUT_SECONDS = 60.0
+
+BATCH_PATH = "/honeypot/batch"
+IOC_LOOKUP_PATH = "/intel/iocs"
+SCRIPTS_PATH = "/intel/scripts"
+
+# Not forwarded in either direction
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "transfer-encoding",
+    "upgrade",
+    "host",
+    "content-length",
+}
+
+
+class WorkerProcess:
+    """One uvicorn worker serving app.main:app on a private port."""
+
+    def __init__(self, index: int, host: str, port: int):
+        self.index = index
+        self.name = f"worker-{index}"
+        self.host = host
+        self.port = port
+        self.url = f"http://{host}:{port}"
+        self.proc: Optional[subprocess.Popen] = None
+
+    def start(self) -> None:
+        # Each worker delivers the callbacks of the sessions it owns (so
+        # it can mark them sent) from an outbox file of its own, and
+        # spills history to its own directory
+        outbox_root, outbox_ext = os.path.splitext(CALLBACK_OUTBOX_PATH)
+        env = {
+            **os.environ,
+            "CLUSTER_WORKER_INDEX": str(self.index),
+            "CALLBACK_OUTBOX_PATH": f"{outbox_root}.{self.name}{outbox_ext}",
+            "CALLBACK_OUTBOX_DRAIN": "true",
+            "HISTORY_SPILL_DIR": os.path.join(HISTORY_SPILL_DIR, self.name),
+        }
+        self.proc = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "app.main:app",
+                "--host", self.host,
+                "--port", str(self.port),
+                "--log-level", "warning",
+            ],
+            env=env,
+        )
+
+    async def wait_ready(self, client: httpx.AsyncClient) -> None:
+        deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+        while time.monotonic() < deadline:
+            if self.proc is not None and self.proc.poll() is not None:
+                raise RuntimeError(f"{self.name} exited with {self.proc.returncode}")
+            try:
+                await client.get(f"{self.url}/health", timeout=1.0)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+        raise RuntimeError(f"{self.name} not ready after {READY_TIMEOUT_SECONDS}s")
+
+    def stop(self) -> None:
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+
+def session_id_of(body: bytes) -> Optional[str]:
+    if not body:
+        return None
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    if isinstance(data, dict) and isinstance(data.get("sessionId"), str):
+        return data["sessionId"]
+    return None
+
+
+def batch_items_of(body: bytes) -> Optional[List]:
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    items = data.get("items") if isinstance(data, dict) else None
+    return items if isinstance(items, list) else None
+
+
+class Dispatcher:
+    """
+    Front process for multi-worker mode. Owns the worker processes and
+    forwards each request to the worker that owns its `sessionId` on a
+    consistent-hash ring, so a session's in-memory state always lives in
+    one process. Requests without a session id are spread round-robin.
+    A /honeypot/batch call is split into one sub-batch per owning worker
+    and the per-item results are merged back in request order. IOC
+    lookups and script statistics go to every worker, since each
+    indexes only the traffic it served.
+
+    Resizing the pool pauses new requests, waits for in-flight ones,
+    copies every session whose owner changed to its new worker (export
+    + import over the workers' /internal API), removes the copies left
+    on the old workers, then swaps the ring and resumes. If requests are
+    still in flight after DRAIN_TIMEOUT_SECONDS, or any copy fails, the
+    new copies are removed again, spawned workers are stopped and the
+    old ring stays in place: a turn still running on an old owner would
+    otherwise be lost with its session.
+    """
+
+    def __init__(
+        self,
+        worker_count: int,
+        host: str,
+        base_port: int,
+        api_key: Optional[str],
+    ):
+        self.host = host
+        self.base_port = base_port
+        self.api_key = api_key
+        self._initial_count = worker_count
+
+        self.workers: Dict[str, WorkerProcess] = {}
+        self.ring: Optional[ConsistentHashRing] = None
+        self._round_robin = itertools.cycle([])
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._open = asyncio.Event()
+        self._resize_lock = asyncio.Lock()
+        self._in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+        self.moved_sessions = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=PROXY_TIMEOUT_SECONDS,
+                limits=httpx.Limits(max_connections=1000, max_keepalive_connections=200),
+            )
+        return self._client
+
+    def _internal_headers(self) -> Dict[str, str]:
+        return {"x-api-key": self.api_key or ""}
+
+    # ─────────────────────────────────────────────
+    # Lifecycle
+    # ─────────────────────────────────────────────
+
+    async def _spawn(self, index: int) -> WorkerProcess:
+        worker = WorkerProcess(index, self.host, self.base_port + index)
+        worker.start()
+        try:
+            await worker.wait_ready(self.client)
+        except BaseException:
+            worker.stop()
+            raise
+        return worker
+
+    async def _spawn_all(self, indexes: range) -> List[WorkerProcess]:
+        """Spawn workers; if any fails to start, stop the others too."""
+        results = await asyncio.gather(
+            *(self._spawn(i) for i in indexes), return_exceptions=True
+        )
+        spawned = [r for r in results if isinstance(r, WorkerProcess)]
+        for result in results:
+            if isinstance(result, BaseException):
+                for worker in spawned:
+                    worker.stop()
+                raise result
+        return spawned
+
+    def _install(self, workers: Dict[str, WorkerProcess]) -> None:
+        self.workers = workers
+        self.ring = ConsistentHashRing(sorted(workers))
+        self._round_robin = itertools.cycle(sorted(workers))
+
+    async def start(self) -> None:
+        spawned = await self._spawn_all(range(self._initial_count))
+        self._install({w.name: w for w in spawned})
+        self._open.set()
+        logger.info("Dispatcher ready with %d workers", len(self.workers))
+
+    async def stop(self) -> None:
+        for worker in self.workers.values():
+            worker.stop()
+        if self._client is not None:
+            await self._client.aclose()
+
+    # ─────────────────────────────────────────────
+    # Resize + handover
+    # ─────────────────────────────────────────────
+
+    async def resize(self, count: int) -> Dict:
+        async with self._resize_lock:
+            old = dict(self.workers)
+            if count == len(old):
+                return self.status()
+
+            new: Dict[str, WorkerProcess] = {
+                name: w for name, w in old.items() if w.index < count
+            }
+            added = await self._spawn_all(range(len(old), count))
+            new.update({w.name: w for w in added})
+            new_ring = ConsistentHashRing(sorted(new))
+
+            self._open.clear()
+            try:
+                await asyncio.wait_for(self._idle.wait(), DRAIN_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                self._open.set()
+                for worker in added:
+                    worker.stop()
+                logger.error(
+                    "Resize to %d workers aborted, %d requests still in flight "
+                    "after %.0fs",
+                    count, self._in_flight, DRAIN_TIMEOUT_SECONDS,
+                )
+                raise HTTPException(
+                    status.HTTP_503_SERVICE_UNAVAILABLE,
+                    f"{self._in_flight} requests still in flight, resize aborted",
+                )
+            try:
+                moved = await self._hand_over(old, new, new_ring)
+                self._install(new)
+            except Exception as e:
+                for worker in added:
+                    worker.stop()
+                logger.error("Resize to %d workers failed, keeping %d: %s", count, len(old), e)
+                raise HTTPException(
+                    status.HTTP_502_BAD_GATEWAY, f"Session handover failed: {e}"
+                )
+            finally:
+                self._open.set()
+
+            for name, worker in old.items():
+                if name not in new:
+                    worker.stop()
+
+            self.moved_sessions += moved
+            logger.info("Resized to %d workers, moved %d sessions", count, moved)
+            return {**self.status(), "moved": moved}
+
+    async def _post(self, worker: WorkerProcess, path: str, body: Dict) -> Dict:
+        response = await self.client.post(
+            f"{worker.url}{path}", json=body, headers=self._internal_headers()
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def _hand_over(
+        self,
+        old: Dict[str, WorkerProcess],
+        new: Dict[str, WorkerProcess],
+        new_ring: ConsistentHashRing,
+    ) -> int:
+        """
+        Copy every session whose owner changes to the new owner, then
+        remove it from the old one. Returns the number moved. Nothing is
+        removed from an old owner until all copies have succeeded; on
+        failure the copies made so far are removed and the error raised.
+        """
+        # (source, destination) -> session ids
+        moves: Dict[Tuple[str, str], List[str]] = {}
+        for name, worker in old.items():
+            response = await self.client.get(
+                f"{worker.url}/internal/sessions", headers=self._internal_headers()
+            )
+            response.raise_for_status()
+            for session_id in response.json()["sessionIds"]:
+                owner = new_ring.node_for(session_id)
+                if owner != name:
+                    moves.setdefault((name, owner), []).append(session_id)
+
+        copied: List[Tuple[str, List[str]]] = []
+        moved = 0
+        try:
+            for (source, destination), session_ids in moves.items():
+                bundle = await self._post(
+                    old[source], "/internal/sessions/export", {"sessionIds": session_ids}
+                )
+                imported = await self._post(
+                    new[destination], "/internal/sessions/import", bundle
+                )
+                copied.append((destination, session_ids))
+                moved += imported["imported"]
+        except Exception:
+            for destination, session_ids in copied:
+                try:
+                    await self._post(
+                        new[destination],
+                        "/internal/sessions/remove",
+                        {"sessionIds": session_ids},
+                    )
+                except Exception as e:
+                    logger.error("Rolling back handover on %s failed: %s", destination, e)
+            raise
+
+        for (source, _), session_ids in moves.items():
+            try:
+                await self._post(
+                    old[source], "/internal/sessions/remove", {"sessionIds": session_ids}
+                )
+            except Exception as e:
+                # Stale copies only: the new ring no longer routes them there
+                logger.warning("Removing moved sessions from %s failed: %s", source, e)
+        return moved
+
+    # ─────────────────────────────────────────────
+    # Proxy
+    # ─────────────────────────────────────────────
+
+    def worker_for(self, session_id: Optional[str]) -> WorkerProcess:
+        if session_id is None:
+            return self.workers[next(self._round_robin)]
+        return self.workers[self.ring.node_for(session_id)]
+
+    def _finished(self) -> None:
+        self._in_flight -= 1
+        if self._in_flight == 0:
+            self._idle.set()
+
+    def _forward_headers(self, request: Request) -> List[Tuple[str, str]]:
+        return [
+            (k, v) for k, v in request.headers.items()
+            if k.lower() not in HOP_BY_HOP_HEADERS
+        ]
+
+    async def forward(self, request: Request) -> Response:
+        body = await request.body()
+        await self._open.wait()
+
+        if request.method == "POST" and request.url.path == BATCH_PATH:
+            items = batch_items_of(body)
+            if items is not None:
+                return await self.forward_batch(request, items)
+        if request.method == "GET" and request.url.path == IOC_LOOKUP_PATH:
+            return await self.forward_ioc_lookup(request)
+        if request.method == "GET" and request.url.path == SCRIPTS_PATH:
+            return await self.forward_to_all(request)
+
+        worker = self.worker_for(session_id_of(body))
+        self._in_flight += 1
+        self._idle.clear()
+        try:
+            upstream = await self.client.send(
+                self.client.build_request(
+                    request.method,
+                    f"{worker.url}{request.url.path}",
+                    params=request.query_params,
+                    headers=self._forward_headers(request),
+                    content=body,
+                ),
+                stream=True,
+            )
+        except httpx.HTTPError as e:
+            self._finished()
+            logger.error("Forwarding to %s failed: %s", worker.name, e)
+            raise HTTPException(status.HTTP_502_BAD_GATEWAY, f"{worker.name} unavailable")
+
+        async def close() -> None:
+            await upstream.aclose()
+            self._finished()
+
+        return StreamingResponse(
+            upstream.aiter_raw(),
+            status_code=upstream.status_code,
+            headers={
+                k: v for k, v in upstream.headers.items()
+                if k.lower() not in HOP_BY_HOP_HEADERS
+            },
+            background=BackgroundTask(close),
+        )
+
+    async def forward_batch(self, request: Request, items: List) -> Response:
+        groups: Dict[str, Tuple[WorkerProcess, List[int]]] = {}
+        for index, item in enumerate(items):
+            session_id = item.get("sessionId") if isinstance(item, dict) else None
+            worker = self.worker_for(session_id if isinstance(session_id, str) else None)
+            groups.setdefault(worker.name, (worker, []))[1].append(index)
+
+        headers = self._forward_headers(request)
+        self._in_flight += 1
+        self._idle.clear()
+        try:
+            responses = await asyncio.gather(
+                *(
+                    self.client.post(
+                        f"{worker.url}{BATCH_PATH}",
+                        json={"items": [items[i] for i in indexes]},
+                        headers=headers,
+                    )
+                    for worker, indexes in groups.values()
+                ),
+                return_exceptions=True,
+            )
+        finally:
+            self._finished()
+
+        results: List[Optional[Dict]] = [None] * len(items)
+        for (worker, indexes), response in zip(groups.values(), responses):
+            if isinstance(response, httpx.Response):
+                if response.status_code == 200:
+                    for result in response.json()["results"]:
+                        index = indexes[result["index"]]
+                        results[index] = {**result, "index": index}
+                    continue
+                if response.status_code < 500:
+                    # Auth, validation and rate-limit answers hold for the whole call
+                    return Response(
+                        response.content,
+                        status_code=response.status_code,
+                        headers={
+                            k: v for k, v in response.headers.items()
+                            if k.lower() not in HOP_BY_HOP_HEADERS
+                        },
+                    )
+                error = f"{worker.name} returned {response.status_code}"
+            else:
+                logger.error("Forwarding batch to %s failed: %s", worker.name, response)
+                error = f"{worker.name} unavailable"
+
+            for index in indexes:
+                item = items[index]
+                results[index] = {
+                    "index": index,
+                    "sessionId": item.get("sessionId") if isinstance(item, dict) else None,
+                    "status": "error",
+                    "message": None,
+                    "error": error,
+                }
+        return JSONResponse({"results": results})
+
+    async def _get_from_all(
+        self, request: Request
+    ) -> Tuple[Dict[str, Dict], Optional[Response]]:
+        """
+        GET the request path from every worker. Returns the JSON bodies
+        by worker name, plus the first non-200 worker response (to pass
+        back as is) if there was one.
+        """
+        headers = self._forward_headers(request)
+        workers = list(self.workers.values())
+        responses = await asyncio.gather(
+            *(
+                self.client.get(
+                    f"{worker.url}{request.url.path}",
+                    params=request.query_params,
+                    headers=headers,
+                )
+                for worker in workers
+            ),
+            return_exceptions=True,
+        )
+
+        bodies: Dict[str, Dict] = {}
+        for worker, response in zip(workers, responses):
+            if not isinstance(response, httpx.Response):
+                logger.error("GET %s on %s failed: %s", request.url.path, worker.name, response)
+                raise HTTPException(status.HTTP_502_BAD_GATEWAY, f"{worker.name} unavailable")
+            if response.status_code != 200:
+                return bodies, Response(
+                    response.content,
+                    status_code=response.status_code,
+                    media_type=response.headers.get("content-type"),
+                )
+            bodies[worker.name] = response.json()
+        return bodies, None
+
+    async def forward_to_all(self, request: Request) -> Response:
+        bodies, error = await self._get_from_all(request)
+        return error or JSONResponse({"workers": bodies})
+
+    async def forward_ioc_lookup(self, request: Request) -> Response:
+        bodies, error = await self._get_from_all(request)
+        if error is not None:
+            return error
+
+        merged: Dict[Tuple[str, str], Dict[str, Dict]] = {}
+        for body in bodies.values():
+            for match in body["matches"]:
+                sessions = merged.setdefault((match["kind"], match["value"]), {})
+                # A session handed over between workers shows up on both
+                for seen in match["sessions"]:
+                    known = sessions.get(seen["sessionId"])
+                    if known is None:
+                        sessions[seen["sessionId"]] = dict(seen)
+                    else:
+                        known["firstSeen"] = min(known["firstSeen"], seen["firstSeen"])
+                        known["lastSeen"] = max(known["lastSeen"], seen["lastSeen"])
+
+        limit = int(request.query_params.get("limit", 100))
+        return JSONResponse({
+            "query": request.query_params.get("value"),
+            "matches": [
+                {
+                    "kind": kind,
+                    "value": value,
+                    "sessions": sorted(
+                        sessions.values(), key=lambda s: s["lastSeen"], reverse=True
+                    )[:limit],
+                }
+                for (kind, value), sessions in merged.items()
+            ],
+        })
+
+    def status(self) -> Dict:
+        return {
+            "workers": [
+                {"name": w.name, "url": w.url, "pid": w.proc.pid if w.proc else None}
+                for w in sorted(self.workers.values(), key=lambda w: w.index)
+            ],
+            "inFlight": self._in_flight,
+            "movedSessions": self.moved_sessions,
+        }
+
+
+class ResizeRequest(BaseModel):
+    workers: int = Field(ge=1)
+
+
+def create_app(dispatcher: Dispatcher) -> FastAPI:
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        await dispatcher.start()
+        yield
+        await dispatcher.stop()
+
+    app = FastAPI(title="Agentic Honey-Pot dispatcher", lifespan=lifespan)
+
+    @app.get("/cluster/status", dependencies=[Depends(verify_api_key)])
+    async def cluster_status():
+        return dispatcher.status()
+
+    @app.post("/cluster/resize", dependencies=[Depends(verify_api_key)])
+    async def cluster_resize(body: ResizeRequest):
+        return await dispatcher.resize(body.workers)
+
+    @app.api_route(
+        "/{path:path}",
+        methods=["GET", "POST", "PUT", "PATCH", "DELETE"],
+        include_in_schema=False,
+    )
+    async def proxy(request: Request):
+        return await dispatcher.forward(request)
+
+    return app
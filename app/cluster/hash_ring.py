@@ -0,0 +1,37 @@
+import hashlib
+from bisect import bisect_right
+from typing import Dict, Iterable, List
+
+VIRTUAL_NODES = 160
+
+
+def _hash(key: str) -> int:
+    # Stable across processes and restarts, unlike the builtin hash()
+    return int.from_bytes(
+        hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+class ConsistentHashRing:
+    """
+    Maps keys to nodes so that adding or removing one node only moves
+    the keys that node gains or loses (about 1/N of them). Each node is
+    placed at `vnodes` points on the ring to even out the split.
+    """
+
+    def __init__(self, nodes: Iterable[str], vnodes: int = VIRTUAL_NODES):
+        self.nodes: List[str] = list(nodes)
+        if not self.nodes:
+            raise ValueError("ConsistentHashRing needs at least one node")
+        self.vnodes = vnodes
+
+        points: Dict[int, str] = {}
+        for node in self.nodes:
+            for i in range(vnodes):
+                points[_hash(f"{node}#{i}")] = node
+        self._points = sorted(points)
+        self._owners = [points[p] for p in self._points]
+
+    def node_for(self, key: str) -> str:
+        index = bisect_right(self._points, _hash(key)) % len(self._points)
+        return self._owners[index]
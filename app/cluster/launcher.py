@@ -0,0 +1,52 @@
+"""
+Multi-process mode: one dispatcher in front of N uvicorn workers, with
+each sessionId pinned to one worker by consistent hashing. Sessions
+stay in worker memory; no external store is needed.
+
+    python -m app.cluster.launcher --workers 4 --port 8000
+
+The workers listen on --worker-base-port + i (loopback by default).
+Resize at runtime with
+    POST /cluster/resize {"workers": N}
+which hands sessions over to their new owners before switching.
+"""
+import argparse
+import logging
+import os
+
+import uvicorn
+
+from app.cluster.dispatcher import Dispatcher, create_app
+from app.config import API_KEY
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--worker-host", default="127.0.0.1")
+    parser.add_argument("--worker-base-port", type=int, default=8100)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper())
+    dispatcher = Dispatcher(
+        worker_count=args.workers,
+        host=args.worker_host,
+        base_port=args.worker_base_port,
+        api_key=API_KEY,
+    )
+    uvicorn.run(
+        create_app(dispatcher),
+        host=args.host,
+        port=args.port,
+        log_level=args.log_level,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -10,9 +10,147 @@ logger = logging.getLogger(__name__)
 API_KEY = os.getenv("HONEYPOT_API_KEY")
 GUVI_CALLBACK_URL = os.getenv("GUVI_CALLBACK_URL", "https://guvi-hackathon.co/api/callback")
 
+# Files the service writes at runtime (callback outbox, history spill)
+# default to this directory; /data/ is gitignored
+DATA_DIR = os.getenv("HONEYPOT_DATA_DIR", "data")
+
+CALLBACK_OUTBOX_PATH = os.getenv(
+    "CALLBACK_OUTBOX_PATH", os.path.join(DATA_DIR, "callback_outbox.db")
+)
+# Delivered callbacks, and ones abandoned after the last retry, are
+# deleted from the outbox this long after their last attempt
+CALLBACK_OUTBOX_RETENTION_SECONDS = float(
+    os.getenv("CALLBACK_OUTBOX_RETENTION_SECONDS", str(24 * 3600))
+)
+# Whether this process delivers queued callbacks. In multi-worker mode
+# (app/cluster) each worker has an outbox file of its own and drains it.
+CALLBACK_OUTBOX_DRAIN = os.getenv("CALLBACK_OUTBOX_DRAIN", "true").lower() == "true"
+
 # HuggingFace Configuration
 HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY")
 HF_MODEL = os.getenv("HF_MODEL", "meta-llama/Llama-3.2-3B-Instruct")
+HF_API_URL = os.getenv("HF_API_URL", f"https://router.huggingface.co/models/{HF_MODEL}")
+
+# Local CPU inference ("local" provider): concurrent prompts are
+# micro-batched, up to LOCAL_MAX_BATCH per batch or LOCAL_MAX_WAIT_MS.
+# A caller waiting longer than LOCAL_TIMEOUT_SECONDS (queue + batch) fails.
+LOCAL_MODEL = os.getenv("LOCAL_MODEL", "Qwen/Qwen2.5-0.5B-Instruct")
+LOCAL_MAX_BATCH = int(os.getenv("LOCAL_MAX_BATCH", "8"))
+LOCAL_MAX_WAIT_MS = float(os.getenv("LOCAL_MAX_WAIT_MS", "20"))
+LOCAL_MAX_NEW_TOKENS = int(os.getenv("LOCAL_MAX_NEW_TOKENS", "120"))
+LOCAL_TIMEOUT_SECONDS = float(os.getenv("LOCAL_TIMEOUT_SECONDS", "8"))
+
+# Scam detection: "rules" (ScamDetector) or "ml", the hashed n-gram
+# linear model trained with `python -m app.tools.train_scam_model` and
+# loaded from SCAM_MODEL_PATH at start-up (rules are used if it is missing).
+# The model pays a fixed cost per call: one message at a time it runs at
+# about 4k msg/s against about 50k for the rules, roughly 12x slower per
+# turn, and only catches up in batches of 100 or more, which
+# /honeypot/batch sends it (see benchmarks/bench_scam_classifier.py).
+SCAM_CLASSIFIER = os.getenv("SCAM_CLASSIFIER", "rules").lower()
+SCAM_MODEL_PATH = os.getenv("SCAM_MODEL_PATH", "scam_model.npz")
+
+# Reply LLM providers (huggingface, gemini, groq, local), in priority
+# order. With more than one, requests are hedged: the next provider is
+# fired once the previous one exceeds its rolling HEDGE_QUANTILE
+# latency (clamped to the min/max delay).
+LLM_PROVIDERS = [
+    p.strip()
+    for p in os.getenv("LLM_PROVIDERS", "huggingface").split(",")
+    if p.strip()
+]
+HEDGE_QUANTILE = float(os.getenv("HEDGE_QUANTILE", "0.9"))
+HEDGE_MIN_DELAY_MS = float(os.getenv("HEDGE_MIN_DELAY_MS", "200"))
+HEDGE_MAX_DELAY_MS = float(os.getenv("HEDGE_MAX_DELAY_MS", "6000"))
+
+# Per-provider circuit breaker. Over a sliding CIRCUIT_WINDOW_SECONDS
+# window of at least CIRCUIT_MIN_CALLS calls, the circuit opens when the
+# failure rate or the rate of calls slower than CIRCUIT_SLOW_CALL_SECONDS
+# crosses its threshold; a probe is let through after CIRCUIT_OPEN_SECONDS.
+CIRCUIT_WINDOW_SECONDS = float(os.getenv("CIRCUIT_WINDOW_SECONDS", "30"))
+CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "5"))
+CIRCUIT_FAILURE_RATE = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))
+CIRCUIT_SLOW_CALL_SECONDS = float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "4"))
+CIRCUIT_SLOW_CALL_RATE = float(os.getenv("CIRCUIT_SLOW_CALL_RATE", "0.8"))
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "15"))
+
+# Reply prompt size. The conversation window is filled newest-first
+# until the whole prompt would exceed PROMPT_TOKEN_BUDGET (estimated at
+# ~4 chars/token); single messages are cut to PROMPT_MAX_MESSAGE_TOKENS.
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "480"))
+PROMPT_MAX_MESSAGE_TOKENS = int(os.getenv("PROMPT_MAX_MESSAGE_TOKENS", "100"))
+
+# Admission control. Token buckets refill at *_RPS up to *_BURST: a
+# client over its API-key rate gets 429, a session over its rate gets a
+# canned reply without an LLM call. At most LLM_MAX_CONCURRENCY reply
+# LLM calls run at once and LLM_MAX_QUEUE more may wait; past that,
+# requests are shed to a canned reply. A rate of 0 disables that limit.
+# The key limit is off by default: a deployment with a single API_KEY
+# would otherwise cap its whole ingest at RATE_LIMIT_KEY_RPS.
+RATE_LIMIT_KEY_RPS = float(os.getenv("RATE_LIMIT_KEY_RPS", "0"))
+RATE_LIMIT_KEY_BURST = float(os.getenv("RATE_LIMIT_KEY_BURST", "100"))
+RATE_LIMIT_SESSION_RPS = float(os.getenv("RATE_LIMIT_SESSION_RPS", "0.5"))
+RATE_LIMIT_SESSION_BURST = float(os.getenv("RATE_LIMIT_SESSION_BURST", "5"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "32"))
+
+# /honeypot/batch: at most BATCH_MAX_ITEMS turns per call; sessions in
+# a batch are processed BATCH_MAX_CONCURRENCY at a time (turns of one
+# session always run in order)
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", str(LLM_MAX_CONCURRENCY)))
+
+# Rolling summary: once SUMMARY_TRIGGER_MESSAGES messages older than the
+# last SUMMARY_KEEP_RECENT are unsummarized, they are folded into the
+# session summary (at most SUMMARY_MAX_CHARS) after the reply is sent.
+SUMMARY_ENABLED = os.getenv("SUMMARY_ENABLED", "true").lower() == "true"
+SUMMARY_TRIGGER_MESSAGES = int(os.getenv("SUMMARY_TRIGGER_MESSAGES", "10"))
+SUMMARY_KEEP_RECENT = int(os.getenv("SUMMARY_KEEP_RECENT", "8"))
+SUMMARY_MAX_CHARS = int(os.getenv("SUMMARY_MAX_CHARS", "400"))
+
+# Conversation history: messages kept in memory per session; older
+# ones are spilled to an append-only file under HISTORY_SPILL_DIR
+HISTORY_HOT_WINDOW = int(os.getenv("HISTORY_HOT_WINDOW", "20"))
+HISTORY_SPILL_DIR = os.getenv(
+    "HISTORY_SPILL_DIR", os.path.join(DATA_DIR, "history_spill")
+)
+
+# LLM reply cache
+REPLY_CACHE_ENABLED = os.getenv("REPLY_CACHE_ENABLED", "true").lower() == "true"
+REPLY_CACHE_MAX_ENTRIES = int(os.getenv("REPLY_CACHE_MAX_ENTRIES", "10000"))
+REPLY_CACHE_TTL_SECONDS = float(os.getenv("REPLY_CACHE_TTL_SECONDS", "3600"))
+REPLY_CACHE_VARIANTS = int(os.getenv("REPLY_CACHE_VARIANTS", "3"))
+
+# Cross-session IOC index: sightings not repeated for this long are
+# dropped from /intel/iocs lookups
+IOC_INDEX_TTL_SECONDS = float(os.getenv("IOC_INDEX_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# IOC extraction input caps. Scammers control the text, so at most
+# SCAN_MAX_MESSAGE_CHARS of each message are scanned (detection and
+# fingerprinting included) and a session stops being scanned for IOCs
+# once SCAN_MAX_SESSION_CHARS have been. Texts longer than
+# SCAN_CHUNK_CHARS are scanned in overlapping chunks.
+SCAN_MAX_MESSAGE_CHARS = int(os.getenv("SCAN_MAX_MESSAGE_CHARS", str(64 * 1024)))
+SCAN_MAX_SESSION_CHARS = int(os.getenv("SCAN_MAX_SESSION_CHARS", str(1024 * 1024)))
+SCAN_CHUNK_CHARS = int(os.getenv("SCAN_CHUNK_CHARS", str(16 * 1024)))
+
+# Recurring-script index: scammer messages whose MinHash similarity to a
+# known script is at least SCRIPT_MIN_SIMILARITY reuse its detection
+# verdict and up to SCRIPT_REPLY_VARIANTS stored replies per persona.
+# Messages under SCRIPT_MIN_WORDS words are not fingerprinted.
+SCRIPT_INDEX_ENABLED = os.getenv("SCRIPT_INDEX_ENABLED", "true").lower() == "true"
+SCRIPT_INDEX_MAX_SCRIPTS = int(os.getenv("SCRIPT_INDEX_MAX_SCRIPTS", "5000"))
+SCRIPT_MIN_SIMILARITY = float(os.getenv("SCRIPT_MIN_SIMILARITY", "0.6"))
+SCRIPT_MIN_WORDS = int(os.getenv("SCRIPT_MIN_WORDS", "5"))
+SCRIPT_REPLY_VARIANTS = int(os.getenv("SCRIPT_REPLY_VARIANTS", "3"))
+
+# Request profiling: PROFILE_SAMPLE_RATE of requests (0-1) run under
+# cProfile, as does any request sent with `X-Profile: 1` and a valid API
+# key. Sampled profiles slower than PROFILE_SLOW_MS are kept, newest
+# PROFILE_BUFFER_SIZE only, under /admin/profiles.
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "500"))
+PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", "20"))
 
 # Optional
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
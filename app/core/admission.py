@@ -0,0 +1,136 @@
+import asyncio
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict
+
+from app.config import (
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_QUEUE,
+    RATE_LIMIT_KEY_BURST,
+    RATE_LIMIT_KEY_RPS,
+    RATE_LIMIT_SESSION_BURST,
+    RATE_LIMIT_SESSION_RPS,
+)
+from app.utils.metrics import ADMISSION
+
+MAX_TRACKED_KEYS = 100_000
+
+
+class LLMBusyError(RuntimeError):
+    """Raised instead of queueing background LLM work behind replies."""
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated_at")
+
+    def __init__(self, burst: float, now: float):
+        self.tokens = burst
+        self.updated_at = now
+
+
+class KeyedRateLimiter:
+    """
+    One token bucket per key (API key, session id), refilled at `rate`
+    tokens per second up to `burst`. Buckets live in an LRU bounded at
+    `max_keys`; an evicted key simply starts again with a full bucket.
+
+    A request may cost more than one token (a batch costs one per item).
+    A cost above `burst` is admitted once the bucket is full and leaves
+    it in debt, so the key waits for the whole cost to refill.
+    """
+
+    def __init__(self, rate: float, burst: float, max_keys: int = MAX_TRACKED_KEYS):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = Lock()
+
+    def allow(self, key: str, cost: float = 1) -> bool:
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.burst, now)
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket.tokens = min(
+                    self.burst, bucket.tokens + (now - bucket.updated_at) * self.rate
+                )
+                bucket.updated_at = now
+
+            if bucket.tokens >= min(cost, self.burst):
+                bucket.tokens -= cost
+                return True
+            return False
+
+    def retry_after(self, cost: float = 1) -> float:
+        """Seconds until an empty bucket can admit `cost` again."""
+        return min(cost, self.burst) / self.rate if self.rate > 0 else 0.0
+
+
+class LLMAdmission:
+    """
+    Concurrency limit in front of LLM calls.
+
+    Up to `max_concurrency` calls run at once and up to `max_queue` more
+    may wait for a slot. A caller arriving when the queue is already
+    full is shed: `acquire` returns False at once and the caller serves
+    a canned reply instead of adding to the backlog.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        max_queue: int = LLM_MAX_QUEUE,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+
+    async def acquire(self) -> bool:
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                ADMISSION.inc(decision="llm_shed")
+                return False
+            ADMISSION.inc(decision="llm_queued")
+
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        return True
+
+    async def try_acquire(self) -> bool:
+        """Take a slot only if one is free now; never queues."""
+        if self._semaphore.locked() or self.waiting:
+            return False
+        # Does not suspend: a slot is free
+        await self._semaphore.acquire()
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "inFlight": self.in_flight,
+            "waiting": self.waiting,
+            "maxConcurrency": self.max_concurrency,
+            "maxQueue": self.max_queue,
+        }
+
+
+api_key_limiter = KeyedRateLimiter(RATE_LIMIT_KEY_RPS, RATE_LIMIT_KEY_BURST)
+session_limiter = KeyedRateLimiter(RATE_LIMIT_SESSION_RPS, RATE_LIMIT_SESSION_BURST)
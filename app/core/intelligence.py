@@ -1,82 +1,225 @@
+import logging
 import re
-from typing import List
+from typing import Dict, Iterable, List, Optional, Pattern, Sequence, Set
+
+from app.config import (
+    SCAN_CHUNK_CHARS,
+    SCAN_MAX_MESSAGE_CHARS,
+    SCAN_MAX_SESSION_CHARS,
+)
+from app.core.ioc_index import IOCIndex
+from app.storage.models import Message, ExtractedIntelligence, SessionState
+from app.utils.metrics import SCAN_CAPPED
+
+logger = logging.getLogger(__name__)
+
+
+# Scammers control the text, so every pattern is bounded: it matches at
+# most a fixed number of characters and a scan is linear in the text.
+
+# IFSC codes (specific format: 4 letters + 0 + 6 alphanumeric)
+IFSC_PATTERN = re.compile(r"\b[a-z]{4}0[a-z0-9]{6}\b")
+
+# Bank account numbers: require a context word nearby
+# Matches 9-18 digit sequences preceded by account-related words
+ACCOUNT_PATTERN = re.compile(
+    r"(?:account|a/c|acct|acc)\s{0,3}(?:no\.?|number|num|#)?\s{0,3}:?\s{0,3}(\d{9,18})"
+)
+
+# UPI IDs (email-like patterns filtered by known UPI providers); handle
+# and provider are each at most 64 characters
+UPI_PATTERN = re.compile(r"\b[\w.-]{1,64}@[\w.-]{1,64}\b")
+
+VALID_UPI_PROVIDERS = (
+    "paytm",
+    "okaxis",
+    "ybl",
+    "axisbank",
+    "oksbi",
+    "sbi",
+    "upi",
+)
+
+# Phishing links, up to 2048 characters after the scheme. The URL
+# characters are listed explicitly: this used to be written `[$-_@.&+]`,
+# a `$`-to-`_` range, which is where `/`, `:`, `?`, `=` and digits came
+# from (along with `<`, `>`, `\` and `^`, no longer part of a link).
+LINK_PATTERN = re.compile(
+    r"http[s]?://[a-zA-Z0-9$\-_@.&+!*(),%/:;=?'\[\]]{1,2048}"
+)
+
+# Phone numbers: require word boundary, 10-13 digits with optional +
+PHONE_PATTERN = re.compile(r"(?<!\d)\+?\d{10,13}(?!\d)")
+
+SUSPICIOUS_KEYWORDS = [
+    "urgent",
+    "verify",
+    "immediately",
+    "block",
+    "suspend",
+    "otp",
+    "cvv",
+    "pin",
+    "password",
+    "account number",
+]
+
+IOC_FIELDS = (
+    "bankAccounts",
+    "upiIds",
+    "phishingLinks",
+    "phoneNumbers",
+    "suspiciousKeywords",
+)
+
+
+class _ScanPattern:
+    """
+    An IOC pattern whose matches are at most `max_len` characters long,
+    skipped when none of `literals` occurs in the text.
+
+    Texts longer than `chunk_chars` are searched chunk by chunk, each
+    chunk extended by `max_len + 1` characters so that a match starting
+    in it (and the one character a trailing `\\b` looks at) is seen
+    whole. The results are the same as one `findall` over the text.
+    """
 
-from app.storage.models import Message, ExtractedIntelligence
+    __slots__ = ("regex", "max_len", "literals")
+
+    def __init__(self, regex: Pattern, max_len: int, literals: Sequence[str] = ()):
+        self.regex = regex
+        self.max_len = max_len
+        self.literals = tuple(literals)
+
+    def findall(self, text: str, chunk_chars: int = SCAN_CHUNK_CHARS) -> List[str]:
+        if len(text) <= chunk_chars:
+            if self.literals and not any(lit in text for lit in self.literals):
+                return []
+            return self.regex.findall(text)
+
+        group = 1 if self.regex.groups else 0
+        found: List[str] = []
+        pos = 0
+        for start in range(0, len(text), chunk_chars):
+            stop = start + chunk_chars
+            end = min(stop + self.max_len + 1, len(text))
+            # A match found in the previous chunk may run into this one
+            pos = max(pos, start)
+            if pos >= stop:
+                continue
+            if self.literals and not any(
+                text.find(lit, pos, end) >= 0 for lit in self.literals
+            ):
+                continue
+            # Lookbehinds and \b still see the text before `pos`
+            for match in self.regex.finditer(text, pos, end):
+                if match.start() >= stop:
+                    break
+                found.append(match.group(group))
+                pos = match.end()
+        return found
+
+
+_IFSC = _ScanPattern(IFSC_PATTERN, 11)
+_ACCOUNT = _ScanPattern(ACCOUNT_PATTERN, 41, ("acc", "a/c"))
+_UPI = _ScanPattern(UPI_PATTERN, 129, ("@",))
+_LINK = _ScanPattern(LINK_PATTERN, 2056, ("http",))
+_PHONE = _ScanPattern(PHONE_PATTERN, 14)
 
 
 class IntelligenceExtractor:
     """
     Extract Indicators of Compromise (IOCs) from conversation history.
-    Stateless, regex-based, cheap to run every turn.
+    Regex-based and cheap to run every turn: `update` scans only the
+    messages added since the last turn and merges them into the running
+    IOC sets kept on the session.
+
+    Input is capped: only the first SCAN_MAX_MESSAGE_CHARS of a message
+    are scanned, and `update` stops scanning a session's scammer messages
+    once SCAN_MAX_SESSION_CHARS of them have been, so a turn's cost is
+    bounded however long the scammer's message. The agent's own replies
+    do not count toward that budget. Reaching it is logged and counted
+    in SCAN_CAPPED.
     """
 
     @staticmethod
-    def extract(conversation_history: List[Message]) -> ExtractedIntelligence:
-        all_text = " ".join(msg.text for msg in conversation_history).lower()
-
-        intelligence = ExtractedIntelligence()
-
-        # IFSC codes (specific format: 4 letters + 0 + 6 alphanumeric)
-        ifsc_pattern = r"\b[a-z]{4}0[a-z0-9]{6}\b"
-        intelligence.bankAccounts.extend(re.findall(ifsc_pattern, all_text))
-
-        # Bank account numbers: require a context word nearby
-        # Matches 9-18 digit sequences preceded by account-related words
-        account_pattern = r"(?:account|a/c|acct|acc)\s*(?:no\.?|number|num|#)?\s*:?\s*(\d{9,18})"
-        intelligence.bankAccounts.extend(re.findall(account_pattern, all_text))
-
-        # UPI IDs (email-like patterns filtered by known UPI providers)
-        upi_pattern = r"\b[\w\.-]+@[\w\.-]+\b"
-        upi_matches = re.findall(upi_pattern, all_text)
-
-        valid_upi_providers = (
-            "paytm",
-            "okaxis",
-            "ybl",
-            "axisbank",
-            "oksbi",
-            "sbi",
-            "upi",
-        )
+    def _scan(text: str) -> Dict[str, Set[str]]:
+        """Run every IOC pattern over already-lowercased text."""
+        bank_accounts = set(_IFSC.findall(text))
+        bank_accounts.update(_ACCOUNT.findall(text))
+
+        return {
+            "bankAccounts": bank_accounts,
+            "upiIds": {
+                u for u in _UPI.findall(text)
+                if any(p in u for p in VALID_UPI_PROVIDERS)
+            },
+            "phishingLinks": set(_LINK.findall(text)),
+            "phoneNumbers": set(_PHONE.findall(text)),
+            "suspiciousKeywords": {
+                kw for kw in SUSPICIOUS_KEYWORDS if kw in text
+            },
+        }
 
-        intelligence.upiIds.extend(
-            u for u in upi_matches if any(p in u for p in valid_upi_providers)
+    @staticmethod
+    def _to_intelligence(ioc_sets: Dict[str, Set[str]]) -> ExtractedIntelligence:
+        return ExtractedIntelligence(
+            **{field: list(ioc_sets.get(field, ())) for field in IOC_FIELDS}
         )
 
-        # Phishing links
-        link_pattern = (
-            r"http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|"
-            r"[!*\\(\\),]|(?:%[0-9a-fA-F]{2}))+"
-        )
-        intelligence.phishingLinks.extend(re.findall(link_pattern, all_text))
-
-        # Phone numbers: require word boundary, 10-13 digits with optional +
-        phone_pattern = r"(?<!\d)\+?\d{10,13}(?!\d)"
-        intelligence.phoneNumbers.extend(re.findall(phone_pattern, all_text))
-
-        # Suspicious keywords
-        suspicious_keywords = [
-            "urgent",
-            "verify",
-            "immediately",
-            "block",
-            "suspend",
-            "otp",
-            "cvv",
-            "pin",
-            "password",
-            "account number",
-        ]
-
-        for kw in suspicious_keywords:
-            if kw in all_text:
-                intelligence.suspiciousKeywords.append(kw)
-
-        # Deduplicate everything
-        intelligence.bankAccounts = list(set(intelligence.bankAccounts))
-        intelligence.upiIds = list(set(intelligence.upiIds))
-        intelligence.phishingLinks = list(set(intelligence.phishingLinks))
-        intelligence.phoneNumbers = list(set(intelligence.phoneNumbers))
-        intelligence.suspiciousKeywords = list(set(intelligence.suspiciousKeywords))
-
-        return intelligence
+    @classmethod
+    def extract(cls, conversation_history: List[Message]) -> ExtractedIntelligence:
+        """
+        Full re-scan of a conversation. Prefer `update` on the request
+        path; this is kept for offline use over complete transcripts.
+        """
+        all_text = " ".join(
+            msg.text[:SCAN_MAX_MESSAGE_CHARS] for msg in conversation_history
+        )[:SCAN_MAX_SESSION_CHARS]
+        return cls._to_intelligence(cls._scan(all_text.lower()))
+
+    @classmethod
+    def update(
+        cls,
+        session: SessionState,
+        new_messages: Iterable[Message],
+        index: Optional[IOCIndex] = None,
+    ) -> ExtractedIntelligence:
+        """
+        Scan only `new_messages` and merge their IOCs into the session's
+        running sets. Per-turn cost depends on the new text, not on the
+        length of the conversation.
+
+        Messages are scanned one at a time, so a match can no longer be
+        stitched together from the end of one message and the start of
+        the next (e.g. "account" in one turn, digits in the following).
+
+        Every sighting is also recorded in `index`, when given, for
+        cross-session correlation.
+        """
+        ioc_sets = session.iocSets
+
+        for msg in new_messages:
+            text = msg.text[:SCAN_MAX_MESSAGE_CHARS]
+            if msg.sender != "agent":
+                budget = SCAN_MAX_SESSION_CHARS - session.scannedChars
+                if budget <= 0:
+                    continue
+                text = text[:budget]
+                session.scannedChars += len(text)
+                if session.scannedChars >= SCAN_MAX_SESSION_CHARS:
+                    SCAN_CAPPED.inc()
+                    logger.info(
+                        "Session %s reached SCAN_MAX_SESSION_CHARS (%d); "
+                        "its later scammer messages are not scanned for IOCs",
+                        session.sessionId,
+                        SCAN_MAX_SESSION_CHARS,
+                    )
+
+            for field, found in cls._scan(text.lower()).items():
+                if found:
+                    ioc_sets.setdefault(field, set()).update(found)
+                    if index is not None:
+                        index.add(session.sessionId, field, found)
+
+        return cls._to_intelligence(ioc_sets)
@@ -0,0 +1,181 @@
+import re
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app.config import IOC_INDEX_TTL_SECONDS
+
+# Indexed kinds and the ExtractedIntelligence field each comes from
+IOC_KINDS = {
+    "upi": "upiIds",
+    "phone": "phoneNumbers",
+    "domain": "phishingLinks",
+    "account": "bankAccounts",
+}
+FIELD_KINDS = {field: kind for kind, field in IOC_KINDS.items()}
+
+PRUNE_INTERVAL_SECONDS = 600.0
+
+_NON_DIGIT_RE = re.compile(r"\D")
+_NON_ALNUM_RE = re.compile(r"[^0-9a-z]")
+
+
+def normalize_ioc(kind: str, value: str) -> Optional[str]:
+    """
+    Canonical form used as the index key, or None if `value` cannot be
+    a `kind` IOC. Phone numbers keep their last 10 digits (so +91 98...,
+    098... and 98... meet), links reduce to their host without "www.",
+    account numbers and IFSC codes to lowercase letters and digits.
+    """
+    value = value.strip().lower()
+    if kind == "upi":
+        return value if "@" in value else None
+    if kind == "phone":
+        digits = _NON_DIGIT_RE.sub("", value)
+        return digits[-10:] if len(digits) >= 10 else None
+    if kind == "domain":
+        host = urlsplit(value if "//" in value else f"//{value}").hostname
+        if not host:
+            return None
+        return host[4:] if host.startswith("www.") else host
+    if kind == "account":
+        return _NON_ALNUM_RE.sub("", value) or None
+    raise ValueError(f"Unknown IOC kind {kind!r}")
+
+
+class IOCIndex:
+    """
+    In-memory inverted index from normalized IOC values to the sessions
+    that used them, with first/last-seen times, for cross-session
+    campaign correlation.
+
+    Values are interned and sessions are stored as small integer
+    handles, so a posting is one dict entry holding a two-float list.
+    Postings not seen for `ttl_seconds` are pruned (lazily, at most every
+    PRUNE_INTERVAL_SECONDS) and a session's handle is recycled once it
+    has no postings left. All methods run on the event loop thread.
+    """
+
+    def __init__(self, ttl_seconds: float = IOC_INDEX_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        # kind -> value -> handle -> [first_seen, last_seen]
+        self._postings: Dict[str, Dict[str, Dict[int, List[float]]]] = {
+            kind: {} for kind in IOC_KINDS
+        }
+        self._handles: Dict[str, int] = {}
+        self._session_ids: List[Optional[str]] = []
+        self._refcounts: List[int] = []
+        self._free: List[int] = []
+        self._posting_count = 0
+        self._next_prune = time.time() + PRUNE_INTERVAL_SECONDS
+
+    def _handle(self, session_id: str) -> int:
+        handle = self._handles.get(session_id)
+        if handle is None:
+            session_id = sys.intern(session_id)
+            if self._free:
+                handle = self._free.pop()
+                self._session_ids[handle] = session_id
+            else:
+                handle = len(self._session_ids)
+                self._session_ids.append(session_id)
+                self._refcounts.append(0)
+            self._handles[session_id] = handle
+        return handle
+
+    def add(
+        self,
+        session_id: str,
+        field: str,
+        values: Iterable[str],
+        now: Optional[float] = None,
+    ) -> None:
+        """Record sightings of raw `field` values (ExtractedIntelligence names)."""
+        kind = FIELD_KINDS.get(field)
+        if kind is None:
+            return
+        now = time.time() if now is None else now
+        postings = self._postings[kind]
+        handle = None
+
+        for raw in values:
+            value = normalize_ioc(kind, raw)
+            if value is None:
+                continue
+            if handle is None:
+                handle = self._handle(session_id)
+            sessions = postings.get(value)
+            if sessions is None:
+                sessions = postings[sys.intern(value)] = {}
+            seen = sessions.get(handle)
+            if seen is None:
+                sessions[handle] = [now, now]
+                self._refcounts[handle] += 1
+                self._posting_count += 1
+            else:
+                seen[1] = now
+
+        if now >= self._next_prune:
+            self.prune(now)
+
+    def lookup(
+        self, kind: str, value: str, limit: Optional[int] = None
+    ) -> Tuple[Optional[str], List[Dict]]:
+        """
+        (normalized value, sessions that used it, most recent first).
+        The normalized value is None when `value` is not a valid `kind`.
+        """
+        normalized = normalize_ioc(kind, value)
+        if normalized is None:
+            return None, []
+        sessions = self._postings[kind].get(normalized)
+        if not sessions:
+            return normalized, []
+
+        matches = sorted(sessions.items(), key=lambda item: item[1][1], reverse=True)
+        if limit is not None:
+            matches = matches[:limit]
+        return normalized, [
+            {
+                "sessionId": self._session_ids[handle],
+                "firstSeen": first,
+                "lastSeen": last,
+            }
+            for handle, (first, last) in matches
+        ]
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drop postings last seen more than ttl_seconds ago."""
+        now = time.time() if now is None else now
+        cutoff = now - self.ttl_seconds
+        removed = 0
+        for postings in self._postings.values():
+            for value in list(postings):
+                sessions = postings[value]
+                for handle in [h for h, seen in sessions.items() if seen[1] < cutoff]:
+                    del sessions[handle]
+                    removed += 1
+                    self._release(handle)
+                if not sessions:
+                    del postings[value]
+        self._next_prune = now + PRUNE_INTERVAL_SECONDS
+        return removed
+
+    def _release(self, handle: int) -> None:
+        self._posting_count -= 1
+        self._refcounts[handle] -= 1
+        if self._refcounts[handle] == 0:
+            del self._handles[self._session_ids[handle]]
+            self._session_ids[handle] = None
+            self._free.append(handle)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "values": sum(len(p) for p in self._postings.values()),
+            "postings": self._posting_count,
+            "sessions": len(self._handles),
+        }
+
+
+ioc_index = IOCIndex()
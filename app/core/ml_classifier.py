@@ -0,0 +1,341 @@
+"""
+Learned alternative to the rule-based ScamDetector: hashed character
+and word n-grams scored by a linear model, one logistic output for
+"scam" and one per category.
+
+Texts are featurized a whole batch at a time: character and word
+n-grams are hashed with NumPy over one concatenated byte buffer and kept
+as sparse (row, column, value) triples, so scoring thousands of messages
+is a handful of array operations. Models are trained offline
+(`python -m app.tools.train_scam_model`) and stored as a compressed .npz.
+"""
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_N_FEATURES = 1 << 18
+DEFAULT_CHAR_NGRAMS = (3, 5)
+DEFAULT_WORD_NGRAMS = (1, 2)
+DEFAULT_THRESHOLD = 0.5
+
+# 64-bit FNV prime; odd, so it also serves as the base of the word
+# polynomial hash, whose inverse powers need an odd base mod 2**64
+_PRIME = np.uint64(0x100000001B3)
+_PRIME_INVERSE = np.uint64(pow(0x100000001B3, -1, 1 << 64))
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_WORD_SALT = 0x5F3759DF
+
+
+def _powers(base: np.uint64, n: int) -> np.ndarray:
+    """[1, base, base**2, ...] (n values), wrapping mod 2**64."""
+    out = np.ones(n, dtype=np.uint64)
+    if n > 1:
+        out[1:] = np.cumprod(np.full(n - 1, base, dtype=np.uint64))
+    return out
+
+
+def _combine(
+    hashes: np.ndarray, rows: np.ndarray, n: int, seed: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    FNV-1a over each run of `n` consecutive values (bytes or word
+    hashes) that lies within one row.
+    """
+    count = len(hashes) - n + 1
+    if count <= 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty.astype(np.uint64)
+    h = np.full(count, np.uint64(seed), dtype=np.uint64)
+    for k in range(n):
+        h = (h ^ hashes[k:k + count]) * _PRIME
+    valid = rows[:count] == rows[n - 1:]
+    return rows[:count][valid], h[valid]
+
+
+class SparseRows:
+    """
+    Rows of hashed feature columns, CSR-style: row i is the bag
+    `cols[indptr[i]:indptr[i + 1]]` (a repeated column counts twice)
+    times `scale[i]`.
+    """
+
+    __slots__ = ("indptr", "cols", "scale")
+
+    def __init__(self, indptr: np.ndarray, cols: np.ndarray, scale: np.ndarray):
+        self.indptr = indptr
+        self.cols = cols
+        self.scale = scale
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.indptr) - 1
+
+    def row_ids(self) -> np.ndarray:
+        return np.repeat(np.arange(self.n_rows), np.diff(self.indptr))
+
+    def dot(self, weights: np.ndarray) -> np.ndarray:
+        """(n_rows, n_features) @ (n_features, k) -> (n_rows, k)."""
+        out = np.zeros((self.n_rows, weights.shape[1]), dtype=np.float32)
+        nonempty = np.flatnonzero(np.diff(self.indptr))
+        if len(nonempty):
+            # np.take is much faster than fancy indexing for row gathers
+            gathered = np.take(weights, self.cols, axis=0)
+            out[nonempty] = np.add.reduceat(
+                gathered, self.indptr[nonempty], axis=0
+            )
+        return out * self.scale[:, None]
+
+    def slice(self, start: int, stop: int) -> "SparseRows":
+        lo, hi = self.indptr[start], self.indptr[stop]
+        return SparseRows(
+            self.indptr[start:stop + 1] - lo,
+            self.cols[lo:hi],
+            self.scale[start:stop],
+        )
+
+
+class HashedNgramVectorizer:
+    """
+    Maps texts to hashed n-gram counts scaled by 1/sqrt(n-grams in the
+    text): character n-grams over the lowercased UTF-8 bytes (with a
+    space on either side, so word edges are captured) and word n-grams
+    over runs of ASCII letters, digits, `_` and non-ASCII bytes.
+
+    The whole batch is hashed in NumPy over one concatenated byte
+    buffer; word hashes come from polynomial prefix sums, so no Python
+    code runs per word. Stateless: the same settings always give the
+    same columns, across processes and restarts.
+    """
+
+    def __init__(
+        self,
+        n_features: int = DEFAULT_N_FEATURES,
+        char_ngrams: Tuple[int, int] = DEFAULT_CHAR_NGRAMS,
+        word_ngrams: Tuple[int, int] = DEFAULT_WORD_NGRAMS,
+    ):
+        self.n_features = n_features
+        self.char_ngrams = tuple(char_ngrams)
+        self.word_ngrams = tuple(word_ngrams)
+
+    def _char_hashes(
+        self, buf: np.ndarray, row_of: np.ndarray
+    ) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        rows, hashes = [], []
+        lo, hi = self.char_ngrams
+        for n in range(lo, hi + 1):
+            r, h = _combine(buf, row_of, n, n)
+            rows.append(r)
+            hashes.append(h)
+        return rows, hashes
+
+    def _word_hashes(
+        self, buf: np.ndarray, row_of: np.ndarray
+    ) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        is_word = (
+            ((buf >= ord("0")) & (buf <= ord("9")))
+            | ((buf >= ord("a")) & (buf <= ord("z")))
+            | (buf == ord("_"))
+            | (buf >= 0x80)
+        )
+        # Every text starts and ends with a space, so edges pair up
+        edges = np.diff(is_word.astype(np.int8))
+        starts = np.flatnonzero(edges == 1) + 1
+        ends = np.flatnonzero(edges == -1) + 1
+
+        # hash(word) = sum(b[j] * P**(end-1-j)), from prefix sums of b[j] * P**-j
+        prefix = np.zeros(len(buf) + 1, dtype=np.uint64)
+        np.cumsum(buf * _powers(_PRIME_INVERSE, len(buf)), out=prefix[1:])
+        words = (prefix[ends] - prefix[starts]) * _powers(_PRIME, len(buf) + 1)[ends - 1]
+        word_rows = row_of[starts]
+
+        rows, hashes = [], []
+        lo, hi = self.word_ngrams
+        for n in range(lo, hi + 1):
+            r, h = _combine(words, word_rows, n, _WORD_SALT + n)
+            rows.append(r)
+            hashes.append(h)
+        return rows, hashes
+
+    def transform(self, texts: Sequence[str]) -> SparseRows:
+        encoded = [f" {t.lower()} ".encode("utf-8") for t in texts]
+        lengths = np.fromiter((len(b) for b in encoded), np.int64, len(encoded))
+        buf = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+        row_of = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+
+        char_rows, char_hashes = self._char_hashes(buf, row_of)
+        word_rows, word_hashes = self._word_hashes(buf, row_of)
+        rows = np.concatenate([*char_rows, *word_rows])
+        h = np.concatenate([*char_hashes, *word_hashes])
+
+        # Fold the high bits in before taking the low ones
+        h ^= h >> np.uint64(29)
+        h *= _MIX
+        h ^= h >> np.uint64(32)
+        cols = (h % np.uint64(self.n_features)).astype(np.int64)
+
+        # Each block above is already in row order, so this sort is cheap
+        cols = cols[np.argsort(rows, kind="stable")]
+        per_row = np.bincount(rows, minlength=len(texts))
+        indptr = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum(per_row, out=indptr[1:])
+        scale = (1.0 / np.sqrt(np.maximum(per_row, 1))).astype(np.float32)
+        return SparseRows(indptr, cols, scale)
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -30.0, 30.0)))
+
+
+class LinearScamClassifier:
+    """
+    Drop-in for ScamDetector: `detect_scam(text)` returns
+    (is_scam, categories, confidence), where confidence is the model's
+    scam probability and categories are those scoring at least
+    `category_threshold`, most likely first. `detect_batch` does the
+    same for many texts in one vectorized pass.
+
+    Column 0 of `weights` is the scam output; column i + 1 belongs to
+    `categories[i]`.
+    """
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        bias: np.ndarray,
+        categories: Sequence[str],
+        vectorizer: Optional[HashedNgramVectorizer] = None,
+        threshold: float = DEFAULT_THRESHOLD,
+        category_threshold: float = DEFAULT_THRESHOLD,
+    ):
+        self.vectorizer = vectorizer or HashedNgramVectorizer(weights.shape[0])
+        if weights.shape != (self.vectorizer.n_features, len(categories) + 1):
+            raise ValueError(
+                f"weights shape {weights.shape} does not match "
+                f"{self.vectorizer.n_features} features x {len(categories) + 1} outputs"
+            )
+        self.weights = weights.astype(np.float32, copy=False)
+        self.bias = bias.astype(np.float32, copy=False)
+        self.categories = list(categories)
+        self.threshold = threshold
+        self.category_threshold = category_threshold
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """(len(texts), 1 + len(categories)) probabilities."""
+        if not texts:
+            return np.zeros((0, len(self.categories) + 1), dtype=np.float32)
+        x = self.vectorizer.transform(texts)
+        return _sigmoid(x.dot(self.weights) + self.bias)
+
+    def detect_batch(
+        self, texts: Sequence[str]
+    ) -> List[Tuple[bool, List[str], float]]:
+        proba = self.predict_proba(texts)
+        confidence = proba[:, 0].tolist()
+        category_proba = proba[:, 1:]
+        order = np.argsort(-category_proba, axis=1)
+        above = np.take_along_axis(
+            category_proba >= self.category_threshold, order, axis=1
+        )
+        names = self.categories
+        return [
+            (c >= self.threshold, [names[i] for i in o[a]], c)
+            for c, o, a in zip(confidence, order, above)
+        ]
+
+    def detect_scam(self, text: str) -> Tuple[bool, List[str], float]:
+        return self.detect_batch([text])[0]
+
+    # ─────────────────────────────────────────────
+    # Persistence
+    # ─────────────────────────────────────────────
+
+    def save(self, path: str) -> None:
+        v = self.vectorizer
+        # float16 halves the file; scores move by well under 1e-3
+        np.savez_compressed(
+            path,
+            weights=self.weights.astype(np.float16),
+            bias=self.bias,
+            categories=np.asarray(self.categories, dtype=str),
+            ngrams=np.asarray([*v.char_ngrams, *v.word_ngrams], dtype=np.int64),
+            thresholds=np.asarray(
+                [self.threshold, self.category_threshold], dtype=np.float64
+            ),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "LinearScamClassifier":
+        with np.load(path, allow_pickle=False) as f:
+            weights = f["weights"].astype(np.float32)
+            char_lo, char_hi, word_lo, word_hi = (int(n) for n in f["ngrams"])
+            threshold, category_threshold = (float(t) for t in f["thresholds"])
+            return cls(
+                weights,
+                f["bias"],
+                [str(c) for c in f["categories"]],
+                HashedNgramVectorizer(
+                    weights.shape[0], (char_lo, char_hi), (word_lo, word_hi)
+                ),
+                threshold=threshold,
+                category_threshold=category_threshold,
+            )
+
+
+def train(
+    texts: Sequence[str],
+    is_scam: Sequence[bool],
+    categories: Sequence[Sequence[str]],
+    *,
+    vectorizer: Optional[HashedNgramVectorizer] = None,
+    epochs: int = 5,
+    learning_rate: float = 0.5,
+    l2: float = 1e-6,
+    batch_size: int = 256,
+    seed: int = 0,
+) -> LinearScamClassifier:
+    """
+    Fit one logistic output per label with mini-batch AdaGrad, which
+    suits hashed features: rare n-grams keep a large step size while
+    common ones settle. Only the weight rows a batch touches are updated.
+    """
+    vectorizer = vectorizer or HashedNgramVectorizer()
+    names = sorted({c for cats in categories for c in cats})
+    column = {name: i + 1 for i, name in enumerate(names)}
+
+    order = np.random.default_rng(seed).permutation(len(texts))
+    x = vectorizer.transform([texts[i] for i in order])
+    y = np.zeros((len(texts), len(names) + 1), dtype=np.float32)
+    for row, i in enumerate(order):
+        y[row, 0] = bool(is_scam[i])
+        for c in categories[i]:
+            y[row, column[c]] = 1.0
+
+    outputs = y.shape[1]
+    weights = np.zeros((vectorizer.n_features, outputs), dtype=np.float32)
+    bias = np.zeros(outputs, dtype=np.float32)
+    g2_weights = np.zeros_like(weights)
+    g2_bias = np.zeros_like(bias)
+    eps = 1e-8
+
+    for _ in range(epochs):
+        for start in range(0, x.n_rows, batch_size):
+            stop = min(start + batch_size, x.n_rows)
+            batch = x.slice(start, stop)
+            error = _sigmoid(batch.dot(weights) + bias) - y[start:stop]
+
+            touched, inverse = np.unique(batch.cols, return_inverse=True)
+            grad = np.zeros((len(touched), outputs), dtype=np.float32)
+            row_error = error * batch.scale[:, None]
+            np.add.at(grad, inverse, row_error[batch.row_ids()])
+            grad /= stop - start
+            grad += l2 * weights[touched]
+            grad_bias = error.mean(axis=0)
+
+            g2_weights[touched] += grad * grad
+            weights[touched] -= (
+                learning_rate * grad / (np.sqrt(g2_weights[touched]) + eps)
+            )
+            g2_bias += grad_bias * grad_bias
+            bias -= learning_rate * grad_bias / (np.sqrt(g2_bias) + eps)
+
+    return LinearScamClassifier(weights, bias, names, vectorizer)
@@ -1,11 +1,173 @@
+import logging
 import re
-from typing import List, Tuple
+from typing import List, Optional, Pattern, Sequence, Tuple
+
+from app.config import SCAM_CLASSIFIER, SCAM_MODEL_PATH
+
+logger = logging.getLogger(__name__)
+
+_REGEX_META = set(".^$*+?{}[]|()\\")
+
+LINK_RE = re.compile(r"http[s]?://")
+PHONE_RE = re.compile(r"\+?[0-9]{10,13}")
+
+# `head(?!.*a|.*b)`
+_NEGATIVE_TAIL_RE = re.compile(
+    r"^(?P<head>[^()|]+)\(\?!(?P<alts>\.\*[^()|]+(?:\|\.\*[^()|]+)*)\)$"
+)
+
+
+def _required_literals(pattern: str) -> List[str]:
+    """
+    Literal substrings that must appear in any text the pattern matches.
+
+    Only the leading literal run of each `.*`-separated piece is taken,
+    which is enough to reject most texts with a plain `in` check before
+    the regex engine is touched. Scanning stops at the first construct
+    that is not a plain literal, so groups and lookarounds never
+    contribute.
+    """
+    if "|" in pattern:
+        return []
+
+    literals = []
+    for piece in pattern.split(".*"):
+        run = []
+        complete = True
+        i = 0
+        while i < len(piece):
+            ch = piece[i]
+            if ch == "\\" and i + 1 < len(piece) and piece[i + 1] in _REGEX_META:
+                run.append(piece[i + 1])
+                i += 2
+                continue
+            if ch in _REGEX_META:
+                # A quantifier makes the preceding character optional
+                if ch in "?*{" and run:
+                    run.pop()
+                complete = False
+                break
+            run.append(ch)
+            i += 1
+        if run:
+            literals.append("".join(run))
+        if not complete:
+            break
+    return literals
+
+
+def _as_literal(piece: str) -> Optional[str]:
+    """`piece` as plain text if it has no regex constructs, else None."""
+    chars = []
+    i = 0
+    while i < len(piece):
+        ch = piece[i]
+        if ch == "\\" and i + 1 < len(piece) and piece[i + 1] in _REGEX_META:
+            chars.append(piece[i + 1])
+            i += 2
+            continue
+        if ch in _REGEX_META:
+            return None
+        chars.append(ch)
+        i += 1
+    return "".join(chars) or None
+
+
+def _literal_chain(pattern: str) -> Optional[List[str]]:
+    """
+    For patterns made only of literals joined by `.*`, the literals in
+    order; None for anything else.
+    """
+    chain = [_as_literal(piece) for piece in pattern.split(".*")]
+    return chain if all(chain) else None
+
+
+def _line_end(text: str, pos: int) -> int:
+    end = text.find("\n", pos)
+    return len(text) if end < 0 else end
+
+
+class _CompiledPattern:
+    """
+    A detection pattern matched in time linear in the text.
+
+    `re.search` on `a.*b` restarts the `.*` scan at every "a", which is
+    quadratic on a long line full of them. Literal chains are matched
+    with `str.find` instead: taking the first occurrence of each literal
+    after the previous one, within one line (`.` stops at newlines), is
+    enough to decide whether the regex would match. A pattern ending in a
+    negative lookahead of `.*literal` alternatives is decided by the last
+    head match on each line, the one whose rest of line is shortest.
+    Anything else falls back to the regex.
+    """
+
+    __slots__ = ("regex", "literals", "chain", "head", "excluded")
+
+    def __init__(self, pattern: str):
+        self.regex: Pattern = re.compile(pattern)
+        self.literals = tuple(_required_literals(pattern))
+        self.chain = _literal_chain(pattern)
+        self.head: Optional[Pattern] = None
+        self.excluded: Tuple[str, ...] = ()
+
+        tail = _NEGATIVE_TAIL_RE.match(pattern)
+        if tail and ".*" not in tail.group("head"):
+            alts = tail.group("alts").split("|")
+            excluded = [_as_literal(alt[len(".*"):]) for alt in alts]
+            if all(excluded):
+                self.head = re.compile(tail.group("head"))
+                self.excluded = tuple(excluded)
+
+    def search(self, text: str) -> bool:
+        for literal in self.literals:
+            if literal not in text:
+                return False
+        if self.chain is not None:
+            return self._search_chain(text)
+        if self.head is not None:
+            return self._search_tail(text)
+        return self.regex.search(text) is not None
+
+    def _search_chain(self, text: str) -> bool:
+        first, rest = self.chain[0], self.chain[1:]
+        pos = 0
+        while True:
+            start = text.find(first, pos)
+            if start < 0:
+                return False
+            end = _line_end(text, start)
+            at = start + len(first)
+            for literal in rest:
+                at = text.find(literal, at, end)
+                if at < 0:
+                    break
+                at += len(literal)
+            else:
+                return True
+            pos = end + 1
+
+    def _search_tail(self, text: str) -> bool:
+        last_end = -1
+        line_end = -1
+        for match in self.head.finditer(text):
+            if match.start() > line_end:
+                if last_end >= 0 and self._tail_clear(text, last_end, line_end):
+                    return True
+                line_end = _line_end(text, match.end())
+            last_end = match.end()
+        return last_end >= 0 and self._tail_clear(text, last_end, line_end)
+
+    def _tail_clear(self, text: str, start: int, end: int) -> bool:
+        return all(text.find(literal, start, end) < 0 for literal in self.excluded)
 
 
 class ScamDetector:
     """
     Rule-based scam detection engine.
     Stateless and deterministic.
+
+    Patterns are compiled once per instance and gated by their required
+    literals, so on most turns only a handful of substring checks run.
     """
 
     def __init__(self):
@@ -78,6 +240,11 @@ class ScamDetector:
             "refund",
         ]
 
+        self._compiled = [
+            (category, [_CompiledPattern(p) for p in patterns])
+            for category, patterns in self.scam_patterns.items()
+        ]
+
     def detect_scam(self, text: str) -> Tuple[bool, List[str], float]:
         """
         Analyze text and determine scam likelihood.
@@ -90,9 +257,9 @@ class ScamDetector:
         total_matches = 0
 
         # Pattern matching
-        for category, patterns in self.scam_patterns.items():
+        for category, patterns in self._compiled:
             for pattern in patterns:
-                if re.search(pattern, text_lower):
+                if pattern.search(text_lower):
                     if category not in detected_categories:
                         detected_categories.append(category)
                     total_matches += 1
@@ -101,8 +268,8 @@ class ScamDetector:
         confidence = min(total_matches * 0.15, 1.0)
 
         # Additional indicators
-        has_link = bool(re.search(r"http[s]?://", text_lower))
-        has_phone = bool(re.search(r"\+?[0-9]{10,13}", text_lower))
+        has_link = LINK_RE.search(text_lower) is not None
+        has_phone = PHONE_RE.search(text_lower) is not None
         keyword_hits = sum(1 for kw in self.suspicious_keywords if kw in text_lower)
 
         if has_link:
@@ -121,3 +288,36 @@ class ScamDetector:
         is_scam = confidence >= 0.3 or len(detected_categories) >= 2
 
         return is_scam, detected_categories, confidence
+
+    def detect_batch(
+        self, texts: Sequence[str]
+    ) -> List[Tuple[bool, List[str], float]]:
+        return [self.detect_scam(text) for text in texts]
+
+
+def build_scam_detector():
+    """
+    The detector selected by SCAM_CLASSIFIER. Both kinds expose
+    `detect_scam(text) -> (is_scam, categories, confidence)` and
+    `detect_batch(texts)`, the same for many texts at once.
+    """
+    if SCAM_CLASSIFIER == "ml":
+        from app.core.ml_classifier import LinearScamClassifier
+
+        try:
+            classifier = LinearScamClassifier.load(SCAM_MODEL_PATH)
+        except (OSError, KeyError, ValueError) as e:
+            logger.error(
+                "Could not load scam model %s, using rules: %s", SCAM_MODEL_PATH, e
+            )
+        else:
+            logger.info(
+                "Loaded scam model %s (%d features, categories: %s)",
+                SCAM_MODEL_PATH,
+                classifier.vectorizer.n_features,
+                ", ".join(classifier.categories),
+            )
+            return classifier
+    elif SCAM_CLASSIFIER != "rules":
+        logger.warning("Unknown SCAM_CLASSIFIER %r, using rules", SCAM_CLASSIFIER)
+    return ScamDetector()
@@ -0,0 +1,234 @@
+import random
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import (
+    SCRIPT_INDEX_MAX_SCRIPTS,
+    SCRIPT_MIN_SIMILARITY,
+    SCRIPT_MIN_WORDS,
+    SCRIPT_REPLY_VARIANTS,
+)
+from app.llm.reply_cache import normalize_text
+
+Verdict = Tuple[bool, List[str], float]
+
+SIGNATURE_SIZE = 64
+BAND_ROWS = 4
+SAMPLE_CHARS = 160
+
+_rng = np.random.default_rng(0x5C819)
+_MULTIPLIERS = _rng.integers(0, 2**63, SIGNATURE_SIZE, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_OFFSETS = _rng.integers(0, 2**63, SIGNATURE_SIZE, dtype=np.uint64)
+
+
+def minhash(words: List[str]) -> np.ndarray:
+    """
+    MinHash signature over word unigrams and bigrams. The fraction of
+    positions two signatures agree on estimates the Jaccard similarity
+    of their feature sets, so swapping a name or two in a 20-word
+    script keeps them ~85% alike.
+    """
+    features = set(words)
+    features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    # str hashes are salted per process, which is fine for an index
+    # that never leaves it
+    hashes = np.fromiter(
+        map(hash, features), dtype=np.int64, count=len(features)
+    ).view(np.uint64)
+    return (hashes[:, None] * _MULTIPLIERS + _OFFSETS).min(axis=0)
+
+
+class Script:
+    """One family of near-identical scammer messages."""
+
+    __slots__ = (
+        "id",
+        "signature",
+        "sample",
+        "verdict",
+        "replies",
+        "hits",
+        "first_seen",
+        "last_seen",
+    )
+
+    def __init__(self, script_id: int, signature: np.ndarray, sample: str, now: float):
+        self.id = script_id
+        self.signature = signature
+        self.sample = sample
+        self.verdict: Optional[Verdict] = None
+        # persona -> reply variants
+        self.replies: Dict[str, List[str]] = {}
+        self.hits = 1
+        self.first_seen = now
+        self.last_seen = now
+
+    def summary(self) -> Dict:
+        is_scam, categories, confidence = self.verdict or (None, [], None)
+        return {
+            "id": self.id,
+            "sample": self.sample,
+            "hits": self.hits,
+            "scamDetected": is_scam,
+            "scamCategories": categories,
+            "confidence": confidence,
+            "replyVariants": sum(len(r) for r in self.replies.values()),
+            "firstSeen": self.first_seen,
+            "lastSeen": self.last_seen,
+        }
+
+
+class ScriptIndex:
+    """
+    Bounded index of recurring scammer scripts keyed by MinHash.
+
+    A message belongs to a known script when their signatures agree on
+    at least `min_similarity` of positions. Candidates come from banded
+    LSH: signatures are cut into bands of BAND_ROWS values and scripts
+    sharing any whole band are compared. With 16 bands of 4, pairs ~60%
+    alike or more are found almost always, pairs under ~30% rarely even
+    become candidates. Lookup is one dict probe per band plus a vector
+    compare per candidate.
+
+    Each script keeps the detection verdict of its first message
+    classified as a scam and up to `reply_variants` LLM replies per persona. The
+    least recently matched script is evicted beyond `max_scripts`. All
+    methods run on the event loop thread.
+    """
+
+    def __init__(
+        self,
+        max_scripts: int = SCRIPT_INDEX_MAX_SCRIPTS,
+        min_similarity: float = SCRIPT_MIN_SIMILARITY,
+        min_words: int = SCRIPT_MIN_WORDS,
+        reply_variants: int = SCRIPT_REPLY_VARIANTS,
+        explore_probability: float = 0.5,
+    ):
+        self.max_scripts = max_scripts
+        self.min_similarity = min_similarity
+        self.min_words = min_words
+        self.reply_variants = reply_variants
+        self.explore_probability = explore_probability
+
+        self._bands: List[Dict[bytes, List[int]]] = [
+            {} for _ in range(SIGNATURE_SIZE // BAND_ROWS)
+        ]
+        self._scripts: "OrderedDict[int, Script]" = OrderedDict()
+        self._next_id = 1
+
+        self.matches = 0
+        self.misses = 0
+        self.skipped = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _band_keys(signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[i:i + BAND_ROWS].tobytes()
+            for i in range(0, SIGNATURE_SIZE, BAND_ROWS)
+        ]
+
+    def observe(self, text: str) -> Optional[Script]:
+        """
+        The script `text` belongs to, registering a new one if none is
+        close enough. None for messages too short to fingerprint.
+        """
+        words = normalize_text(text).split()
+        if len(words) < self.min_words:
+            self.skipped += 1
+            return None
+
+        signature = minhash(words)
+        keys = self._band_keys(signature)
+        now = time.time()
+
+        candidates = set()
+        for band, key in zip(self._bands, keys):
+            candidates.update(band.get(key, ()))
+
+        best: Optional[Script] = None
+        best_similarity = self.min_similarity
+        for script_id in candidates:
+            script = self._scripts[script_id]
+            similarity = np.count_nonzero(script.signature == signature) / SIGNATURE_SIZE
+            if similarity >= best_similarity:
+                best, best_similarity = script, similarity
+
+        if best is not None:
+            self.matches += 1
+            best.hits += 1
+            best.last_seen = now
+            self._scripts.move_to_end(best.id)
+            return best
+
+        self.misses += 1
+        script = Script(self._next_id, signature, " ".join(words)[:SAMPLE_CHARS], now)
+        self._next_id += 1
+        self._scripts[script.id] = script
+        for band, key in zip(self._bands, keys):
+            band.setdefault(key, []).append(script.id)
+
+        while len(self._scripts) > self.max_scripts:
+            self._evict(next(iter(self._scripts)))
+        return script
+
+    def _evict(self, script_id: int) -> None:
+        script = self._scripts.pop(script_id)
+        for band, key in zip(self._bands, self._band_keys(script.signature)):
+            ids = band[key]
+            ids.remove(script_id)
+            if not ids:
+                del band[key]
+        self.evictions += 1
+
+    def get(self, script_id: Optional[int]) -> Optional[Script]:
+        return self._scripts.get(script_id) if script_id is not None else None
+
+    def candidate_reply(self, script_id: Optional[int], persona: str) -> Optional[str]:
+        """
+        A stored reply for this script and persona, or None. While a
+        script is still short of variants, `explore_probability` of calls
+        return None so a fresh reply gets generated and added.
+        """
+        script = self.get(script_id)
+        if script is None:
+            return None
+        variants = script.replies.get(persona)
+        if not variants:
+            return None
+        if (
+            len(variants) < self.reply_variants
+            and random.random() < self.explore_probability
+        ):
+            return None
+        return random.choice(variants)
+
+    def add_reply(self, script_id: Optional[int], persona: str, reply: str) -> None:
+        script = self.get(script_id)
+        if script is None:
+            return
+        variants = script.replies.setdefault(persona, [])
+        if reply not in variants:
+            if len(variants) >= self.reply_variants:
+                variants.pop(0)
+            variants.append(reply)
+
+    def top(self, limit: int = 20) -> List[Dict]:
+        """Most frequently seen scripts, for analysts."""
+        scripts = sorted(self._scripts.values(), key=lambda s: s.hits, reverse=True)
+        return [s.summary() for s in scripts[:limit]]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "scripts": len(self._scripts),
+            "matches": self.matches,
+            "misses": self.misses,
+            "skipped": self.skipped,
+            "evictions": self.evictions,
+        }
+
+
+script_index = ScriptIndex()
@@ -1,49 +1,52 @@
-import time
-from typing import Dict, List, Optional
+import asyncio
+from typing import List, Optional
+from app.config import REDIS_ENABLED, REDIS_URL
+from app.storage.base import SessionStore
+from app.storage.memory import InMemorySessionStore
 from app.storage.models import SessionState, Message
-from threading import Lock
 SESSION_TTL_SECONDS = 3600  
+SWEEP_INTERVAL_SECONDS = 30
 
 
 class SessionManager:
     """
-    In-memory session manager.
+    Session manager facade over a pluggable SessionStore.
     Can be swapped with Redis / DB without touching API code.
     """
 
-    def __init__(self):
-        self._sessions: Dict[str, SessionState] = {}
-        self._lock = Lock()
+    def __init__(self, store: Optional[SessionStore] = None):
+        if store is None:
+            store = InMemorySessionStore(SESSION_TTL_SECONDS)
+        self.store = store
 
     # ─────────────────────────────────────────────
     # Session lifecycle
     # ─────────────────────────────────────────────
 
-    def get_or_create(self, session_id: str) -> SessionState:
-        with self._lock:
-            self._cleanup_expired()
-            if session_id not in self._sessions:
-                self._sessions[session_id] = SessionState(
-                    sessionId=session_id,
-                    scamDetected=False,
-                    totalMessagesExchanged=0,
-                    agentNotes=None,
-                )
-            return self._sessions[session_id]
-
-    def get(self, session_id: str) -> SessionState | None:
-        return self._sessions.get(session_id)
+    async def get_or_create(self, session_id: str) -> SessionState:
+        return await self.store.get_or_create(session_id)
+
+    async def get(self, session_id: str) -> SessionState | None:
+        return await self.store.get(session_id)
+
+    async def save(self, session: SessionState) -> None:
+        """Persist state changes made during a turn."""
+        await self.store.save(session)
+
+    async def mark_callback_sent(self, session_id: str) -> None:
+        await self.store.set_fields(session_id, callbackSent=True)
 
     # ─────────────────────────────────────────────
     # Message handling
     # ─────────────────────────────────────────────
 
-    def add_message(self, session: SessionState, message: Message) -> None:
+    async def add_message(self, session: SessionState, message: Message) -> None:
         """
         Appends the message to server-side history and updates the counter.
         """
         session.conversationHistory.append(message)
         session.totalMessagesExchanged += 1
+        await self.store.append_messages(session, [message])
 
     # ─────────────────────────────────────────────
     # Scam state
@@ -73,15 +76,11 @@ class SessionManager:
     # Expiration
     # ─────────────────────────────────────────────
 
-    def _cleanup_expired(self) -> None:
-        """Remove sessions older than TTL. Called under lock."""
-        now = time.time()
-        expired = [
-            sid for sid, s in self._sessions.items()
-            if now - s.createdAt > SESSION_TTL_SECONDS
-        ]
-        for sid in expired:
-            del self._sessions[sid]
+    async def run_sweeper(self, interval: float = SWEEP_INTERVAL_SECONDS) -> None:
+        """Background task that periodically expires idle sessions."""
+        while True:
+            await asyncio.sleep(interval)
+            self.store.sweep_expired()
 
     # ─────────────────────────────────────────────
     # Serialization helpers
@@ -101,8 +100,17 @@ class SessionManager:
         }
 
 
+def create_session_store() -> SessionStore:
+    """Pick the session backend from config (REDIS_ENABLED)."""
+    if REDIS_ENABLED:
+        from app.storage.redis import RedisSessionStore
+
+        return RedisSessionStore(REDIS_URL, ttl_seconds=SESSION_TTL_SECONDS)
+    return InMemorySessionStore(SESSION_TTL_SECONDS)
+
+
 # ─────────────────────────────────────────────
 # Singleton instance (import-safe)
 # ─────────────────────────────────────────────
 
-session_manager = SessionManager()
+session_manager = SessionManager(create_session_store())
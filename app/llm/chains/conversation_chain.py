@@ -1,14 +1,118 @@
 import logging
 import random
 import re
-from typing import Dict, List
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
-from app.core.persona import PersonaManager
-from app.llm.prompts.honeypot_prompt import HONEYPOT_PROMPT
-from app.llm.providers.hugging_face import generate_text
+from app.config import (
+    HEDGE_MAX_DELAY_MS,
+    HEDGE_MIN_DELAY_MS,
+    HEDGE_QUANTILE,
+    LLM_PROVIDERS,
+    REPLY_CACHE_ENABLED,
+    REPLY_CACHE_MAX_ENTRIES,
+    REPLY_CACHE_TTL_SECONDS,
+    REPLY_CACHE_VARIANTS,
+)
+from app.core.admission import LLMAdmission, LLMBusyError
+from app.core.script_index import ScriptIndex
+from app.llm.prompts.prompt_builder import PromptBuilder
+from app.llm.providers.circuit_breaker import CircuitOpenError
+from app.llm.providers.hedged import (
+    GenerateFn,
+    StreamFn,
+    build_generator,
+    build_streamer,
+)
+from app.llm.reply_cache import ReplyCache, conversation_fingerprint
+from app.utils.metrics import REPLIES
 
 logger = logging.getLogger(__name__)
 
+# Scammer turns that make up the reply-cache key
+CACHE_CONTEXT_MESSAGES = 4
+
+MIN_REPLY_LENGTH = 8
+
+
+class ReplyStreamCleaner:
+    """
+    Incremental counterpart of ConversationAgent._clean_response for
+    streamed tokens. `feed` returns the newly cleaned text that is safe
+    to show; text that may still change (a possible "You:" label, an
+    unclosed bracket, trailing quotes) is held back. `done` turns True
+    once two sentences are complete, so the caller can stop the stream.
+    """
+
+    LABELS = ("you:", "response:", "assistant:")
+    LABEL_RE = re.compile(r"^(you:|response:|assistant:)", re.I)
+    BRACKETS_RE = re.compile(r"\(.*?\)|\[.*?\]")
+    SENTENCE_END_RE = re.compile(r"[.!?]+")
+    MAX_SENTENCES = 2
+
+    def __init__(self):
+        self._raw = ""
+        self._emitted = ""
+        self.done = False
+
+    def feed(self, token: str) -> str:
+        self._raw += token
+        return self._advance(final=False)
+
+    def finish(self) -> str:
+        """Flush held-back text once the stream has ended."""
+        return self._advance(final=True)
+
+    @property
+    def text(self) -> str:
+        return self._emitted
+
+    def _advance(self, final: bool) -> str:
+        if self.done and not final:
+            return ""
+        view = self._view(final)
+        if not view.startswith(self._emitted):
+            return ""
+        delta = view[len(self._emitted):]
+        self._emitted = view
+        return delta
+
+    def _view(self, final: bool) -> str:
+        raw = self._raw
+
+        # A label prefix can only be ruled out once enough text is in
+        lowered = raw.lower()
+        if not final and any(
+            label.startswith(lowered) for label in self.LABELS
+        ):
+            return self._emitted
+
+        text = self.LABEL_RE.sub("", raw, count=1)
+        text = text.lstrip().lstrip('"').lstrip("'")
+        text = self.BRACKETS_RE.sub("", text)
+
+        if not final:
+            # Hold back an unclosed bracket until it closes
+            cut = min(
+                (i for i in (text.find("("), text.find("[")) if i != -1),
+                default=len(text),
+            )
+            text = text[:cut]
+
+        sentences = 0
+        for match in self.SENTENCE_END_RE.finditer(text):
+            if match.end() == len(text) and not final:
+                break
+            sentences += 1
+            if sentences == self.MAX_SENTENCES:
+                text = text[:match.end()]
+                self.done = True
+                break
+
+        if final or self.done:
+            return text.strip().strip('"').strip("'").strip()
+        return text.rstrip().rstrip('"\'')
+
 
 class ConversationAgent:
     """
@@ -18,10 +122,50 @@ class ConversationAgent:
     - prompt construction
     - LLM invocation
     - response cleaning
+    - reply caching for repeated scripts (exact context, and stored
+      replies for recurring scammer messages via a ScriptIndex)
+    - LLM admission (shedding to fallback under load)
     - fallback logic
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        reply_cache: Optional[ReplyCache] = None,
+        generate_text: Optional[GenerateFn] = None,
+        admission: Optional[LLMAdmission] = None,
+        script_index: Optional[ScriptIndex] = None,
+        stream_text: Optional[StreamFn] = None,
+    ):
+        hedge_options = dict(
+            hedge_quantile=HEDGE_QUANTILE,
+            min_delay=HEDGE_MIN_DELAY_MS / 1000,
+            max_delay=HEDGE_MAX_DELAY_MS / 1000,
+        )
+        if generate_text is None:
+            generate_text = build_generator(
+                LLM_PROVIDERS,
+                is_usable=lambda raw: (
+                    len(self._clean_response(raw)) > MIN_REPLY_LENGTH
+                ),
+                **hedge_options,
+            )
+        if stream_text is None:
+            # Same providers, order and breakers as generate_text
+            stream_text = build_streamer(LLM_PROVIDERS, **hedge_options)
+        self.generate_text = generate_text
+        self.prompt_builder = PromptBuilder()
+        self.stream_text = stream_text
+        self.admission = admission or LLMAdmission()
+
+        if reply_cache is None and REPLY_CACHE_ENABLED:
+            reply_cache = ReplyCache(
+                max_entries=REPLY_CACHE_MAX_ENTRIES,
+                ttl_seconds=REPLY_CACHE_TTL_SECONDS,
+                max_variants=REPLY_CACHE_VARIANTS,
+            )
+        self.reply_cache = reply_cache
+        self.script_index = script_index
+
         self.fallback_responses = {
             "bank_fraud": [
                 "Oh no, I didn't realize my account could be blocked.",
@@ -77,11 +221,123 @@ class ConversationAgent:
     # Public API
     # ─────────────────────────────────────────────
 
-    def generate_response(self, session_data: Dict) -> str:
+    async def generate_response(self, session_data: Dict) -> str:
         """
         Main entry point used by the API layer.
         """
 
+        scam_categories = session_data.get("scamCategories", [])
+        reply, prompt, cache_key = self._prepare(session_data)
+        if reply is not None:
+            return reply
+
+        if not await self._admit(session_data):
+            return self._fallback_reply(scam_categories)
+
+        # Call LLM provider
+        try:
+            raw_response = await self.generate_text(prompt)
+            cleaned = self._clean_response(raw_response)
+
+            if cleaned and len(cleaned) > MIN_REPLY_LENGTH:
+                self._remember(session_data, cache_key, cleaned)
+                REPLIES.inc(source="llm")
+                return cleaned
+
+        except CircuitOpenError as e:
+            logger.debug("LLM skipped, using fallback: %s", e)
+
+        except Exception as e:
+            logger.warning("LLM call failed, using fallback: %s", e)
+
+        finally:
+            self.admission.release()
+
+        REPLIES.inc(source="fallback")
+        return self._fallback_reply(scam_categories)
+
+    async def stream_response(self, session_data: Dict) -> AsyncIterator[str]:
+        """
+        Streaming variant of generate_response. Yields cleaned reply text
+        as it is generated and closes the provider stream as soon as two
+        sentences are complete. Early-naive, cached and fallback replies
+        are yielded as a single chunk.
+        """
+
+        scam_categories = session_data.get("scamCategories", [])
+        reply, prompt, cache_key = self._prepare(session_data)
+        if reply is not None:
+            yield reply
+            return
+
+        if not await self._admit(session_data):
+            yield self._fallback_reply(scam_categories)
+            return
+
+        cleaner = ReplyStreamCleaner()
+        try:
+            async with aclosing(self.stream_text(prompt)) as tokens:
+                async for token in tokens:
+                    delta = cleaner.feed(token)
+                    if delta:
+                        yield delta
+                    if cleaner.done:
+                        break
+            tail = cleaner.finish()
+            if tail:
+                yield tail
+
+        except CircuitOpenError as e:
+            logger.debug("LLM stream skipped: %s", e)
+
+        except Exception as e:
+            logger.warning("LLM stream failed: %s", e)
+
+        finally:
+            self.admission.release()
+
+        if len(cleaner.text) > MIN_REPLY_LENGTH:
+            self._remember(session_data, cache_key, cleaner.text)
+        elif not cleaner.text:
+            REPLIES.inc(source="fallback")
+            yield self._fallback_reply(scam_categories)
+            return
+        REPLIES.inc(source="llm")
+
+    async def generate_background_text(self, prompt: str) -> str:
+        """
+        generate_text for work no client is waiting on (summaries). Runs
+        only when an LLM slot is free right now, so it never queues ahead
+        of replies; raises LLMBusyError otherwise.
+        """
+        if not await self.admission.try_acquire():
+            raise LLMBusyError("No free LLM slot")
+        try:
+            return await self.generate_text(prompt)
+        finally:
+            self.admission.release()
+
+    async def _admit(self, session_data: Dict) -> bool:
+        """
+        Take an LLM slot for this reply. False when the session is over
+        its rate limit (`allowLLM`, called only here, returns False) or
+        the LLM queue is full; the caller then replies with a fallback
+        and must not release.
+        """
+        allow_llm = session_data.get("allowLLM")
+        if (allow_llm is None or allow_llm()) and await self.admission.acquire():
+            return True
+        REPLIES.inc(source="shed")
+        return False
+
+    def _prepare(
+        self, session_data: Dict
+    ) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """
+        Shared front half of a reply: returns (reply, None, None) when no
+        LLM call is needed, otherwise (None, prompt, cache_key).
+        """
+
         conversation_history = session_data.get("conversationHistory", [])
         scam_categories = session_data.get("scamCategories", [])
         persona_key = session_data.get("persona", "confused_elderly")
@@ -92,27 +348,58 @@ class ConversationAgent:
 
         # Early naive replies (turns 1–2)
         if agent_turns < 2:
-            return self._early_naive_reply(scam_categories)
+            REPLIES.inc(source="early_naive")
+            return self._early_naive_reply(scam_categories), None, None
+
+        # Scripted campaigns repeat the same context thousands of times
+        cache_key = None
+        if self.reply_cache is not None:
+            cache_key = conversation_fingerprint(
+                persona_key,
+                scam_categories,
+                conversation_history,
+                CACHE_CONTEXT_MESSAGES,
+            )
+            cached = self.reply_cache.get(cache_key)
+            if cached is not None:
+                REPLIES.inc(source="cache")
+                return cached, None, None
+
+        # Same scammer message (give or take a few words) seen before
+        if self.script_index is not None:
+            candidate = self.script_index.candidate_reply(
+                session_data.get("scriptId"), persona_key
+            )
+            if candidate is not None:
+                REPLIES.inc(source="script")
+                return candidate, None, None
+
+        # Turns already folded into the summary stay out of the window
+        summary = session_data.get("conversationSummary")
+        unsummarized = session_data.get("unsummarizedMessages")
+        if summary and unsummarized is not None:
+            conversation_history = conversation_history[-unsummarized:]
 
         # Build prompt
         prompt = self._build_prompt(
             conversation_history,
             scam_categories,
             persona_key,
+            summary,
         )
+        return None, prompt, cache_key
 
-        # Call LLM provider
-        try:
-            raw_response = generate_text(prompt)
-            cleaned = self._clean_response(raw_response)
-
-            if cleaned and len(cleaned) > 8:
-                return cleaned
-
-        except Exception as e:
-            logger.warning("LLM call failed, using fallback: %s", e)
-
-        return self._fallback_reply(scam_categories)
+    def _remember(
+        self, session_data: Dict, cache_key: Optional[str], reply: str
+    ) -> None:
+        if cache_key is not None:
+            self.reply_cache.put(cache_key, reply)
+        if self.script_index is not None:
+            self.script_index.add_reply(
+                session_data.get("scriptId"),
+                session_data.get("persona", "confused_elderly"),
+                reply,
+            )
 
     # ─────────────────────────────────────────────
     # Prompt construction
@@ -123,20 +410,10 @@ class ConversationAgent:
         conversation_history: List[Dict],
         scam_categories: List[str],
         persona_key: str,
+        summary: Optional[str] = None,
     ) -> str:
-        persona = PersonaManager.get_persona_prompt_data(persona_key)
-
-        conversation = ""
-        for msg in conversation_history[-6:]:
-            sender = msg.get("sender", "scammer")
-            role = "Scammer" if sender == "scammer" else "You"
-            conversation += f"{role}: {msg['text']}\n"
-
-        return HONEYPOT_PROMPT.format(
-            persona_description=persona["description"],
-            persona_traits="\n".join(f"- {t}" for t in persona["traits"]),
-            scam_categories=", ".join(scam_categories) or "unknown",
-            conversation=conversation.strip(),
+        return self.prompt_builder.build(
+            conversation_history, scam_categories, persona_key, summary
         )
 
     # ─────────────────────────────────────────────
@@ -1,4 +1,7 @@
-HONEYPOT_PROMPT = """
+# Persona-only part of the prompt: identical for every turn of every
+# session with the same persona, so it can be built once and cached
+# provider-side as a prompt prefix.
+HONEYPOT_PROMPT_PREFIX = """
 You are roleplaying as {persona_description} in a conversation with a potential scammer.
 
 Your character traits:
@@ -14,7 +17,10 @@ IMPORTANT INSTRUCTIONS:
 7. Be believable — respond like a real person
 8. Try to extract more information (phone numbers, links, account details)
 
-Detected scam categories: {scam_categories}
+"""
+
+# Per-turn part
+HONEYPOT_PROMPT_SUFFIX = """Detected scam categories: {scam_categories}
 
 Conversation so far:
 {conversation}
@@ -24,3 +30,11 @@ Do not add explanations, labels, or meta commentary.
 
 Your response:
 """
+
+HONEYPOT_PROMPT = HONEYPOT_PROMPT_PREFIX + HONEYPOT_PROMPT_SUFFIX
+
+# Inserted between prefix and suffix once older turns have been summarized
+HONEYPOT_SUMMARY_BLOCK = """Earlier in this conversation (summary):
+{summary}
+
+"""
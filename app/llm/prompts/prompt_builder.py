@@ -0,0 +1,134 @@
+from typing import Dict, List, Optional
+
+from app.config import PROMPT_MAX_MESSAGE_TOKENS, PROMPT_TOKEN_BUDGET
+from app.core.persona import PersonaManager
+from app.llm.prompts.honeypot_prompt import (
+    HONEYPOT_PROMPT_PREFIX,
+    HONEYPOT_PROMPT_SUFFIX,
+    HONEYPOT_SUMMARY_BLOCK,
+)
+
+CHARS_PER_TOKEN = 4
+TRUNCATION_MARK = " … "
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (~4 characters per token for English BPE
+    vocabularies). Cheap enough for the request path; only used to
+    size the conversation window.
+    """
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def truncate_middle(text: str, max_tokens: int) -> str:
+    """
+    Keep the start and the end of an over-long message. Scammers tend to
+    put the ask (link, number, account) at either end of a pasted wall
+    of text.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    keep = max(max_chars - len(TRUNCATION_MARK), 2)
+    head = keep * 2 // 3
+    tail = keep - head
+    return text[:head].rstrip() + TRUNCATION_MARK + text[-tail:].lstrip()
+
+
+class PromptBuilder:
+    """
+    Builds the reply prompt from a per-persona prefix computed once at
+    start-up and a conversation window chosen by token budget.
+
+    The window is filled from the newest message backwards; each message
+    is truncated to `max_message_tokens`, and the window stops before the
+    first message that would overrun what is left of `token_budget`. The
+    newest message is always included. A rolling summary of older turns,
+    when given, sits between the prefix and the window and is paid for
+    out of the same budget.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = PROMPT_TOKEN_BUDGET,
+        max_message_tokens: int = PROMPT_MAX_MESSAGE_TOKENS,
+    ):
+        self.token_budget = token_budget
+        self.max_message_tokens = max_message_tokens
+
+        self._prefixes: Dict[str, str] = {
+            key: self._render_prefix(persona)
+            for key, persona in PersonaManager.PERSONAS.items()
+        }
+        self._prefix_tokens = {
+            key: estimate_tokens(prefix) for key, prefix in self._prefixes.items()
+        }
+        self._suffix_tokens = estimate_tokens(
+            HONEYPOT_PROMPT_SUFFIX.format(scam_categories="", conversation="")
+        )
+
+    @staticmethod
+    def _render_prefix(persona: Dict) -> str:
+        return HONEYPOT_PROMPT_PREFIX.format(
+            persona_description=persona["description"],
+            persona_traits="\n".join(f"- {t}" for t in persona["traits"]),
+        )
+
+    def prefix(self, persona_key: str) -> str:
+        prefix = self._prefixes.get(persona_key)
+        if prefix is None:
+            # Unknown keys fall back the same way PersonaManager does
+            prefix = self._render_prefix(
+                PersonaManager.get_persona_prompt_data(persona_key)
+            )
+            self._prefixes[persona_key] = prefix
+            self._prefix_tokens[persona_key] = estimate_tokens(prefix)
+        return prefix
+
+    def conversation_window(
+        self, conversation_history: List[Dict], budget: int
+    ) -> List[str]:
+        lines: List[str] = []
+        remaining = budget
+        max_chars = self.max_message_tokens * CHARS_PER_TOKEN
+        for msg in reversed(conversation_history):
+            role = "Scammer" if msg.get("sender", "scammer") == "scammer" else "You"
+            text = msg.get("text", "")
+            if len(text) > max_chars:
+                text = truncate_middle(text, self.max_message_tokens)
+            # "Role: text\n"
+            cost = estimate_tokens(text) + 3
+            if lines and cost > remaining:
+                break
+            lines.append(f"{role}: {text}")
+            remaining -= cost
+        lines.reverse()
+        return lines
+
+    def build(
+        self,
+        conversation_history: List[Dict],
+        scam_categories: List[str],
+        persona_key: str,
+        summary: Optional[str] = None,
+    ) -> str:
+        prefix = self.prefix(persona_key)
+        categories = ", ".join(scam_categories) or "unknown"
+        summary_block = (
+            HONEYPOT_SUMMARY_BLOCK.format(summary=summary) if summary else ""
+        )
+        budget = (
+            self.token_budget
+            - self._prefix_tokens[persona_key]
+            - self._suffix_tokens
+            - estimate_tokens(categories)
+            - estimate_tokens(summary_block)
+        )
+        conversation = "\n".join(
+            self.conversation_window(conversation_history, budget)
+        ).strip()
+        return prefix + summary_block + HONEYPOT_PROMPT_SUFFIX.format(
+            scam_categories=categories,
+            conversation=conversation,
+        )
@@ -0,0 +1,16 @@
+SUMMARY_PROMPT = """
+You keep notes on a conversation between a scammer and {persona_description} (called "You").
+
+Notes so far:
+{previous_summary}
+
+New messages:
+{conversation}
+
+Rewrite the notes to cover everything above in at most {max_sentences} short sentences.
+Keep: what the scammer claims and asks for, any names, numbers, links or accounts
+they gave, and anything You said about yourself (so You stay consistent).
+Write only the notes.
+
+Notes:
+"""
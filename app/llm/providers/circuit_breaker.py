@@ -0,0 +1,247 @@
+import logging
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Dict, Optional, Tuple
+
+from app.config import (
+    CIRCUIT_FAILURE_RATE,
+    CIRCUIT_MIN_CALLS,
+    CIRCUIT_OPEN_SECONDS,
+    CIRCUIT_SLOW_CALL_RATE,
+    CIRCUIT_SLOW_CALL_SECONDS,
+    CIRCUIT_WINDOW_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Failure and slow-call rates over a sliding time window.
+
+    closed     calls go through; once at least `min_calls` are in the
+               window and either rate crosses its threshold, the circuit
+               opens
+    open       calls fail fast with CircuitOpenError for `open_seconds`
+    half_open  a single probe call is let through; a fast success closes
+               the circuit, anything else opens it again
+
+    All bookkeeping happens on the event loop thread, so no lock is
+    needed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        window_seconds: float = CIRCUIT_WINDOW_SECONDS,
+        min_calls: int = CIRCUIT_MIN_CALLS,
+        failure_rate: float = CIRCUIT_FAILURE_RATE,
+        slow_call_seconds: float = CIRCUIT_SLOW_CALL_SECONDS,
+        slow_call_rate: float = CIRCUIT_SLOW_CALL_RATE,
+        open_seconds: float = CIRCUIT_OPEN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self._clock = clock
+
+        # (finished_at, failed, slow)
+        self._outcomes: Deque[Tuple[float, bool, bool]] = deque()
+        self._failures = 0
+        self._slow = 0
+
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        self.opens = 0
+        self.rejected = 0
+
+    # ─────────────────────────────────────────────
+    # Call protocol
+    # ─────────────────────────────────────────────
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+
+        if self.state == OPEN:
+            if self._clock() - self._opened_at < self.open_seconds:
+                self.rejected += 1
+                return False
+            self._transition(HALF_OPEN)
+
+        if self._probe_in_flight:
+            self.rejected += 1
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def record_success(self, elapsed: float) -> None:
+        slow = elapsed >= self.slow_call_seconds
+        if self.state == HALF_OPEN:
+            self._probe_in_flight = False
+            if slow:
+                self._open()
+            else:
+                self._reset()
+                self._transition(CLOSED)
+            return
+        self._record(failed=False, slow=slow)
+
+    def record_failure(self) -> None:
+        if self.state == HALF_OPEN:
+            self._probe_in_flight = False
+            self._open()
+            return
+        self._record(failed=True, slow=False)
+
+    def release(self) -> None:
+        """The call was cancelled (e.g. lost a hedge race): no verdict."""
+        if self.state == HALF_OPEN:
+            self._probe_in_flight = False
+
+    # ─────────────────────────────────────────────
+    # Internals
+    # ─────────────────────────────────────────────
+
+    def _record(self, failed: bool, slow: bool) -> None:
+        now = self._clock()
+        self._outcomes.append((now, failed, slow))
+        self._failures += failed
+        self._slow += slow
+        self._trim(now)
+
+        calls = len(self._outcomes)
+        if self.state == CLOSED and calls >= self.min_calls and (
+            self._failures / calls >= self.failure_rate
+            or self._slow / calls >= self.slow_call_rate
+        ):
+            self._open()
+
+    def _trim(self, now: float) -> None:
+        horizon = now - self.window_seconds
+        outcomes = self._outcomes
+        while outcomes and outcomes[0][0] < horizon:
+            _, failed, slow = outcomes.popleft()
+            self._failures -= failed
+            self._slow -= slow
+
+    def _reset(self) -> None:
+        self._outcomes.clear()
+        self._failures = 0
+        self._slow = 0
+
+    def _open(self) -> None:
+        self._opened_at = self._clock()
+        self.opens += 1
+        self._reset()
+        self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state != self.state:
+            logger.warning(
+                "LLM provider %s circuit %s -> %s", self.name, self.state, state
+            )
+            self.state = state
+
+    def snapshot(self) -> Dict:
+        self._trim(self._clock())
+        calls = len(self._outcomes)
+        return {
+            "state": self.state,
+            "windowCalls": calls,
+            "failureRate": self._failures / calls if calls else 0.0,
+            "slowCallRate": self._slow / calls if calls else 0.0,
+            "opens": self.opens,
+            "rejected": self.rejected,
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(name)
+    return breaker
+
+
+def breaker_states() -> Dict[str, Dict]:
+    return {name: breaker.snapshot() for name, breaker in _breakers.items()}
+
+
+def guard(name: str, fn: Callable, breaker: Optional[CircuitBreaker] = None):
+    """Wrap an async `prompt -> text` provider call in its breaker."""
+    breaker = breaker or get_breaker(name)
+
+    async def guarded(prompt: str, **kwargs) -> str:
+        if not breaker.allow():
+            raise CircuitOpenError(f"{name} circuit open")
+        start = time.perf_counter()
+        try:
+            text = await fn(prompt, **kwargs)
+        except Exception:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        breaker.record_success(time.perf_counter() - start)
+        return text
+
+    guarded.breaker = breaker
+    return guarded
+
+
+def guard_stream(
+    name: str, fn: Callable, breaker: Optional[CircuitBreaker] = None
+):
+    """
+    Streaming counterpart of `guard`. Latency is time to first token, and
+    a stream closed early by the consumer after yielding counts as a
+    success.
+    """
+    breaker = breaker or get_breaker(name)
+
+    async def guarded(prompt: str, **kwargs) -> AsyncIterator[str]:
+        if not breaker.allow():
+            raise CircuitOpenError(f"{name} circuit open")
+        start = time.perf_counter()
+        first_token: Optional[float] = None
+        try:
+            async for token in fn(prompt, **kwargs):
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                yield token
+        except Exception:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            if first_token is None:
+                breaker.release()
+            else:
+                breaker.record_success(first_token)
+            raise
+        if first_token is None:
+            breaker.record_failure()
+        else:
+            breaker.record_success(first_token)
+
+    guarded.breaker = breaker
+    return guarded
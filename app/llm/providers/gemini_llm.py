@@ -1,4 +1,6 @@
 import os
+from functools import lru_cache
+
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.language_models import BaseChatModel
 
@@ -12,5 +14,17 @@ def get_gemini(
         google_api_key=os.getenv("GOOGLE_API_KEY"),
         convert_system_message_to_human=True,
     )
-    
-    
\ No newline at end of file
+
+
+@lru_cache(maxsize=1)
+def _reply_model() -> BaseChatModel:
+    return get_gemini(temperature=0.8)
+
+
+async def generate_text(prompt: str) -> str:
+    """Reply-path adapter with the same shape as hugging_face.generate_text."""
+    try:
+        result = await _reply_model().ainvoke(prompt)
+    except Exception as e:
+        raise RuntimeError(f"Gemini request failed: {e}") from e
+    return str(result.content).strip()
@@ -1,4 +1,6 @@
 import os
+from functools import lru_cache
+
 from langchain_groq import ChatGroq
 
 
@@ -8,3 +10,21 @@ def groq_llm():
         temperature=0.2,
         api_key=os.getenv("GROQ_API_KEY"),
     )
+
+
+@lru_cache(maxsize=1)
+def _reply_model() -> ChatGroq:
+    return ChatGroq(
+        model="llama3-8b-8192",
+        temperature=0.8,
+        api_key=os.getenv("GROQ_API_KEY"),
+    )
+
+
+async def generate_text(prompt: str) -> str:
+    """Reply-path adapter with the same shape as hugging_face.generate_text."""
+    try:
+        result = await _reply_model().ainvoke(prompt)
+    except Exception as e:
+        raise RuntimeError(f"Groq request failed: {e}") from e
+    return str(result.content).strip()
@@ -0,0 +1,302 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import aclosing
+from typing import (
+    AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Sequence,
+    Tuple,
+)
+
+from app.llm.providers.circuit_breaker import guard, guard_stream
+
+logger = logging.getLogger(__name__)
+
+GenerateFn = Callable[[str], Awaitable[str]]
+StreamFn = Callable[[str], AsyncIterator[str]]
+
+LATENCY_WINDOW = 200
+MIN_SAMPLES = 20
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies for one provider."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if len(self._samples) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _Hedging:
+    """Provider list, adaptive hedge deadlines and win counts."""
+
+    def __init__(
+        self,
+        providers: Sequence[Tuple[str, Callable]],
+        *,
+        hedge_quantile: float = 0.9,
+        default_delay: float = 2.0,
+        min_delay: float = 0.2,
+        max_delay: float = 6.0,
+    ):
+        if not providers:
+            raise ValueError(f"{type(self).__name__} needs at least one provider")
+        self.providers = list(providers)
+        self.hedge_quantile = hedge_quantile
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.latency: Dict[str, LatencyTracker] = {
+            name: LatencyTracker() for name, _ in self.providers
+        }
+        self.wins: Dict[str, int] = {name: 0 for name, _ in self.providers}
+        self.hedges = 0
+
+    def hedge_delay(self, name: str) -> float:
+        observed = self.latency[name].quantile(self.hedge_quantile)
+        delay = self.default_delay if observed is None else observed
+        return min(max(delay, self.min_delay), self.max_delay)
+
+    def stats(self) -> Dict:
+        return {
+            "hedges": self.hedges,
+            "wins": dict(self.wins),
+            "hedgeDelaySeconds": {
+                name: self.hedge_delay(name) for name, _ in self.providers
+            },
+        }
+
+
+class HedgedGenerator(_Hedging):
+    """
+    Calls the first provider and, if it has not produced a usable answer
+    by an adaptive deadline (its rolling latency quantile), fires the
+    next provider as well. The first usable answer wins and every other
+    in-flight call is cancelled. When every in-flight call has failed,
+    the next provider is fired at once instead of waiting out the
+    deadline.
+
+    Providers are plain async `prompt -> text` callables, so local stubs
+    can stand in for the real ones.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[Tuple[str, GenerateFn]],
+        *,
+        is_usable: Optional[Callable[[str], bool]] = None,
+        **hedge_options,
+    ):
+        super().__init__(providers, **hedge_options)
+        self.is_usable = is_usable or (lambda text: bool(text and text.strip()))
+
+    @staticmethod
+    async def _timed(fn: GenerateFn, prompt: str) -> Tuple[str, float]:
+        start = time.perf_counter()
+        text = await fn(prompt)
+        return text, time.perf_counter() - start
+
+    async def __call__(self, prompt: str) -> str:
+        waiting: List[Tuple[str, GenerateFn]] = list(self.providers)
+        in_flight: Dict[asyncio.Task, str] = {}
+        last_error: Optional[BaseException] = None
+
+        def launch() -> str:
+            name, fn = waiting.pop(0)
+            task = asyncio.create_task(self._timed(fn, prompt))
+            in_flight[task] = name
+            return name
+
+        deadline_for = launch()
+        try:
+            while in_flight:
+                timeout = self.hedge_delay(deadline_for) if waiting else None
+                done, _ = await asyncio.wait(
+                    in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    # Deadline passed with nothing back: hedge
+                    self.hedges += 1
+                    deadline_for = launch()
+                    continue
+
+                for task in done:
+                    name = in_flight.pop(task)
+                    try:
+                        text, elapsed = task.result()
+                    except Exception as e:
+                        logger.warning("Provider %s failed: %s", name, e)
+                        last_error = e
+                        continue
+
+                    self.latency[name].record(elapsed)
+                    if self.is_usable(text):
+                        self.wins[name] += 1
+                        return text
+                    last_error = RuntimeError(f"{name} returned an unusable reply")
+
+                # Everything that finished was a failure: don't wait out
+                # the deadline before trying the next provider
+                if waiting and not in_flight:
+                    deadline_for = launch()
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+        raise RuntimeError("All LLM providers failed") from last_error
+
+
+class HedgedStreamer(_Hedging):
+    """
+    Streaming counterpart of HedgedGenerator, raced on the first token:
+    the next provider's stream is opened once the previous one has
+    produced nothing by its deadline (its rolling time-to-first-token
+    quantile), or at once when every open stream failed before its
+    first token. The first stream to yield is followed to the end and
+    the others are closed. A failure after the first token is raised,
+    not retried: part of the reply has already been sent.
+    """
+
+    async def __call__(self, prompt: str) -> AsyncIterator[str]:
+        waiting: List[Tuple[str, StreamFn]] = list(self.providers)
+        # First-token task -> (provider, its stream, started at)
+        in_flight: Dict[asyncio.Task, Tuple[str, AsyncIterator[str], float]] = {}
+        last_error: Optional[BaseException] = None
+        winner: Optional[Tuple[str, AsyncIterator[str], str]] = None
+
+        def launch() -> str:
+            name, fn = waiting.pop(0)
+            stream = fn(prompt)
+            task = asyncio.ensure_future(stream.__anext__())
+            in_flight[task] = (name, stream, time.perf_counter())
+            return name
+
+        deadline_for = launch()
+        try:
+            while in_flight and winner is None:
+                timeout = self.hedge_delay(deadline_for) if waiting else None
+                done, _ = await asyncio.wait(
+                    in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    self.hedges += 1
+                    deadline_for = launch()
+                    continue
+
+                for task in done:
+                    name, stream, started = in_flight.pop(task)
+                    try:
+                        first = task.result()
+                    except StopAsyncIteration:
+                        last_error = RuntimeError(f"{name} returned an empty stream")
+                        continue
+                    except Exception as e:
+                        logger.warning("Provider %s stream failed: %s", name, e)
+                        last_error = e
+                        continue
+
+                    self.latency[name].record(time.perf_counter() - started)
+                    winner = (name, stream, first)
+                    break
+
+                if winner is None and waiting and not in_flight:
+                    deadline_for = launch()
+        finally:
+            await self._close(in_flight)
+
+        if winner is None:
+            raise RuntimeError("All LLM providers failed") from last_error
+
+        name, stream, first = winner
+        self.wins[name] += 1
+        async with aclosing(stream):
+            yield first
+            async for token in stream:
+                yield token
+
+    @staticmethod
+    async def _close(
+        in_flight: Dict[asyncio.Task, Tuple[str, AsyncIterator[str], float]]
+    ) -> None:
+        """Cancel first-token waits that lost the race and close their streams."""
+        for task in in_flight:
+            task.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
+        for name, stream, _ in in_flight.values():
+            try:
+                await stream.aclose()
+            except Exception as e:
+                logger.debug("Closing %s stream failed: %s", name, e)
+
+
+def _provider_module(name: str):
+    if name == "huggingface":
+        from app.llm.providers import hugging_face as module
+    elif name == "gemini":
+        from app.llm.providers import gemini_llm as module
+    elif name == "groq":
+        from app.llm.providers import groq_llm as module
+    elif name == "local":
+        from app.llm.providers import local_llm as module
+    else:
+        raise ValueError(f"Unknown LLM provider: {name}")
+    return module
+
+
+def load_provider(name: str) -> GenerateFn:
+    """Resolve a provider name to its breaker-guarded generate_text."""
+    return guard(name, _provider_module(name).generate_text)
+
+
+def as_stream(generate_text: GenerateFn) -> StreamFn:
+    """A provider without streaming: one call, yielded as a single chunk."""
+
+    async def stream_text(prompt: str, **kwargs) -> AsyncIterator[str]:
+        yield await generate_text(prompt, **kwargs)
+
+    return stream_text
+
+
+def load_stream_provider(name: str) -> StreamFn:
+    """
+    Resolve a provider name to a breaker-guarded stream, sharing the
+    breaker of its generate_text.
+    """
+    module = _provider_module(name)
+    stream_text = getattr(module, "stream_text", None)
+    if stream_text is None:
+        stream_text = as_stream(module.generate_text)
+    return guard_stream(name, stream_text)
+
+
+def build_generator(
+    names: Sequence[str],
+    is_usable: Optional[Callable[[str], bool]] = None,
+    **hedge_options,
+) -> GenerateFn:
+    """
+    A single provider is returned as-is; several are wrapped in a
+    HedgedGenerator, in the given priority order.
+    """
+    providers = [(name, load_provider(name)) for name in names]
+    if len(providers) == 1:
+        return providers[0][1]
+    return HedgedGenerator(providers, is_usable=is_usable, **hedge_options)
+
+
+def build_streamer(names: Sequence[str], **hedge_options) -> StreamFn:
+    """Streaming counterpart of `build_generator`, over the same providers."""
+    providers = [(name, load_stream_provider(name)) for name in names]
+    if len(providers) == 1:
+        return providers[0][1]
+    return HedgedStreamer(providers, **hedge_options)
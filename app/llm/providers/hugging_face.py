@@ -1,16 +1,16 @@
-import requests
+import json
+import httpx
 import logging
-from typing import Optional
+from typing import AsyncIterator
 
 from app.config import (
     HUGGINGFACE_API_KEY,
-    HF_MODEL,
+    HF_API_URL,
 )
+from app.utils.http import get_http_client
 
 logger = logging.getLogger(__name__)
 
-HF_API_URL = f"https://router.huggingface.co/models/{HF_MODEL}"
-
 DEFAULT_TIMEOUT = 8  # seconds
 
 
@@ -21,7 +21,7 @@ def _headers() -> dict:
     }
 
 
-def generate_text(
+async def generate_text(
     prompt: str,
     *,
     temperature: float = 0.8,
@@ -46,18 +46,18 @@ def generate_text(
     }
 
     try:
-        response = requests.post(
+        response = await get_http_client().post(
             HF_API_URL,
             headers=_headers(),
             json=payload,
             timeout=DEFAULT_TIMEOUT,
         )
 
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         logger.error("HuggingFace request timed out")
         raise RuntimeError("LLM timeout")
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"HuggingFace request failed: {e}")
         raise RuntimeError("LLM request failed")
 
@@ -83,3 +83,75 @@ def generate_text(
 
     logger.error(f"Unexpected HuggingFace response format: {result}")
     raise RuntimeError("Unexpected LLM response format")
+
+
+async def stream_text(
+    prompt: str,
+    *,
+    temperature: float = 0.8,
+    top_p: float = 0.9,
+    max_new_tokens: int = 120,
+) -> AsyncIterator[str]:
+    """
+    Stream generated tokens from the Hugging Face Inference API.
+
+    Closing the generator early closes the connection, which stops
+    generation on the provider side.
+
+    Raises:
+        RuntimeError on hard failures
+    """
+
+    payload = {
+        "inputs": prompt,
+        "parameters": {
+            "temperature": temperature,
+            "top_p": top_p,
+            "max_new_tokens": max_new_tokens,
+            "return_full_text": False,
+        },
+        "stream": True,
+    }
+
+    try:
+        async with get_http_client().stream(
+            "POST",
+            HF_API_URL,
+            headers=_headers(),
+            json=payload,
+            timeout=DEFAULT_TIMEOUT,
+        ) as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                logger.error(
+                    f"HuggingFace error {response.status_code}: {body!r}"
+                )
+                raise RuntimeError("LLM returned non-200 response")
+
+            # Server-sent events: one `data: {...}` line per token
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if not data or data == "[DONE]":
+                    continue
+                try:
+                    event = json.loads(data)
+                except ValueError:
+                    logger.error("Invalid JSON in HuggingFace stream")
+                    raise RuntimeError("Invalid LLM response")
+
+                token = event.get("token") or {}
+                if token.get("special"):
+                    continue
+                text = token.get("text")
+                if text:
+                    yield text
+
+    except httpx.TimeoutException:
+        logger.error("HuggingFace stream timed out")
+        raise RuntimeError("LLM timeout")
+
+    except httpx.HTTPError as e:
+        logger.error(f"HuggingFace stream failed: {e}")
+        raise RuntimeError("LLM request failed")
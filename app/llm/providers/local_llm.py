@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from app.config import (
+    LOCAL_MAX_BATCH,
+    LOCAL_MAX_NEW_TOKENS,
+    LOCAL_MAX_WAIT_MS,
+    LOCAL_MODEL,
+    LOCAL_TIMEOUT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+BatchFn = Callable[[List[str]], List[str]]
+
+
+class MicroBatcher:
+    """
+    Collects concurrent prompts into batches and runs them through a
+    blocking `batch_fn` on a worker thread, one batch at a time.
+
+    A batch is dispatched as soon as it holds `max_batch` prompts or the
+    oldest prompt in it has waited `max_wait` seconds, whichever comes
+    first. Prompts arriving while a batch runs queue up for the next one,
+    so batches grow with load and a lone prompt pays at most `max_wait`.
+
+    A caller still waiting after `timeout` seconds gets a RuntimeError;
+    its prompt is dropped if its batch has not started yet.
+    """
+
+    def __init__(
+        self,
+        batch_fn: BatchFn,
+        max_batch: int,
+        max_wait: float,
+        timeout: Optional[float] = None,
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.timeout = timeout
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.batches = 0
+        self.prompts = 0
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run(self._queue))
+        return self._queue
+
+    async def submit(self, prompt: str) -> str:
+        future = asyncio.get_running_loop().create_future()
+        self._ensure_worker().put_nowait((prompt, future))
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            raise RuntimeError("Local LLM timeout")
+
+    async def _collect(
+        self, queue: asyncio.Queue
+    ) -> List[Tuple[str, asyncio.Future]]:
+        batch = [await queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        # Callers that gave up (timeout, lost hedge) don't need a slot
+        return [(p, f) for p, f in batch if not f.done()]
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        while True:
+            batch = await self._collect(queue)
+            if not batch:
+                continue
+
+            prompts = [prompt for prompt, _ in batch]
+            try:
+                outputs = await asyncio.to_thread(self.batch_fn, prompts)
+            except Exception as e:
+                logger.error("Local batch of %d failed: %s", len(batch), e)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(RuntimeError("Local LLM failed"))
+                continue
+
+            self.batches += 1
+            self.prompts += len(batch)
+            for (_, future), text in zip(batch, outputs):
+                if not future.done():
+                    future.set_result(text)
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "prompts": self.prompts,
+            "meanBatchSize": self.prompts / self.batches if self.batches else 0.0,
+        }
+
+
+class LocalModel:
+    """
+    Small causal LM on CPU via transformers. Loaded on first use so the
+    API starts without torch when this provider is not configured.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        *,
+        temperature: float = 0.8,
+        top_p: float = 0.9,
+        max_new_tokens: int = 120,
+    ):
+        self.model_name = model_name
+        self.temperature = temperature
+        self.top_p = top_p
+        self.max_new_tokens = max_new_tokens
+        self._tokenizer = None
+        self._model = None
+        self._load_lock = threading.Lock()
+
+    def _load(self) -> None:
+        with self._load_lock:
+            if self._model is not None:
+                return
+            from transformers import AutoModelForCausalLM, AutoTokenizer
+
+            logger.info("Loading local model %s", self.model_name)
+            tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            # Decoder-only models must be left-padded to batch-generate
+            tokenizer.padding_side = "left"
+            if tokenizer.pad_token is None:
+                tokenizer.pad_token = tokenizer.eos_token
+
+            model = AutoModelForCausalLM.from_pretrained(self.model_name)
+            model.eval()
+            self._tokenizer = tokenizer
+            self._model = model
+
+    def generate_batch(self, prompts: List[str]) -> List[str]:
+        if self._model is None:
+            self._load()
+
+        import torch
+
+        tokenizer = self._tokenizer
+        inputs = tokenizer(prompts, return_tensors="pt", padding=True)
+        with torch.inference_mode():
+            output = self._model.generate(
+                **inputs,
+                do_sample=True,
+                temperature=self.temperature,
+                top_p=self.top_p,
+                max_new_tokens=self.max_new_tokens,
+                pad_token_id=tokenizer.pad_token_id,
+            )
+
+        # Keep only the generated continuation of each row
+        new_tokens = output[:, inputs["input_ids"].shape[1]:]
+        return [
+            text.strip()
+            for text in tokenizer.batch_decode(new_tokens, skip_special_tokens=True)
+        ]
+
+
+_batcher: Optional[MicroBatcher] = None
+
+
+def get_batcher() -> MicroBatcher:
+    global _batcher
+    if _batcher is None:
+        model = LocalModel(LOCAL_MODEL, max_new_tokens=LOCAL_MAX_NEW_TOKENS)
+        _batcher = MicroBatcher(
+            model.generate_batch,
+            max_batch=LOCAL_MAX_BATCH,
+            max_wait=LOCAL_MAX_WAIT_MS / 1000,
+            timeout=LOCAL_TIMEOUT_SECONDS,
+        )
+    return _batcher
+
+
+def batcher_stats() -> Optional[dict]:
+    return _batcher.stats() if _batcher is not None else None
+
+
+async def close_local_llm() -> None:
+    if _batcher is not None:
+        await _batcher.close()
+
+
+async def generate_text(prompt: str) -> str:
+    """Same shape as hugging_face.generate_text, served from a local model."""
+    return await get_batcher().submit(prompt)
@@ -0,0 +1,137 @@
+import hashlib
+import random
+import re
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Optional
+
+_URL_RE = re.compile(r"https?://\S+|www\.\S+")
+_DIGITS_RE = re.compile(r"\d+")
+_NON_WORD_RE = re.compile(r"[^a-z#<> ]+")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Collapse the parts of a scripted message that vary between sends
+    (links, amounts, phone numbers, punctuation, spacing).
+    """
+    text = _URL_RE.sub(" <url> ", text.lower())
+    text = _DIGITS_RE.sub("#", text)
+    text = _NON_WORD_RE.sub(" ", text)
+    return _SPACES_RE.sub(" ", text).strip()
+
+
+def conversation_fingerprint(
+    persona: str,
+    scam_categories: List[str],
+    conversation_history: List[Dict],
+    last_n: int,
+) -> str:
+    """
+    Stable key for (persona, categories, last `last_n` scammer turns).
+
+    Only scammer messages are used: the agent's own replies are sampled
+    at random and would otherwise split identical scripts across keys.
+    """
+    recent: List[str] = []
+    for msg in reversed(conversation_history):
+        if len(recent) >= last_n:
+            break
+        if msg.get("sender") != "agent":
+            recent.append(normalize_text(msg.get("text", "")))
+    recent.reverse()
+    key = "\x1f".join([persona, ",".join(sorted(scam_categories)), *recent])
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class _Entry:
+    __slots__ = ("variants", "expires_at")
+
+    def __init__(self, expires_at: float):
+        self.variants: List[str] = []
+        self.expires_at = expires_at
+
+
+class ReplyCache:
+    """
+    LRU + TTL cache of LLM replies keyed on a conversation fingerprint.
+
+    Each key holds up to `max_variants` replies. A lookup samples one of
+    them; while a key is still short of variants, `explore_probability`
+    of lookups report a miss so the caller generates (and stores) a
+    fresh reply instead of repeating the same one.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 3600,
+        max_variants: int = 3,
+        explore_probability: float = 0.5,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_variants = max_variants
+        self.explore_probability = explore_probability
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if entry.expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            if (
+                len(entry.variants) < self.max_variants
+                and random.random() < self.explore_probability
+            ):
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return random.choice(entry.variants)
+
+    def put(self, key: str, reply: str) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.monotonic():
+                entry = _Entry(time.monotonic() + self.ttl_seconds)
+                self._entries[key] = entry
+            self._entries.move_to_end(key)
+
+            if reply not in entry.variants:
+                if len(entry.variants) >= self.max_variants:
+                    entry.variants.pop(0)
+                entry.variants.append(reply)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
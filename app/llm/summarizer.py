@@ -0,0 +1,181 @@
+import logging
+import re
+from typing import Awaitable, Callable, List, Optional, Set
+
+from app.config import (
+    SUMMARY_KEEP_RECENT,
+    SUMMARY_MAX_CHARS,
+    SUMMARY_TRIGGER_MESSAGES,
+)
+from app.core.admission import LLMBusyError
+from app.core.persona import PersonaManager
+from app.llm.prompts.summary_prompt import SUMMARY_PROMPT
+from app.storage.base import SessionStore
+from app.storage.models import Message, SessionState
+
+logger = logging.getLogger(__name__)
+
+EXTRACTIVE_LINE_CHARS = 120
+_LABEL_RE = re.compile(r"^\s*(notes?|summary)\s*:\s*", re.I)
+
+
+def _role(message: Message) -> str:
+    return "Scammer" if message.sender == "scammer" else "You"
+
+
+class ConversationSummarizer:
+    """
+    Folds older turns into SessionState.conversationSummary, off the
+    request path.
+
+    A session is due once SUMMARY_TRIGGER_MESSAGES messages older than
+    the last SUMMARY_KEEP_RECENT are not yet covered by its summary.
+    Those messages and the previous summary are rewritten into a new
+    summary by the LLM; if that fails, an extractive summary (first line
+    of each message, plus the IOCs seen so far) is used instead. Both are
+    capped at SUMMARY_MAX_CHARS, so the prompt stays the same size
+    however long the session runs.
+    """
+
+    def __init__(
+        self,
+        store: SessionStore,
+        generate_text: Optional[Callable[[str], Awaitable[str]]] = None,
+        *,
+        trigger_messages: int = SUMMARY_TRIGGER_MESSAGES,
+        keep_recent: int = SUMMARY_KEEP_RECENT,
+        max_chars: int = SUMMARY_MAX_CHARS,
+    ):
+        self.store = store
+        self.generate_text = generate_text
+        self.trigger_messages = trigger_messages
+        self.keep_recent = keep_recent
+        self.max_chars = max_chars
+        self._in_flight: Set[str] = set()
+
+        self.llm_summaries = 0
+        self.extractive_summaries = 0
+
+    def is_due(self, session: SessionState) -> bool:
+        covered_until = session.totalMessagesExchanged - self.keep_recent
+        return covered_until - session.summarizedUpTo >= self.trigger_messages
+
+    async def maybe_summarize(self, session_id: str) -> None:
+        """Background-task entry point; never raises."""
+        if session_id in self._in_flight:
+            return
+        self._in_flight.add(session_id)
+        try:
+            await self._summarize(session_id)
+        except Exception:
+            logger.exception("Summarizing session %s failed", session_id)
+        finally:
+            self._in_flight.discard(session_id)
+
+    async def _summarize(self, session_id: str) -> None:
+        session = await self.store.get(session_id)
+        if session is None or not self.is_due(session):
+            return
+
+        start = session.summarizedUpTo
+        end = session.totalMessagesExchanged - self.keep_recent
+        messages = await self.store.load_history_range(session_id, start, end)
+        if not messages:
+            return
+
+        summary = await self._llm_summary(session, messages)
+        if summary is None:
+            summary = self._extractive_summary(session, messages)
+            self.extractive_summaries += 1
+        else:
+            self.llm_summaries += 1
+
+        await self.store.set_fields(
+            session_id,
+            conversationSummary=summary,
+            summarizedUpTo=end,
+        )
+
+    async def _llm_summary(
+        self, session: SessionState, messages: List[Message]
+    ) -> Optional[str]:
+        if self.generate_text is None:
+            return None
+
+        persona = PersonaManager.get_persona_prompt_data(
+            session.persona or "confused_elderly"
+        )
+        prompt = SUMMARY_PROMPT.format(
+            persona_description=persona["description"],
+            previous_summary=session.conversationSummary or "(none yet)",
+            conversation="\n".join(f"{_role(m)}: {m.text}" for m in messages),
+            max_sentences=5,
+        )
+        try:
+            raw = await self.generate_text(prompt)
+        except LLMBusyError:
+            logger.debug("LLM busy, using extractive summary")
+            return None
+        except Exception as e:
+            logger.warning("LLM summary failed, using extractive: %s", e)
+            return None
+
+        summary = _LABEL_RE.sub("", raw).strip()
+        if not summary:
+            return None
+        return self._clip(summary)
+
+    def _extractive_summary(
+        self, session: SessionState, messages: List[Message]
+    ) -> str:
+        lines = [session.conversationSummary] if session.conversationSummary else []
+        for message in messages:
+            text = " ".join(message.text.split())
+            if len(text) > EXTRACTIVE_LINE_CHARS:
+                text = text[:EXTRACTIVE_LINE_CHARS].rstrip() + "…"
+            lines.append(f"{_role(message)}: {text}")
+
+        iocs = sorted(
+            value
+            for field, values in session.iocSets.items()
+            if field != "suspiciousKeywords"
+            for value in values
+        )
+        details = self._details_line(iocs)
+
+        # Oldest lines go first when over budget; the IOC line is kept
+        budget = self.max_chars - len(details)
+        kept: List[str] = []
+        for line in reversed(lines):
+            if sum(len(k) + 1 for k in kept) + len(line) > budget:
+                break
+            kept.append(line)
+        kept.reverse()
+        if details:
+            kept.append(details)
+        return self._clip("\n".join(kept))
+
+    def _details_line(self, iocs: List[str]) -> str:
+        """IOCs seen so far, capped at a third of the summary budget."""
+        if not iocs:
+            return ""
+        budget = self.max_chars // 3
+        line = "Details they gave: "
+        for index, value in enumerate(iocs):
+            more = f" (+{len(iocs) - index} more)"
+            if len(line) + len(value) + 2 + len(more) > budget:
+                return line.rstrip(", ") + more
+            line += value + ", "
+        return line.rstrip(", ")
+
+    def _clip(self, text: str) -> str:
+        if len(text) <= self.max_chars:
+            return text
+        return text[: self.max_chars].rsplit(" ", 1)[0] + "…"
+
+    def stats(self) -> dict:
+        return {
+            "llmSummaries": self.llm_summaries,
+            "extractiveSummaries": self.extractive_summaries,
+            "inFlight": len(self._in_flight),
+        }
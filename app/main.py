@@ -1,13 +1,53 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
+from app.api.admin import router as admin_router
 from app.api.honeypot import router as honeypot_router
+from app.api.intel import router as intel_router
+from app.api.internal import router as internal_router
 from app.api.health import router as health_router
+from app.api.metrics import router as metrics_router
+from app.config import CALLBACK_OUTBOX_DRAIN
+from app.core.session_manager import session_manager
+from app.llm.providers.local_llm import close_local_llm
+from app.services.outbox import OutboxWorker, get_outbox
+from app.utils.profiling import ProfilingMiddleware
+from app.utils.http import close_http_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    outbox_worker = OutboxWorker(
+        get_outbox(),
+        on_delivered=session_manager.mark_callback_sent,
+    )
+    if CALLBACK_OUTBOX_DRAIN:
+        outbox_worker.start()
+    session_sweeper = asyncio.create_task(session_manager.run_sweeper())
+    yield
+    session_sweeper.cancel()
+    with suppress(asyncio.CancelledError):
+        await session_sweeper
+    await outbox_worker.stop()
+    await session_manager.store.close()
+    await close_local_llm()
+    await close_http_client()
+
 
 app = FastAPI(
     title="Agentic Honey-Pot API",
     description="Scam Detection & Intelligence Extraction API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
+app.add_middleware(ProfilingMiddleware)
+
 # Register API Routers
 app.include_router(honeypot_router)
 app.include_router(health_router)
+app.include_router(metrics_router)
+app.include_router(admin_router)
+app.include_router(intel_router)
+app.include_router(internal_router)
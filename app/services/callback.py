@@ -1,43 +1,47 @@
 import logging
-import requests
+import httpx
 
 from app.config import GUVI_CALLBACK_URL
 from app.storage.models import SessionState, ExtractedIntelligence
+from app.utils.http import get_http_client
 
 logger = logging.getLogger(__name__)
 
 TIMEOUT_SECONDS = 10
 
 
-def send_final_result(
+def build_payload(
     session: SessionState,
     intelligence: ExtractedIntelligence,
-) -> bool:
-    """
-    Send extracted intelligence to external callback endpoint.
-    Returns True on success, False on failure.
-    Fires at most once per session (caller enforces this).
-    """
-
-    payload = {
+) -> dict:
+    return {
         "sessionId": session.sessionId,
         "scamDetected": session.scamDetected,
         "totalMessagesExchanged": session.totalMessagesExchanged,
-        "extractedIntelligence": intelligence.dict(),
+        "extractedIntelligence": intelligence.model_dump(),
         "agentNotes": session.agentNotes or "",
     }
 
+
+async def post_payload(payload: dict) -> bool:
+    """
+    POST a callback payload. The session id doubles as the idempotency
+    key, so a retried delivery is safe on the receiving side.
+    Returns True on success, False on failure.
+    """
+
     try:
-        response = requests.post(
+        response = await get_http_client().post(
             GUVI_CALLBACK_URL,
             json=payload,
+            headers={"Idempotency-Key": payload["sessionId"]},
             timeout=TIMEOUT_SECONDS,
         )
 
         if response.status_code == 200:
             logger.info(
                 "Callback sent successfully for session %s",
-                session.sessionId,
+                payload["sessionId"],
             )
             return True
         else:
@@ -48,6 +52,17 @@ def send_final_result(
             )
             return False
 
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error("Callback request error: %s", e)
         return False
+
+
+async def send_final_result(
+    session: SessionState,
+    intelligence: ExtractedIntelligence,
+) -> bool:
+    """
+    Send extracted intelligence to external callback endpoint inline.
+    The API path enqueues into the outbox instead (app/services/outbox.py).
+    """
+    return await post_payload(build_payload(session, intelligence))
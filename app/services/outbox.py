@@ -0,0 +1,312 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import time
+from threading import Lock
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.config import CALLBACK_OUTBOX_PATH, CALLBACK_OUTBOX_RETENTION_SECONDS
+from app.services.callback import post_payload
+from app.utils.metrics import CALLBACKS
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+POLL_INTERVAL_SECONDS = 1.0
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 600.0
+MAX_ATTEMPTS = 20
+PRUNE_INTERVAL_SECONDS = 600.0
+
+
+class CallbackOutbox:
+    """
+    Durable, SQLite-backed (WAL mode) queue of pending callbacks.
+    One row per session: the session id is the primary key and the
+    idempotency key, so a session is delivered at most once.
+
+    A row is pending until it is delivered or abandoned: MAX_ATTEMPTS
+    failed attempts leave it undelivered for good, as a dead letter.
+    `prune` deletes delivered and dead-letter rows once they are older
+    than the retention window. The pending count is kept as a running
+    total, so reading it never touches the database.
+    """
+
+    def __init__(self, path: str = CALLBACK_OUTBOX_PATH):
+        self._lock = Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS callback_outbox (
+                session_id      TEXT PRIMARY KEY,
+                payload         TEXT NOT NULL,
+                attempts        INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                created_at      REAL NOT NULL,
+                delivered_at    REAL,
+                last_error      TEXT
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_outbox_due "
+            "ON callback_outbox (delivered_at, next_attempt_at)"
+        )
+        self._conn.commit()
+        self._pending = self._count_pending()
+
+    def _count_pending(self) -> int:
+        """Called under the lock (or before the outbox is shared)."""
+        (count,) = self._conn.execute(
+            "SELECT COUNT(*) FROM callback_outbox "
+            "WHERE delivered_at IS NULL AND attempts < ?",
+            (MAX_ATTEMPTS,),
+        ).fetchone()
+        return count
+
+    def enqueue(self, payload: dict) -> None:
+        """Insert a payload; a no-op if the session was already queued."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO callback_outbox "
+                "(session_id, payload, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (payload["sessionId"], json.dumps(payload), now, now),
+            )
+            self._conn.commit()
+            self._pending += cursor.rowcount
+
+    def due(self, limit: int = BATCH_SIZE) -> List[Tuple[str, dict, int]]:
+        """Undelivered rows whose next attempt time has passed."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session_id, payload, attempts FROM callback_outbox "
+                "WHERE delivered_at IS NULL AND attempts < ? "
+                "AND next_attempt_at <= ? "
+                "ORDER BY next_attempt_at LIMIT ?",
+                (MAX_ATTEMPTS, time.time(), limit),
+            ).fetchall()
+        return [(sid, json.loads(payload), attempts) for sid, payload, attempts in rows]
+
+    def mark_delivered(self, session_id: str) -> None:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE callback_outbox SET delivered_at = ?, last_error = NULL "
+                "WHERE session_id = ? AND delivered_at IS NULL AND attempts < ?",
+                (time.time(), session_id, MAX_ATTEMPTS),
+            )
+            self._conn.commit()
+            self._pending -= cursor.rowcount
+
+    def mark_failed(self, session_id: str, attempts: int, error: str) -> None:
+        """
+        Record a failed attempt and schedule the next one with backoff.
+        The MAX_ATTEMPTS-th failure makes the row a dead letter.
+        """
+        delay = min(BACKOFF_BASE_SECONDS * (2 ** attempts), BACKOFF_MAX_SECONDS)
+        delay *= random.uniform(0.5, 1.0)
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE callback_outbox SET attempts = ?, next_attempt_at = ?, "
+                "last_error = ? "
+                "WHERE session_id = ? AND delivered_at IS NULL AND attempts < ?",
+                (attempts + 1, time.time() + delay, error, session_id, MAX_ATTEMPTS),
+            )
+            self._conn.commit()
+            if attempts + 1 >= MAX_ATTEMPTS:
+                self._pending -= cursor.rowcount
+
+    def prune(
+        self, retention_seconds: float = CALLBACK_OUTBOX_RETENTION_SECONDS
+    ) -> int:
+        """
+        Delete rows delivered, or abandoned after their last attempt,
+        more than `retention_seconds` ago. Freed pages are reused by
+        later inserts.
+        """
+        horizon = time.time() - retention_seconds
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM callback_outbox WHERE delivered_at < ? "
+                "OR (delivered_at IS NULL AND attempts >= ? AND next_attempt_at < ?)",
+                (horizon, MAX_ATTEMPTS, horizon),
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    # ─────────────────────────────────────────────
+    # Handover: undelivered rows move with their session
+    # ─────────────────────────────────────────────
+
+    def export_pending(self, session_ids: List[str]) -> Dict[str, Dict]:
+        """Undelivered rows for `session_ids`, keyed by session id."""
+        if not session_ids:
+            return {}
+        marks = ",".join("?" * len(session_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session_id, payload, attempts, next_attempt_at, created_at "
+                "FROM callback_outbox WHERE delivered_at IS NULL "
+                f"AND session_id IN ({marks})",
+                session_ids,
+            ).fetchall()
+        return {
+            sid: {
+                "payload": json.loads(payload),
+                "attempts": attempts,
+                "nextAttemptAt": next_attempt_at,
+                "createdAt": created_at,
+            }
+            for sid, payload, attempts, next_attempt_at, created_at in rows
+        }
+
+    def import_pending(self, rows: Dict[str, Dict]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO callback_outbox "
+                "(session_id, payload, attempts, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        sid,
+                        json.dumps(row["payload"]),
+                        row["attempts"],
+                        row["nextAttemptAt"],
+                        row["createdAt"],
+                    )
+                    for sid, row in rows.items()
+                ],
+            )
+            self._conn.commit()
+            self._pending = self._count_pending()
+
+    def remove_pending(self, session_ids: List[str]) -> None:
+        if not session_ids:
+            return
+        marks = ",".join("?" * len(session_ids))
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM callback_outbox WHERE delivered_at IS NULL "
+                f"AND session_id IN ({marks})",
+                session_ids,
+            )
+            self._conn.commit()
+            self._pending = self._count_pending()
+
+    def pending_count(self) -> int:
+        """Rows still to be delivered; safe to call on the event loop."""
+        return self._pending
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class OutboxWorker:
+    """
+    Background task that drains the outbox in batches. Each batch is
+    delivered concurrently; failures are rescheduled with exponential
+    backoff and jitter. `on_delivered(session_id)` runs once delivery
+    is confirmed. Every PRUNE_INTERVAL_SECONDS, rows past their
+    retention are deleted. SQLite calls run in a thread, off the event
+    loop.
+    """
+
+    def __init__(
+        self,
+        outbox: CallbackOutbox,
+        on_delivered: Optional[Callable[[str], Awaitable[None]]] = None,
+        deliver: Callable[[dict], Awaitable[bool]] = post_payload,
+    ):
+        self.outbox = outbox
+        self.on_delivered = on_delivered
+        self.deliver = deliver
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def drain_once(self) -> int:
+        """Deliver one batch of due callbacks. Returns the batch size."""
+        batch = await asyncio.to_thread(self.outbox.due, BATCH_SIZE)
+        if not batch:
+            return 0
+
+        results = await asyncio.gather(
+            *(self.deliver(payload) for _, payload, _ in batch),
+            return_exceptions=True,
+        )
+
+        for (session_id, _, attempts), result in zip(batch, results):
+            if result is True:
+                CALLBACKS.inc(result="delivered")
+                await asyncio.to_thread(self.outbox.mark_delivered, session_id)
+                if self.on_delivered is not None:
+                    await self.on_delivered(session_id)
+            else:
+                error = repr(result) if isinstance(result, BaseException) else "delivery failed"
+                CALLBACKS.inc(result="failed")
+                await asyncio.to_thread(
+                    self.outbox.mark_failed, session_id, attempts, error
+                )
+                if attempts + 1 >= MAX_ATTEMPTS:
+                    CALLBACKS.inc(result="abandoned")
+                    logger.error(
+                        "Giving up on callback for session %s after %d attempts",
+                        session_id,
+                        attempts + 1,
+                    )
+
+        return len(batch)
+
+    async def prune_once(self) -> int:
+        pruned = await asyncio.to_thread(self.outbox.prune)
+        if pruned:
+            logger.info("Pruned %d delivered or abandoned callbacks", pruned)
+        return pruned
+
+    async def _run(self) -> None:
+        next_prune = 0.0
+        while True:
+            try:
+                if time.monotonic() >= next_prune:
+                    next_prune = time.monotonic() + PRUNE_INTERVAL_SECONDS
+                    await self.prune_once()
+                processed = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox drain failed")
+                processed = 0
+
+            # Keep draining while full batches are coming back
+            if processed < BATCH_SIZE:
+                await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+
+# Created on first use so importing this module never touches disk
+_outbox: Optional[CallbackOutbox] = None
+
+
+def get_outbox() -> CallbackOutbox:
+    global _outbox
+    if _outbox is None:
+        _outbox = CallbackOutbox()
+    return _outbox
@@ -0,0 +1,93 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from app.storage.models import SessionState, Message
+
+
+class SessionStore(ABC):
+    """
+    Persistence backend behind SessionManager.
+
+    A store hands out SessionState objects and persists changes made to
+    them. History is append-only: `append_messages` receives only the
+    messages added this turn, never the whole transcript.
+    """
+
+    @abstractmethod
+    async def get_or_create(self, session_id: str) -> SessionState:
+        """Load a session (refreshing its TTL) or create an empty one."""
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[SessionState]:
+        """Load a live session without creating it."""
+
+    @abstractmethod
+    async def append_messages(
+        self, session: SessionState, messages: List[Message]
+    ) -> None:
+        """Persist messages already appended to `session` this turn."""
+
+    @abstractmethod
+    async def save(self, session: SessionState) -> None:
+        """Persist the non-history fields of `session`."""
+
+    @abstractmethod
+    async def set_fields(self, session_id: str, **fields) -> None:
+        """Update individual fields of a stored session, if it exists."""
+
+    async def load_history(self, session_id: str) -> List[Message]:
+        """Full transcript of a session, oldest first."""
+        session = await self.get(session_id)
+        if session is None:
+            return []
+        records = await session.conversationHistory.read_full()
+        return [r.to_message() for r in records]
+
+    async def load_history_range(
+        self, session_id: str, start: int, end: int
+    ) -> List[Message]:
+        """Messages `start` to `end` (exclusive) of a session's transcript."""
+        session = await self.get(session_id)
+        if session is None:
+            return []
+        records = await session.conversationHistory.read_range(start, end)
+        return [r.to_message() for r in records]
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Cheap point-in-time gauges (e.g. live sessions, in-memory history
+        bytes). Stores that can't answer without a round trip return {}.
+        """
+        return {}
+
+    # ─────────────────────────────────────────────
+    # Handover between worker processes
+    # ─────────────────────────────────────────────
+    # Only process-local stores need these; a shared store (Redis) is
+    # already visible to every worker, so the defaults move nothing.
+
+    def session_ids(self) -> List[str]:
+        return []
+
+    async def export_sessions(self, session_ids: List[str]) -> List[Dict]:
+        """
+        Serialize the given sessions (full history included). They stay
+        in this store until `remove_sessions`, so a failed import on the
+        other side loses nothing.
+        """
+        return []
+
+    async def import_sessions(self, sessions: List[Dict]) -> int:
+        """Take over sessions produced by `export_sessions`, replacing any copy."""
+        return 0
+
+    async def remove_sessions(self, session_ids: List[str]) -> int:
+        """Drop sessions that now live elsewhere."""
+        return 0
+
+    def sweep_expired(self) -> int:
+        """Drop idle sessions. Stores with native expiry return 0."""
+        return 0
+
+    async def close(self) -> None:
+        pass
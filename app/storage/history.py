@@ -0,0 +1,247 @@
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import (
+    TYPE_CHECKING, Deque, Dict, Iterable, Iterator, List, Optional, Union,
+)
+
+if TYPE_CHECKING:
+    from app.storage.models import Message
+
+# All spill file I/O runs on this one thread, in submission order: a
+# read or delete queued after a write sees it done. `_pending_lock`
+# only guards the handoff of pending lines, never file I/O.
+_spill_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-spill")
+_pending_lock = threading.Lock()
+
+
+def _timestamp_ms(value: Union[int, datetime, str]) -> int:
+    """Normalize the loose Message.timestamp union to epoch milliseconds."""
+    if isinstance(value, bool):
+        return int(time.time() * 1000)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return int(datetime.fromisoformat(value).timestamp() * 1000)
+    except (TypeError, ValueError):
+        return int(time.time() * 1000)
+
+
+class HistoryRecord:
+    """
+    Compact, validated-once form of a Message. Sender names are interned,
+    so each record is three references and a slotted header.
+    """
+
+    __slots__ = ("sender", "text", "timestamp")
+
+    def __init__(self, sender: str, text: str, timestamp: int):
+        self.sender = sys.intern(sender)
+        self.text = text
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_message(cls, message: "Message") -> "HistoryRecord":
+        return cls(message.sender, message.text, _timestamp_ms(message.timestamp))
+
+    def to_message(self) -> "Message":
+        from app.storage.models import Message
+
+        return Message(sender=self.sender, text=self.text, timestamp=self.timestamp)
+
+    def to_dict(self) -> Dict:
+        return {"sender": self.sender, "text": self.text, "timestamp": self.timestamp}
+
+
+class HotBytesCounter:
+    """Running sum of `hot_bytes` over every history sharing it."""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+
+class ConversationHistory:
+    """
+    Bounded in-memory history. The most recent `hot_window` messages stay
+    in memory; older ones are appended to a per-session JSONL file (when
+    a spill path is set) and can be read back with `read_full` or, a
+    slice at a time, `read_range`.
+
+    Spilling never touches the file on the caller's thread: lines are
+    queued and written in batches by the spill thread.
+
+    With a `counter`, every change to hot_bytes is added to it, until
+    `discard` takes the history's bytes back out.
+
+    Iteration, len() and indexing cover the hot window only.
+    """
+
+    __slots__ = (
+        "_hot", "_hot_bytes", "_spill_path", "_spilled", "_pending", "_counter",
+    )
+
+    def __init__(
+        self,
+        hot_window: int,
+        spill_path: Optional[str] = None,
+        counter: Optional[HotBytesCounter] = None,
+    ):
+        self._hot: Deque[HistoryRecord] = deque(maxlen=hot_window)
+        self._hot_bytes = 0
+        self._spill_path = spill_path
+        self._spilled = 0
+        self._pending: List[str] = []
+        self._counter = counter
+
+    @classmethod
+    def from_messages(
+        cls,
+        messages: Iterable["Message"],
+        hot_window: int,
+        spill_path: Optional[str] = None,
+    ) -> "ConversationHistory":
+        history = cls(hot_window, spill_path)
+        for message in messages:
+            history.append(message)
+        return history
+
+    @staticmethod
+    def spill_path_for(spill_dir: str, session_id: str) -> str:
+        # Hashed so a hostile session id can never escape spill_dir
+        name = hashlib.sha1(session_id.encode("utf-8")).hexdigest()
+        return os.path.join(spill_dir, f"{name}.jsonl")
+
+    def append(self, message: Union["Message", HistoryRecord]) -> None:
+        if not isinstance(message, HistoryRecord):
+            message = HistoryRecord.from_message(message)
+
+        hot = self._hot
+        delta = len(message.text.encode("utf-8"))
+        if len(hot) == hot.maxlen:
+            self._spill(hot[0])
+            delta -= len(hot[0].text.encode("utf-8"))
+        hot.append(message)
+        self._hot_bytes += delta
+        if self._counter is not None:
+            self._counter.value += delta
+
+    def _spill(self, record: HistoryRecord) -> None:
+        self._spilled += 1
+        if self._spill_path is None:
+            return
+        line = json.dumps([record.sender, record.text, record.timestamp])
+        with _pending_lock:
+            self._pending.append(line + "\n")
+            # One flush is queued per batch; later lines ride along
+            schedule = len(self._pending) == 1
+        if schedule:
+            _spill_writer.submit(self._flush)
+
+    def _flush(self) -> None:
+        """Spill thread: append the pending lines in one write."""
+        with _pending_lock:
+            lines, self._pending = self._pending, []
+        if not lines:
+            return
+        os.makedirs(os.path.dirname(self._spill_path) or ".", exist_ok=True)
+        with open(self._spill_path, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+
+    @property
+    def total(self) -> int:
+        """Messages ever appended, including spilled ones."""
+        return self._spilled + len(self._hot)
+
+    @property
+    def hot_bytes(self) -> int:
+        """UTF-8 size of the message texts held in memory."""
+        return self._hot_bytes
+
+    def recent(self, n: int) -> List[HistoryRecord]:
+        if n <= 0:
+            return []
+        hot = self._hot
+        return list(hot)[-n:] if n < len(hot) else list(hot)
+
+    def as_dicts(self) -> List[Dict]:
+        return [record.to_dict() for record in self._hot]
+
+    async def read_full(self) -> List[HistoryRecord]:
+        """Whole transcript, oldest first. Reads the spill file."""
+        return await self.read_range(0, self.total)
+
+    async def read_range(self, start: int, end: int) -> List[HistoryRecord]:
+        """
+        Messages `start` to `end` (exclusive) of the whole transcript.
+        Only the spill lines before `end` are read, on the spill thread
+        after every line already queued has been written.
+        """
+        end = min(end, self.total)
+        if start >= end:
+            return []
+        # Snapshot on the calling thread; the loop may append meanwhile
+        spilled, hot = self._spilled, list(self._hot)
+        records: List[HistoryRecord] = []
+        if start < spilled and self._spill_path is not None:
+            records = await asyncio.get_running_loop().run_in_executor(
+                _spill_writer, self._read_spill, start, min(end, spilled)
+            )
+        if end > spilled:
+            records.extend(hot[max(start - spilled, 0):end - spilled])
+        return records
+
+    def _read_spill(self, start: int, stop: int) -> List[HistoryRecord]:
+        records: List[HistoryRecord] = []
+        if not os.path.exists(self._spill_path):
+            return records
+        with open(self._spill_path, encoding="utf-8") as f:
+            for index, line in enumerate(f):
+                if index >= stop:
+                    break
+                if index >= start:
+                    sender, text, timestamp = json.loads(line)
+                    records.append(HistoryRecord(sender, text, timestamp))
+        return records
+
+    def discard(self) -> None:
+        """Delete the spill file; called when the session expires."""
+        if self._counter is not None:
+            self._counter.value -= self._hot_bytes
+            self._counter = None
+        if self._spill_path is None:
+            return
+        with _pending_lock:
+            self._pending = []
+        _spill_writer.submit(self._remove)
+
+    def _remove(self) -> None:
+        try:
+            os.remove(self._spill_path)
+        except FileNotFoundError:
+            pass
+
+    def __len__(self) -> int:
+        return len(self._hot)
+
+    def __iter__(self) -> Iterator[HistoryRecord]:
+        return iter(self._hot)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._hot)[index]
+        return self._hot[index]
@@ -0,0 +1,197 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Optional
+
+from app.config import HISTORY_HOT_WINDOW, HISTORY_SPILL_DIR
+from app.storage.base import SessionStore
+from app.storage.history import ConversationHistory, HistoryRecord, HotBytesCounter
+from app.storage.models import SessionState, Message
+
+LOCK_STRIPES = 64
+
+
+class _Stripe:
+    """
+    One shard of the session table. Sessions are kept in last-activity
+    order, so the oldest entries are always at the front.
+    """
+
+    __slots__ = ("lock", "sessions")
+
+    def __init__(self):
+        self.lock = Lock()
+        self.sessions: "OrderedDict[str, SessionState]" = OrderedDict()
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Process-local session store.
+
+    Sessions are sharded across lock stripes by session-id hash and
+    expire on a sliding TTL measured from their last activity. The
+    SessionState objects handed out are the stored objects themselves,
+    so appends and saves are no-ops. History beyond the hot window is
+    spilled to disk under HISTORY_SPILL_DIR and removed on expiry.
+
+    `stats()` is read on every metrics scrape, so the in-memory history
+    size is a running total kept by the histories themselves.
+    """
+
+    def __init__(self, ttl_seconds: float, stripes: int = LOCK_STRIPES):
+        self._stripes = [_Stripe() for _ in range(stripes)]
+        self._ttl = ttl_seconds
+        self._hot_bytes = HotBytesCounter()
+
+    def _stripe_for(self, session_id: str) -> _Stripe:
+        return self._stripes[hash(session_id) % len(self._stripes)]
+
+    async def get_or_create(self, session_id: str) -> SessionState:
+        now = time.time()
+        stripe = self._stripe_for(session_id)
+        with stripe.lock:
+            self._expire_stripe(stripe, now)
+            session = stripe.sessions.get(session_id)
+            if session is None:
+                session = SessionState(
+                    sessionId=session_id,
+                    scamDetected=False,
+                    totalMessagesExchanged=0,
+                    agentNotes=None,
+                    conversationHistory=ConversationHistory(
+                        HISTORY_HOT_WINDOW,
+                        ConversationHistory.spill_path_for(
+                            HISTORY_SPILL_DIR, session_id
+                        ),
+                        self._hot_bytes,
+                    ),
+                )
+                stripe.sessions[session_id] = session
+            else:
+                stripe.sessions.move_to_end(session_id)
+            session.lastActivityAt = now
+            return session
+
+    async def get(self, session_id: str) -> Optional[SessionState]:
+        session = self._stripe_for(session_id).sessions.get(session_id)
+        if session is None or self._is_expired(session, time.time()):
+            return None
+        return session
+
+    async def append_messages(
+        self, session: SessionState, messages: List[Message]
+    ) -> None:
+        pass
+
+    async def save(self, session: SessionState) -> None:
+        pass
+
+    async def set_fields(self, session_id: str, **fields) -> None:
+        session = await self.get(session_id)
+        if session is not None:
+            for name, value in fields.items():
+                setattr(session, name, value)
+
+    # ─────────────────────────────────────────────
+    # Handover
+    # ─────────────────────────────────────────────
+
+    def session_ids(self) -> List[str]:
+        ids: List[str] = []
+        for stripe in self._stripes:
+            with stripe.lock:
+                ids.extend(stripe.sessions)
+        return ids
+
+    async def export_sessions(self, session_ids: List[str]) -> List[Dict]:
+        exported = []
+        for session_id in session_ids:
+            session = self._stripe_for(session_id).sessions.get(session_id)
+            if session is None:
+                continue
+            history = session.conversationHistory
+            data = session.model_dump(mode="json", exclude={"conversationHistory"})
+            records = await history.read_full()
+            data["conversationHistory"] = [r.to_dict() for r in records]
+            exported.append(data)
+        return exported
+
+    async def import_sessions(self, sessions: List[Dict]) -> int:
+        for data in sessions:
+            session_id = data["sessionId"]
+            stripe = self._stripe_for(session_id)
+            with stripe.lock:
+                previous = stripe.sessions.pop(session_id, None)
+            if previous is not None:
+                # Left over from an earlier, rolled back handover
+                previous.conversationHistory.discard()
+            history = ConversationHistory(
+                HISTORY_HOT_WINDOW,
+                ConversationHistory.spill_path_for(HISTORY_SPILL_DIR, session_id),
+                self._hot_bytes,
+            )
+            for record in data.get("conversationHistory", []):
+                history.append(
+                    HistoryRecord(
+                        record["sender"], record["text"], record["timestamp"]
+                    )
+                )
+            session = SessionState.model_validate(
+                {**data, "conversationHistory": history}
+            )
+            # Appended at the back of the stripe, so it must count as
+            # the most recent activity to keep the expiry order intact
+            session.lastActivityAt = time.time()
+            with stripe.lock:
+                stripe.sessions[session_id] = session
+                stripe.sessions.move_to_end(session_id)
+        return len(sessions)
+
+    async def remove_sessions(self, session_ids: List[str]) -> int:
+        removed = 0
+        for session_id in session_ids:
+            stripe = self._stripe_for(session_id)
+            with stripe.lock:
+                session = stripe.sessions.pop(session_id, None)
+            if session is not None:
+                session.conversationHistory.discard()
+                removed += 1
+        return removed
+
+    def __len__(self) -> int:
+        return sum(len(stripe.sessions) for stripe in self._stripes)
+
+    def stats(self) -> Dict[str, float]:
+        return {"sessions": len(self), "historyBytes": self._hot_bytes.value}
+
+    # ─────────────────────────────────────────────
+    # Expiration
+    # ─────────────────────────────────────────────
+
+    def _is_expired(self, session: SessionState, now: float) -> bool:
+        return now - session.lastActivityAt > self._ttl
+
+    def _expire_stripe(self, stripe: _Stripe, now: float) -> int:
+        """
+        Pop expired sessions from the front of a stripe. Called under the
+        stripe lock. Stops at the first live session, so the cost is
+        proportional to the number of sessions removed.
+        """
+        removed = 0
+        sessions = stripe.sessions
+        while sessions:
+            session = next(iter(sessions.values()))
+            if not self._is_expired(session, now):
+                break
+            sessions.popitem(last=False)
+            session.conversationHistory.discard()
+            removed += 1
+        return removed
+
+    def sweep_expired(self) -> int:
+        now = time.time()
+        removed = 0
+        for stripe in self._stripes:
+            with stripe.lock:
+                removed += self._expire_stripe(stripe, now)
+        return removed
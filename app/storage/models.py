@@ -1,8 +1,11 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import List, Optional, Literal, Union
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Any, Dict, List, Optional, Literal, Set, Union
 from datetime import datetime
 import time
 
+from app.config import BATCH_MAX_ITEMS, HISTORY_HOT_WINDOW
+from app.storage.history import ConversationHistory
+
 
 class Message(BaseModel):
     sender: str
@@ -31,6 +34,23 @@ class HoneypotResponse(BaseModel):
     message: Message
 
 
+class HoneypotBatchRequest(BaseModel):
+    # Items are validated one by one so a bad item fails alone
+    items: List[Any] = Field(min_length=1, max_length=BATCH_MAX_ITEMS)
+
+
+class HoneypotBatchItemResult(BaseModel):
+    index: int
+    sessionId: Optional[str] = None
+    status: Literal["success", "error"]
+    message: Optional[Message] = None
+    error: Optional[str] = None
+
+
+class HoneypotBatchResponse(BaseModel):
+    results: List[HoneypotBatchItemResult]
+
+
 class ExtractedIntelligence(BaseModel):
     bankAccounts: List[str] = Field(default_factory=list)
     upiIds: List[str] = Field(default_factory=list)
@@ -40,15 +60,42 @@ class ExtractedIntelligence(BaseModel):
 
 
 class SessionState(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     sessionId: str
     scamDetected: bool = False
     scamCategories: List[str] = Field(default_factory=list)
     persona: Optional[str] = None
     totalMessagesExchanged: int = 0
-    conversationHistory: List[Message] = Field(default_factory=list)
+    # Hot window only; see app/storage/history.py
+    conversationHistory: ConversationHistory = Field(
+        default_factory=lambda: ConversationHistory(HISTORY_HOT_WINDOW)
+    )
     extractedIntelligence: ExtractedIntelligence = Field(
         default_factory=ExtractedIntelligence
     )
+    # Running IOC sets keyed by ExtractedIntelligence field name,
+    # merged incrementally as new messages arrive.
+    iocSets: Dict[str, Set[str]] = Field(default_factory=dict)
+    # Characters of this session's messages scanned for IOCs so far,
+    # capped at SCAN_MAX_SESSION_CHARS
+    scannedChars: int = 0
+    # Rolling summary of the first `summarizedUpTo` messages, written in
+    # the background by ConversationSummarizer
+    conversationSummary: Optional[str] = None
+    summarizedUpTo: int = 0
     agentNotes: Optional[str] = None
+    callbackQueued: bool = False
     callbackSent: bool = False
     createdAt: float = Field(default_factory=time.time)
+    lastActivityAt: float = Field(default_factory=time.time)
+
+    @field_validator("conversationHistory", mode="before")
+    @classmethod
+    def coerce_history(cls, v):
+        if isinstance(v, ConversationHistory):
+            return v
+        return ConversationHistory.from_messages(
+            (m if isinstance(m, Message) else Message.model_validate(m) for m in v),
+            HISTORY_HOT_WINDOW,
+        )
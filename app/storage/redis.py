@@ -1,26 +1,161 @@
 import json
-import os
-import redis
-from app.storage.models import SessionState
+import time
+from typing import Dict, List, Optional
 
-REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+from redis import asyncio as redis_asyncio
 
-redis_client = redis.from_url(
-    REDIS_URL,
-    decode_responses=True
-)
+from app.config import HISTORY_HOT_WINDOW
+from app.storage.base import SessionStore
+from app.storage.models import SessionState, Message
 
+KEY_PREFIX = "honeypot:session:"
+MAX_CONNECTIONS = 100
 
-async def get_session(session_id: str) -> SessionState:
-    data = await redis_client.get(session_id)
-    if not data:
-        return SessionState(sessionId=session_id)
-    return SessionState(**json.loads(data))
+# Never written back by `save` from a possibly stale local copy: the
+# counter is maintained with HINCRBY so concurrent replicas never lose a
+# count, the summary fields are only written by the background
+# summarizer and callbackSent by the outbox worker, through `set_fields`.
+_COUNTER_FIELDS = {"totalMessagesExchanged"}
+_BACKGROUND_FIELDS = {"conversationSummary", "summarizedUpTo", "callbackSent"}
 
 
-async def save_session(session: SessionState):
-    await redis_client.set(
-        session.sessionId,
-        session.model_dump_json(),
-        ex=3600  # 1 hour TTL
-    )
+class RedisSessionStore(SessionStore):
+    """
+    Redis-backed session store shared by several API replicas.
+
+    Layout per session:
+      {prefix}{id}          hash, one JSON-encoded value per SessionState field
+      {prefix}{id}:history  list of JSON-encoded messages, append-only
+
+    Only the hot window of history is loaded per turn: the prompt uses
+    the last few messages and IOC extraction is incremental. The Redis
+    list itself holds the full transcript, so nothing is spilled locally.
+
+    Every read and write is a single pipelined round trip, and both keys
+    carry a sliding TTL refreshed on each access. Turns of the same
+    session handled concurrently by different replicas are last-writer-
+    wins on state fields; history appends and the message counter are
+    atomic.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ttl_seconds: int,
+        client: Optional[redis_asyncio.Redis] = None,
+    ):
+        if client is None:
+            pool = redis_asyncio.ConnectionPool.from_url(
+                url,
+                max_connections=MAX_CONNECTIONS,
+                decode_responses=True,
+            )
+            client = redis_asyncio.Redis(connection_pool=pool)
+        self._client = client
+        self._ttl = int(ttl_seconds)
+
+    @staticmethod
+    def _state_key(session_id: str) -> str:
+        return f"{KEY_PREFIX}{session_id}"
+
+    @staticmethod
+    def _history_key(session_id: str) -> str:
+        return f"{KEY_PREFIX}{session_id}:history"
+
+    @staticmethod
+    def _encode_state(session: SessionState, exclude=()) -> Dict[str, str]:
+        data = session.model_dump(
+            mode="json",
+            exclude={"conversationHistory", *exclude},
+        )
+        return {name: json.dumps(value) for name, value in data.items()}
+
+    async def _load(
+        self, session_id: str
+    ) -> tuple[Dict[str, str], List[str]]:
+        state_key = self._state_key(session_id)
+        history_key = self._history_key(session_id)
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.hgetall(state_key)
+            pipe.lrange(history_key, -HISTORY_HOT_WINDOW, -1)
+            pipe.expire(state_key, self._ttl)
+            pipe.expire(history_key, self._ttl)
+            state, history, _, _ = await pipe.execute()
+        return state, history
+
+    @staticmethod
+    def _decode(state: Dict[str, str], history: List[str]) -> SessionState:
+        data = {name: json.loads(value) for name, value in state.items()}
+        data["conversationHistory"] = [
+            Message.model_validate_json(raw) for raw in history
+        ]
+        return SessionState.model_validate(data)
+
+    async def get_or_create(self, session_id: str) -> SessionState:
+        state, history = await self._load(session_id)
+        if state:
+            session = self._decode(state, history)
+            session.lastActivityAt = time.time()
+            return session
+
+        session = SessionState(
+            sessionId=session_id,
+            scamDetected=False,
+            totalMessagesExchanged=0,
+            agentNotes=None,
+        )
+        await self.save(session)
+        return session
+
+    async def get(self, session_id: str) -> Optional[SessionState]:
+        state, history = await self._load(session_id)
+        return self._decode(state, history) if state else None
+
+    async def append_messages(
+        self, session: SessionState, messages: List[Message]
+    ) -> None:
+        if not messages:
+            return
+        state_key = self._state_key(session.sessionId)
+        history_key = self._history_key(session.sessionId)
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.rpush(history_key, *(m.model_dump_json() for m in messages))
+            pipe.hincrby(state_key, "totalMessagesExchanged", len(messages))
+            pipe.expire(history_key, self._ttl)
+            pipe.expire(state_key, self._ttl)
+            await pipe.execute()
+
+    async def save(self, session: SessionState) -> None:
+        state_key = self._state_key(session.sessionId)
+        mapping = self._encode_state(
+            session, exclude=_COUNTER_FIELDS | _BACKGROUND_FIELDS
+        )
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.hset(state_key, mapping=mapping)
+            pipe.hsetnx(state_key, "totalMessagesExchanged", "0")
+            pipe.expire(state_key, self._ttl)
+            await pipe.execute()
+
+    async def set_fields(self, session_id: str, **fields) -> None:
+        state_key = self._state_key(session_id)
+        if not await self._client.exists(state_key):
+            return
+        await self._client.hset(
+            state_key,
+            mapping={name: json.dumps(value) for name, value in fields.items()},
+        )
+
+    async def load_history(self, session_id: str) -> List[Message]:
+        raw = await self._client.lrange(self._history_key(session_id), 0, -1)
+        return [Message.model_validate_json(r) for r in raw]
+
+    async def load_history_range(
+        self, session_id: str, start: int, end: int
+    ) -> List[Message]:
+        if start >= end:
+            return []
+        raw = await self._client.lrange(self._history_key(session_id), start, end - 1)
+        return [Message.model_validate_json(r) for r in raw]
+
+    async def close(self) -> None:
+        await self._client.aclose()
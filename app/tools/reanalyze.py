@@ -0,0 +1,317 @@
+"""
+Re-score archived transcripts with the configured scam detector
+(SCAM_CLASSIFIER) and IntelligenceExtractor.
+
+Input is JSONL, one conversation per line:
+    {"sessionId": "...", "conversationHistory": [{"sender", "text", ...}]}
+("messages" is accepted in place of "conversationHistory").
+
+The input is read line by line and handed to a process pool in chunks,
+with a bounded number of chunks in flight, so memory stays flat however
+large the file is. Results are written in input order, as JSONL or CSV.
+After each chunk is written, the input byte offset reached is saved to
+`<output>.checkpoint`; `--resume` continues from there.
+
+    python -m app.tools.reanalyze transcripts.jsonl -o rescored.jsonl
+    python -m app.tools.reanalyze transcripts.jsonl -o rescored.csv --format csv
+    python -m app.tools.reanalyze transcripts.jsonl -o rescored.jsonl --resume
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_CHUNK_LINES = 500
+PROGRESS_INTERVAL_SECONDS = 5.0
+
+IOC_COLUMNS = (
+    "bankAccounts",
+    "upiIds",
+    "phishingLinks",
+    "phoneNumbers",
+    "suspiciousKeywords",
+)
+CSV_COLUMNS = (
+    "offset",
+    "sessionId",
+    "messages",
+    "scamDetected",
+    "scamCategories",
+    "confidence",
+    "detectedAtMessage",
+    *IOC_COLUMNS,
+    "error",
+)
+
+Chunk = List[Tuple[int, bytes]]  # (byte offset, raw line)
+
+
+# ─────────────────────────────────────────────
+# Worker side
+# ─────────────────────────────────────────────
+
+_detector = None
+
+
+def _init_worker() -> None:
+    global _detector
+    from app.core.scam_detector import build_scam_detector
+
+    _detector = build_scam_detector()
+
+
+def analyze_conversation(data: Dict, detector) -> Dict:
+    """
+    Same decisions the API makes over a whole conversation: detection
+    runs on each scammer message, capped at SCAN_MAX_MESSAGE_CHARS,
+    until it fires; IOCs are extracted message by message with
+    `IntelligenceExtractor.update`, under the same per-message and
+    per-session caps.
+    """
+    from app.config import SCAN_MAX_MESSAGE_CHARS
+    from app.core.intelligence import IntelligenceExtractor
+    from app.storage.history import HistoryRecord
+    from app.storage.models import SessionState
+
+    messages = data.get("conversationHistory")
+    if messages is None:
+        messages = data.get("messages", [])
+
+    records = [
+        HistoryRecord(
+            str(m.get("sender", "")), str(m.get("text", "")), m.get("timestamp", 0)
+        )
+        for m in messages
+    ]
+
+    scammer_turns = [i for i, r in enumerate(records) if r.sender != "agent"]
+    # One vectorized pass over the whole transcript
+    verdicts = detector.detect_batch(
+        [records[i].text[:SCAN_MAX_MESSAGE_CHARS] for i in scammer_turns]
+    )
+
+    detected, categories, confidence, detected_at = False, [], 0.0, None
+    for index, (is_scam, found, score) in zip(scammer_turns, verdicts):
+        if is_scam:
+            detected, categories, confidence = True, found, score
+            detected_at = index
+            break
+
+    # Replayed turn by turn on a scratch session, as the API sees them
+    session = SessionState(sessionId=str(data.get("sessionId") or ""))
+    intelligence = IntelligenceExtractor.update(session, records)
+    # Sorted so re-runs of the same input diff cleanly
+    iocs = {name: sorted(values) for name, values in intelligence.model_dump().items()}
+    return {
+        "sessionId": data.get("sessionId"),
+        "messages": len(records),
+        "scamDetected": detected,
+        "scamCategories": categories,
+        "confidence": confidence,
+        "detectedAtMessage": detected_at,
+        **iocs,
+    }
+
+
+def _analyze_chunk(chunk: Chunk) -> List[Dict]:
+    results = []
+    for offset, line in chunk:
+        try:
+            result = analyze_conversation(json.loads(line), _detector)
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {e}"}
+        result["offset"] = offset
+        results.append(result)
+    return results
+
+
+# ─────────────────────────────────────────────
+# Reader / writers
+# ─────────────────────────────────────────────
+
+def read_chunks(
+    path: str, start_offset: int, chunk_lines: int
+) -> Iterator[Tuple[Chunk, int]]:
+    """Yield (chunk, end offset) from `start_offset`, one line at a time."""
+    with open(path, "rb") as f:
+        f.seek(start_offset)
+        offset = start_offset
+        chunk: Chunk = []
+        for line in f:
+            line_offset = offset
+            offset += len(line)
+            if line.strip():
+                chunk.append((line_offset, line))
+            if len(chunk) >= chunk_lines:
+                yield chunk, offset
+                chunk = []
+        if chunk:
+            yield chunk, offset
+
+
+class _JsonlWriter:
+    def __init__(self, f):
+        self._f = f
+
+    def write(self, result: Dict) -> None:
+        self._f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+class _CsvWriter:
+    def __init__(self, f, write_header: bool):
+        self._writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+        if write_header:
+            self._writer.writeheader()
+
+    def write(self, result: Dict) -> None:
+        row = dict(result)
+        for column in ("scamCategories", *IOC_COLUMNS):
+            if column in row:
+                row[column] = ";".join(row[column])
+        self._writer.writerow(row)
+
+
+def _checkpoint_path(output: str) -> str:
+    return output + ".checkpoint"
+
+
+def _read_checkpoint(output: str, input_path: str) -> int:
+    try:
+        with open(_checkpoint_path(output), encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except FileNotFoundError:
+        return 0
+    if checkpoint.get("input") != os.path.abspath(input_path):
+        raise SystemExit(
+            f"Checkpoint {_checkpoint_path(output)} belongs to {checkpoint.get('input')}"
+        )
+    return int(checkpoint["offset"])
+
+
+def _write_checkpoint(output: str, input_path: str, offset: int) -> None:
+    tmp = _checkpoint_path(output) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"input": os.path.abspath(input_path), "offset": offset}, f)
+    os.replace(tmp, _checkpoint_path(output))
+
+
+# ─────────────────────────────────────────────
+# Driver
+# ─────────────────────────────────────────────
+
+class _Progress:
+    def __init__(self, total_bytes: int, start_offset: int):
+        self.total_bytes = total_bytes
+        self.start_offset = start_offset
+        self.started = time.monotonic()
+        self.last_report = self.started
+        self.conversations = 0
+        self.errors = 0
+        self.offset = start_offset
+
+    def update(self, results: List[Dict], offset: int) -> None:
+        self.conversations += len(results)
+        self.errors += sum(1 for r in results if "error" in r)
+        self.offset = offset
+        now = time.monotonic()
+        if now - self.last_report >= PROGRESS_INTERVAL_SECONDS:
+            self.last_report = now
+            self.report()
+
+    def report(self, final: bool = False) -> None:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        done = self.offset / self.total_bytes * 100 if self.total_bytes else 100.0
+        print(
+            f"{'done' if final else 'progress'}: {self.conversations} conversations "
+            f"({self.errors} errors), {done:.1f}% of input, "
+            f"{self.conversations / elapsed:.0f}/s, offset {self.offset}",
+            file=sys.stderr,
+            flush=True,
+        )
+
+
+def run(
+    input_path: str,
+    output: str,
+    *,
+    fmt: str = "jsonl",
+    workers: Optional[int] = None,
+    chunk_lines: int = DEFAULT_CHUNK_LINES,
+    start_offset: Optional[int] = None,
+    resume: bool = False,
+) -> _Progress:
+    if resume:
+        start_offset = _read_checkpoint(output, input_path)
+    start_offset = start_offset or 0
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+
+    # Continuing a run appends to what it already wrote
+    appending = start_offset > 0 and os.path.exists(output)
+    progress = _Progress(os.path.getsize(input_path), start_offset)
+
+    with open(output, "a" if appending else "w", encoding="utf-8", newline="") as out, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        writer = (
+            _CsvWriter(out, write_header=not appending)
+            if fmt == "csv"
+            else _JsonlWriter(out)
+        )
+        pending: Deque[Tuple[Future, int]] = deque()
+
+        def flush_oldest() -> None:
+            future, end_offset = pending.popleft()
+            results = future.result()
+            for result in results:
+                writer.write(result)
+            out.flush()
+            _write_checkpoint(output, input_path, end_offset)
+            progress.update(results, end_offset)
+
+        for chunk, end_offset in read_chunks(input_path, start_offset, chunk_lines):
+            pending.append((pool.submit(_analyze_chunk, chunk), end_offset))
+            # Bounded window: the reader never runs far ahead of the writer
+            if len(pending) >= max_in_flight:
+                flush_oldest()
+        while pending:
+            flush_oldest()
+
+    progress.report(final=True)
+    return progress
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.tools.reanalyze",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("input", help="JSONL transcripts, one conversation per line")
+    parser.add_argument("-o", "--output", required=True)
+    parser.add_argument("--format", choices=("jsonl", "csv"), default="jsonl")
+    parser.add_argument("--workers", type=int, help="processes (default: all cores)")
+    parser.add_argument("--chunk-lines", type=int, default=DEFAULT_CHUNK_LINES)
+    start = parser.add_mutually_exclusive_group()
+    start.add_argument("--start-offset", type=int, help="input byte offset to start at")
+    start.add_argument("--resume", action="store_true",
+                       help="continue from the output's checkpoint")
+    args = parser.parse_args(argv)
+
+    run(
+        args.input,
+        args.output,
+        fmt=args.format,
+        workers=args.workers,
+        chunk_lines=args.chunk_lines,
+        start_offset=args.start_offset,
+        resume=args.resume,
+    )
+
+
+if __name__ == "__main__":
+    main()
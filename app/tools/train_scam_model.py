@@ -0,0 +1,152 @@
+"""
+Train the hashed n-gram scam classifier (SCAM_CLASSIFIER=ml) from
+labelled JSONL, one example per line:
+    {"text": "...", "scam": true, "categories": ["bank_fraud"]}
+or a whole transcript, whose labels apply to each scammer message:
+    {"conversationHistory": [{"sender", "text", ...}], "scam": true,
+     "categories": [...]}
+("messages" is accepted for "conversationHistory", "scamDetected" and
+"scamCategories" for "scam" and "categories").
+
+A random holdout is scored against the rule-based detector before the
+model is fitted on all examples and written as a compressed .npz.
+
+    python -m app.tools.train_scam_model labelled.jsonl -o scam_model.npz
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.ml_classifier import (
+    DEFAULT_N_FEATURES,
+    DEFAULT_THRESHOLD,
+    HashedNgramVectorizer,
+    train,
+)
+
+Example = Tuple[str, bool, List[str]]
+
+
+def load_examples(path: str) -> List[Example]:
+    examples: List[Example] = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            label = data.get("scam", data.get("scamDetected"))
+            if label is None:
+                raise SystemExit(f"{path}:{line_number}: no \"scam\" label")
+            categories = list(data.get("categories", data.get("scamCategories")) or [])
+
+            if "text" in data:
+                texts = [data["text"]]
+            else:
+                messages = data.get("conversationHistory")
+                if messages is None:
+                    messages = data.get("messages", [])
+                texts = [
+                    str(m.get("text", ""))
+                    for m in messages
+                    if m.get("sender") != "agent"
+                ]
+            examples.extend((text, bool(label), categories) for text in texts)
+    return examples
+
+
+def _report(name: str, predicted: Sequence[bool], actual: Sequence[bool]) -> None:
+    predicted = np.asarray(predicted, dtype=bool)
+    actual = np.asarray(actual, dtype=bool)
+    tp = int(np.sum(predicted & actual))
+    precision = tp / max(int(predicted.sum()), 1)
+    recall = tp / max(int(actual.sum()), 1)
+    accuracy = float(np.mean(predicted == actual)) if len(actual) else 0.0
+    print(
+        f"{name:<6} accuracy {accuracy:.3f}  precision {precision:.3f}  "
+        f"recall {recall:.3f}",
+        file=sys.stderr,
+    )
+
+
+def evaluate_holdout(examples: List[Example], holdout: float, opts: Dict) -> None:
+    from app.core.scam_detector import ScamDetector
+
+    order = np.random.default_rng(opts["seed"]).permutation(len(examples))
+    cut = int(len(examples) * (1 - holdout))
+    fit = [examples[i] for i in order[:cut]]
+    test = [examples[i] for i in order[cut:]]
+    if not fit or not test:
+        print("holdout: too few examples, skipped", file=sys.stderr)
+        return
+
+    model = train(
+        [e[0] for e in fit], [e[1] for e in fit], [e[2] for e in fit], **opts
+    )
+    actual = [e[1] for e in test]
+    _report("model", [r[0] for r in model.detect_batch([e[0] for e in test])], actual)
+    rules = ScamDetector()
+    _report("rules", [rules.detect_scam(e[0])[0] for e in test], actual)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.tools.train_scam_model",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("input", help="labelled JSONL")
+    parser.add_argument("-o", "--output", required=True, help="model .npz path")
+    parser.add_argument("--features", type=int, default=DEFAULT_N_FEATURES,
+                        help="hashed feature columns")
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--learning-rate", type=float, default=0.5)
+    parser.add_argument("--l2", type=float, default=1e-6)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="scam probability at which is_scam is True")
+    parser.add_argument("--holdout", type=float, default=0.1,
+                        help="fraction held out for the report (0 to skip)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    examples = load_examples(args.input)
+    if not examples:
+        raise SystemExit(f"No examples in {args.input}")
+    print(
+        f"{len(examples)} examples, {sum(e[1] for e in examples)} scam",
+        file=sys.stderr,
+    )
+
+    opts = dict(
+        vectorizer=HashedNgramVectorizer(args.features),
+        epochs=args.epochs,
+        learning_rate=args.learning_rate,
+        l2=args.l2,
+        batch_size=args.batch_size,
+        seed=args.seed,
+    )
+    if args.holdout > 0:
+        evaluate_holdout(examples, args.holdout, opts)
+
+    started = time.monotonic()
+    model = train(
+        [e[0] for e in examples],
+        [e[1] for e in examples],
+        [e[2] for e in examples],
+        **opts,
+    )
+    model.threshold = args.threshold
+    model.save(args.output)
+    print(
+        f"trained in {time.monotonic() - started:.1f}s, categories: "
+        f"{', '.join(model.categories) or '(none)'}; wrote {args.output}",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
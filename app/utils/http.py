@@ -0,0 +1,28 @@
+import httpx
+from typing import Optional
+
+# One pooled client for all outbound HTTP (LLM providers, callbacks).
+# Created lazily so importing this module never opens sockets.
+_client: Optional[httpx.AsyncClient] = None
+
+MAX_CONNECTIONS = 1000
+MAX_KEEPALIVE_CONNECTIONS = 100
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
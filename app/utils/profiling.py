@@ -0,0 +1,190 @@
+import cProfile
+import io
+import marshal
+import pstats
+import random
+import time
+import uuid
+from collections import deque
+from threading import Lock
+from typing import Deque, Dict, List, Optional
+
+from app.api.deps import is_valid_api_key
+from app.config import PROFILE_BUFFER_SIZE, PROFILE_SAMPLE_RATE, PROFILE_SLOW_MS
+
+FORCE_HEADER = b"x-profile"
+API_KEY_HEADER = b"x-api-key"
+
+
+class _StatsSource:
+    """What pstats.Stats accepts besides a file: create_stats() + .stats"""
+
+    def __init__(self, stats: Dict):
+        # pstats takes ownership of (and then clears) .stats
+        self.stats = dict(stats)
+
+    def create_stats(self) -> None:
+        pass
+
+
+class CapturedProfile:
+    """One profiled request: its metadata and raw pstats data."""
+
+    __slots__ = (
+        "id", "method", "path", "status", "duration_ms", "started_at",
+        "forced", "_stats",
+    )
+
+    def __init__(
+        self,
+        method: str,
+        path: str,
+        status: Optional[int],
+        duration_ms: float,
+        started_at: float,
+        forced: bool,
+        profiler: cProfile.Profile,
+    ):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.status = status
+        self.duration_ms = duration_ms
+        self.started_at = started_at
+        self.forced = forced
+        profiler.create_stats()
+        self._stats = profiler.stats
+
+    def summary(self) -> Dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "durationMs": round(self.duration_ms, 3),
+            "startedAt": self.started_at,
+            "forced": self.forced,
+        }
+
+    def report(self, sort: str = "cumulative", limit: int = 40) -> str:
+        out = io.StringIO()
+        stats = pstats.Stats(_StatsSource(self._stats), stream=out)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def dump(self) -> bytes:
+        """Same format as Profile.dump_stats (loadable by pstats/snakeviz)."""
+        return marshal.dumps(self._stats)
+
+
+class ProfileBuffer:
+    """Bounded ring buffer of captured profiles, newest last."""
+
+    def __init__(self, size: int = PROFILE_BUFFER_SIZE):
+        self._profiles: Deque[CapturedProfile] = deque(maxlen=size)
+        self._lock = Lock()
+
+    def add(self, profile: CapturedProfile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+
+    def list(self) -> List[Dict]:
+        with self._lock:
+            return [p.summary() for p in reversed(self._profiles)]
+
+    def get(self, profile_id: str) -> Optional[CapturedProfile]:
+        with self._lock:
+            for profile in self._profiles:
+                if profile.id == profile_id:
+                    return profile
+        return None
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._profiles)
+            self._profiles.clear()
+        return count
+
+
+profile_buffer = ProfileBuffer()
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that runs a sample of requests under cProfile.
+
+    A request is profiled when it is sampled (`sample_rate`) or carries
+    `X-Profile: 1` with a valid API key. Sampled profiles are kept only
+    when the request took at least `slow_ms`; forced ones are always
+    kept. The profile covers the whole response, streaming bodies
+    included.
+
+    cProfile hooks the thread, not the coroutine, so only one request is
+    profiled at a time and its profile also contains whatever other
+    requests ran on the event loop meanwhile. Requests arriving while a
+    profile is running are served unprofiled.
+    """
+
+    def __init__(
+        self,
+        app,
+        sample_rate: float = PROFILE_SAMPLE_RATE,
+        slow_ms: float = PROFILE_SLOW_MS,
+        buffer: ProfileBuffer = profile_buffer,
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.buffer = buffer
+        self._active = False
+
+    @staticmethod
+    def _forced(scope) -> bool:
+        headers = dict(scope.get("headers") or ())
+        if headers.get(FORCE_HEADER, b"").strip() not in (b"1", b"true"):
+            return False
+        api_key = headers.get(API_KEY_HEADER, b"").decode("latin-1")
+        return is_valid_api_key(api_key)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._active:
+            await self.app(scope, receive, send)
+            return
+
+        forced = self._forced(scope)
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        if not (forced or sampled):
+            await self.app(scope, receive, send)
+            return
+
+        status = None
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self._active = True
+        profiler = cProfile.Profile()
+        started_at = time.time()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            self._active = False
+            duration_ms = (time.perf_counter() - start) * 1000
+            if forced or duration_ms >= self.slow_ms:
+                self.buffer.add(
+                    CapturedProfile(
+                        scope.get("method", ""),
+                        scope.get("path", ""),
+                        status,
+                        duration_ms,
+                        started_at,
+                        forced,
+                        profiler,
+                    )
+                )
@@ -0,0 +1,185 @@
+"""
+Worst-case extraction latency on adversarial messages: the original
+unbounded IOC patterns and `re.search` detection vs the bounded,
+chunked scanner, plus the per-turn cost of `IntelligenceExtractor.update`
+and detection with the size caps applied, at megabyte-sized messages.
+
+Before timing anything, both implementations are run over a corpus of
+ordinary scam and chat messages and must agree exactly.
+
+Run from the repo root:
+    python -m benchmarks.bench_extraction_worst_case
+"""
+import random
+import re
+import sys
+import time
+from typing import Callable, Dict, List, Set, Tuple
+
+from app.config import SCAN_MAX_MESSAGE_CHARS
+from app.core.intelligence import (
+    SUSPICIOUS_KEYWORDS,
+    VALID_UPI_PROVIDERS,
+    IntelligenceExtractor,
+)
+from app.core.scam_detector import ScamDetector
+from app.storage.models import Message, SessionState
+
+# The patterns as they were before bounding, kept verbatim for comparison
+LEGACY_IFSC = re.compile(r"\b[a-z]{4}0[a-z0-9]{6}\b")
+LEGACY_ACCOUNT = re.compile(
+    r"(?:account|a/c|acct|acc)\s*(?:no\.?|number|num|#)?\s*:?\s*(\d{9,18})"
+)
+LEGACY_UPI = re.compile(r"\b[\w\.-]+@[\w\.-]+\b")
+LEGACY_LINK = re.compile(
+    r"http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|"
+    r"[!*\\(\\),]|(?:%[0-9a-fA-F]{2}))+"
+)
+LEGACY_PHONE = re.compile(r"(?<!\d)\+?\d{10,13}(?!\d)")
+
+NORMAL_LINES = [
+    "Your bank account will be blocked today, verify immediately.",
+    "Send the OTP to 9876543210 to avoid suspension.",
+    "Call +919876543210 or 08041234567 now",
+    "Pay the refund fee to refund.desk@paytm right now.",
+    "UPI: ramesh.k-99@oksbi, or scan the QR",
+    "My email is john@gmail.com, not a upi id",
+    "Click https://secure-kyc-update.example.com/login?id=42&ref=sms to update KYC.",
+    "Visit http://bit.ly/3xYz_9 (fast) or https://www.incometax.gov.in/iec/",
+    "Transfer to account no: 123456789012, IFSC sbin0001234.",
+    "A/C number 00112233445566 with acct#987654321",
+    "This is urgent, do not share your PIN or CVV with anyone.",
+    "Hi, are we still meeting for lunch tomorrow?",
+    "Reset password here: https://login.example.com/reset?token=ab%20cd",
+    "Congratulations! You won a prize, claim your reward within 24 hours",
+    "Bank account\nwill be blocked; police station and cyber cell informed",
+]
+
+PATHOLOGICAL: Dict[str, Callable[[int], str]] = {
+    "dotted words, no @": lambda n: "a." * (n // 2),
+    "@ then dotted words": lambda n: "a@" + "b." * (n // 2),
+    "'account' + spaces": lambda n: ("account" + " " * 200) * (n // 207 + 1),
+    "one huge link": lambda n: "http://" + "a" * n,
+    "many links": lambda n: "http://a " * (n // 9),
+    "digit run": lambda n: "1" * n,
+    "'account' then 'verify's": lambda n: "account " + "verify " * (n // 7),
+}
+
+LEGACY_SIZES = (1_000, 4_000, 16_000, 64_000)
+HARDENED_SIZES = (64_000, 1_000_000, 4_000_000)
+LEGACY_GIVE_UP_SECONDS = 2.0
+
+
+def legacy_scan(text: str) -> Dict[str, Set[str]]:
+    bank_accounts = set(LEGACY_IFSC.findall(text))
+    bank_accounts.update(LEGACY_ACCOUNT.findall(text))
+    return {
+        "bankAccounts": bank_accounts,
+        "upiIds": {
+            u for u in LEGACY_UPI.findall(text)
+            if any(p in u for p in VALID_UPI_PROVIDERS)
+        },
+        "phishingLinks": set(LEGACY_LINK.findall(text)),
+        "phoneNumbers": set(LEGACY_PHONE.findall(text)),
+        "suspiciousKeywords": {kw for kw in SUSPICIOUS_KEYWORDS if kw in text},
+    }
+
+
+def legacy_matches(detector: ScamDetector, text: str) -> List[Tuple[str, bool]]:
+    text = text.lower()
+    return [
+        (pattern, re.search(pattern, text) is not None)
+        for patterns in detector.scam_patterns.values()
+        for pattern in patterns
+    ]
+
+
+def hardened_matches(detector: ScamDetector, text: str) -> List[Tuple[str, bool]]:
+    text = text.lower()
+    return [
+        (pattern.regex.pattern, pattern.search(text))
+        for _, patterns in detector._compiled
+        for pattern in patterns
+    ]
+
+
+def normal_corpus(n: int, rng: random.Random) -> List[str]:
+    corpus = list(NORMAL_LINES)
+    for _ in range(n):
+        parts = rng.sample(NORMAL_LINES, rng.randint(1, 4))
+        corpus.append(rng.choice((" ", "\n", " and ")).join(parts))
+    return corpus
+
+
+def check_equivalence(detector: ScamDetector) -> None:
+    corpus = normal_corpus(2000, random.Random(7))
+    for text in corpus:
+        lowered = text.lower()
+        expected, actual = legacy_scan(lowered), IntelligenceExtractor._scan(lowered)
+        if expected != actual:
+            sys.exit(f"extraction differs on {text!r}:\n{expected}\n{actual}")
+        if legacy_matches(detector, text) != hardened_matches(detector, text):
+            sys.exit(f"detection differs on {text!r}")
+    print(f"equivalence: {len(corpus)} normal messages, extraction and detection agree")
+
+
+def _seconds(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    detector = ScamDetector()
+    check_equivalence(detector)
+
+    print("\nlegacy patterns, extraction + detection (ms)")
+    print(f"{'input':<26}" + "".join(f"{n:>10,}" for n in LEGACY_SIZES))
+    for name, make in PATHOLOGICAL.items():
+        row = f"{name:<26}"
+        gave_up = False
+        for n in LEGACY_SIZES:
+            if gave_up:
+                row += f"{'-':>10}"
+                continue
+            text = make(n)
+            elapsed = _seconds(
+                lambda: (legacy_scan(text), legacy_matches(detector, text))
+            )
+            row += f"{elapsed * 1000:>10.1f}"
+            gave_up = elapsed > LEGACY_GIVE_UP_SECONDS
+        print(row, flush=True)
+
+    print("\nbounded patterns, extraction + detection, uncapped (ms)")
+    print(f"{'input':<26}" + "".join(f"{n:>12,}" for n in HARDENED_SIZES))
+    for name, make in PATHOLOGICAL.items():
+        row = f"{name:<26}"
+        for n in HARDENED_SIZES:
+            text = make(n)
+            elapsed = _seconds(
+                lambda: (IntelligenceExtractor._scan(text), detector.detect_scam(text))
+            )
+            row += f"{elapsed * 1000:>12.1f}"
+        print(row, flush=True)
+
+    print(
+        f"\nper turn with caps (first {SCAN_MAX_MESSAGE_CHARS:,} chars scanned), "
+        "worst input (ms)"
+    )
+    for n in HARDENED_SIZES:
+        worst = 0.0
+        for make in PATHOLOGICAL.values():
+            message = Message(sender="scammer", text=make(n), timestamp=0)
+            session = SessionState(sessionId="bench")
+            text = message.text[:SCAN_MAX_MESSAGE_CHARS]
+            worst = max(worst, _seconds(
+                lambda: (
+                    detector.detect_scam(text),
+                    IntelligenceExtractor.update(session, [message]),
+                )
+            ))
+        print(f"{n:>12,} chars  {worst * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Per-turn IOC extraction cost: full history re-scan vs incremental update.
+
+Run from the repo root:
+    python -m benchmarks.bench_intelligence
+"""
+import random
+import time
+
+from app.core.intelligence import IntelligenceExtractor
+from app.storage.models import Message, SessionState
+
+SCAMMER_LINES = [
+    "Your bank account will be blocked today, verify immediately.",
+    "Send the OTP to 9876543210 to avoid suspension.",
+    "Pay the refund fee to refund.desk@paytm right now.",
+    "Click https://secure-kyc-update.example.com/login to update KYC.",
+    "Transfer to account no: 123456789012, IFSC sbin0001234.",
+    "This is urgent, do not share with anyone.",
+]
+
+AGENT_LINES = [
+    "Oh no, what should I do?",
+    "I'm not very good with these apps, can you explain?",
+    "Which number should I call again?",
+]
+
+SIZES = (10, 100, 1000)
+TURNS_MEASURED = 50
+
+
+def _message(i: int) -> Message:
+    if i % 2 == 0:
+        return Message(sender="scammer", text=random.choice(SCAMMER_LINES), timestamp=i)
+    return Message(sender="agent", text=random.choice(AGENT_LINES), timestamp=i)
+
+
+def _per_turn_seconds(history_len: int, incremental: bool) -> float:
+    extractor = IntelligenceExtractor()
+    session = SessionState(sessionId="bench")
+    history = [_message(i) for i in range(history_len)]
+    extractor.update(session, history)
+
+    elapsed = 0.0
+    for turn in range(TURNS_MEASURED):
+        new = [_message(history_len + 2 * turn), _message(history_len + 2 * turn + 1)]
+        history.extend(new)
+
+        start = time.perf_counter()
+        if incremental:
+            extractor.update(session, new)
+        else:
+            extractor.extract(history)
+        elapsed += time.perf_counter() - start
+
+    return elapsed / TURNS_MEASURED
+
+
+def main() -> None:
+    random.seed(7)
+    print(f"{'messages':>10} {'full re-scan (us)':>20} {'incremental (us)':>18}")
+    for size in SIZES:
+        full = _per_turn_seconds(size, incremental=False)
+        inc = _per_turn_seconds(size, incremental=True)
+        print(f"{size:>10} {full * 1e6:>20.1f} {inc * 1e6:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
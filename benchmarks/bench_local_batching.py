@@ -0,0 +1,73 @@
+"""
+Replies per second from the local provider: one prompt per model call
+vs dynamic micro-batching, under increasing concurrency.
+
+The model is a stand-in whose cost is a fixed per-call overhead plus a
+smaller per-prompt cost, the shape CPU generation has for short prompts.
+Pass --model to measure the real LOCAL_MODEL instead (slow).
+
+Run from the repo root:
+    python -m benchmarks.bench_local_batching
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+from app.llm.providers.local_llm import LocalModel, MicroBatcher
+
+CALL_OVERHEAD_SECONDS = 0.040
+PER_PROMPT_SECONDS = 0.006
+CONCURRENCY = (1, 8, 32, 128)
+MAX_BATCH = 16
+MAX_WAIT_SECONDS = 0.010
+
+
+def stub_batch(prompts: List[str]) -> List[str]:
+    time.sleep(CALL_OVERHEAD_SECONDS + PER_PROMPT_SECONDS * len(prompts))
+    return [f"reply to {p}" for p in prompts]
+
+
+async def _drive(batcher: MicroBatcher, concurrency: int, requests: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            await batcher.submit(f"prompt {i}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+async def _main(args: argparse.Namespace) -> None:
+    if args.model:
+        batch_fn = LocalModel(args.model, max_new_tokens=32).generate_batch
+        batch_fn(["warm up"])
+    else:
+        batch_fn = stub_batch
+
+    print(f"{'concurrency':>11} {'unbatched rps':>14} {'batched rps':>12} {'mean batch':>11}")
+    for concurrency in CONCURRENCY:
+        requests = max(args.requests, concurrency * 2)
+        single = MicroBatcher(batch_fn, max_batch=1, max_wait=0)
+        batched = MicroBatcher(batch_fn, max_batch=MAX_BATCH, max_wait=MAX_WAIT_SECONDS)
+        single_rps = await _drive(single, concurrency, requests)
+        batched_rps = await _drive(batched, concurrency, requests)
+        await single.close()
+        await batched.close()
+        print(
+            f"{concurrency:>11} {single_rps:>14.1f} {batched_rps:>12.1f} "
+            f"{batched.stats()['meanBatchSize']:>11.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", help="real model name instead of the stub")
+    parser.add_argument("--requests", type=int, default=64)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
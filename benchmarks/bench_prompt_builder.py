@@ -0,0 +1,94 @@
+"""
+Reply prompt build time and size: the fixed last-6-messages template vs
+PromptBuilder (precomputed persona prefix + token-budgeted window).
+
+Run from the repo root:
+    python -m benchmarks.bench_prompt_builder
+"""
+import random
+import time
+from typing import Dict, List
+
+from app.core.persona import PersonaManager
+from app.llm.prompts.honeypot_prompt import HONEYPOT_PROMPT
+from app.llm.prompts.prompt_builder import PromptBuilder, estimate_tokens
+
+SCAMMER_LINES = [
+    "Your bank account will be blocked today, verify immediately.",
+    "Send the OTP to 9876543210 to avoid suspension.",
+    "Pay the refund fee to refund.desk@paytm right now.",
+    "Click https://secure-kyc-update.example.com/login to update KYC.",
+]
+AGENT_LINES = [
+    "Oh no, what should I do?",
+    "I'm not very good with these apps, can you explain?",
+]
+PASTED_WALL = (
+    "Dear customer as per RBI guidelines " * 150
+    + "pay to verify.kyc@oksbi immediately"
+)
+BUILDS = 5000
+
+
+def legacy_build(history: List[Dict], categories: List[str], persona_key: str) -> str:
+    """The pre-PromptBuilder ConversationAgent._build_prompt."""
+    persona = PersonaManager.get_persona_prompt_data(persona_key)
+    conversation = ""
+    for msg in history[-6:]:
+        sender = msg.get("sender", "scammer")
+        role = "Scammer" if sender == "scammer" else "You"
+        conversation += f"{role}: {msg['text']}\n"
+    return HONEYPOT_PROMPT.format(
+        persona_description=persona["description"],
+        persona_traits="\n".join(f"- {t}" for t in persona["traits"]),
+        scam_categories=", ".join(categories) or "unknown",
+        conversation=conversation.strip(),
+    )
+
+
+def _history(turns: int, pasted: bool = False) -> List[Dict]:
+    history = []
+    for i in range(turns):
+        history.append({"sender": "scammer", "text": random.choice(SCAMMER_LINES)})
+        history.append({"sender": "agent", "text": random.choice(AGENT_LINES)})
+    if pasted:
+        history.append({"sender": "scammer", "text": PASTED_WALL})
+    return history
+
+
+def _time_us(fn, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(BUILDS):
+        fn(*args)
+    return (time.perf_counter() - start) / BUILDS * 1e6
+
+
+def main() -> None:
+    random.seed(3)
+    builder = PromptBuilder()
+    cases = {
+        "3 turns": _history(3),
+        "10 turns": _history(10),
+        "10 turns + pasted wall": _history(10, pasted=True),
+        "3 pasted walls": [
+            {"sender": "scammer", "text": PASTED_WALL} for _ in range(3)
+        ],
+    }
+    args = (["bank_fraud"], "confused_elderly")
+
+    print(f"budget={builder.token_budget} tokens, "
+          f"max/message={builder.max_message_tokens} tokens (~4 chars/token)")
+    print(f"{'history':<24} {'legacy us':>10} {'builder us':>11} "
+          f"{'legacy tok':>11} {'builder tok':>12}")
+    for name, history in cases.items():
+        legacy_prompt = legacy_build(history, *args)
+        new_prompt = builder.build(history, *args)
+        print(
+            f"{name:<24} {_time_us(legacy_build, history, *args):>10.1f} "
+            f"{_time_us(builder.build, history, *args):>11.1f} "
+            f"{estimate_tokens(legacy_prompt):>11} {estimate_tokens(new_prompt):>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
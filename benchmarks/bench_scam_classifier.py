@@ -0,0 +1,118 @@
+"""
+Hashed n-gram classifier vs the rule-based ScamDetector: throughput
+(messages/second) one message at a time and in batches, plus agreement
+with the rules on held-out messages.
+
+The model is trained on a synthetic corpus labelled by the rules
+themselves, so agreement measures how well it can learn them, not how
+good either is on real traffic.
+
+Run from the repo root:
+    python -m benchmarks.bench_scam_classifier
+"""
+import os
+import random
+import tempfile
+import time
+from typing import Callable, List
+
+import numpy as np
+
+from app.core.ml_classifier import LinearScamClassifier, train
+from app.core.scam_detector import ScamDetector
+
+SCAM_FRAGMENTS = [
+    "your bank account will be blocked",
+    "verify your account immediately",
+    "update kyc within 24 hours",
+    "share the otp to stop unauthorized transaction",
+    "refund pending, send your upi id",
+    "click the link to reset password",
+    "congratulations you won a prize, claim your reward",
+    "this is income tax department, pay penalty",
+    "call +919876543210 urgent",
+    "visit http://bit.ly/kyc-update",
+    "act now, last chance, offer expires today",
+    "cyber cell officer here, confirm your identity",
+]
+BENIGN_FRAGMENTS = [
+    "are we still meeting for lunch tomorrow",
+    "can you send me the notes from class",
+    "ok thanks, see you soon",
+    "happy birthday, have a great day",
+    "the train is running late",
+    "did you watch the match last night",
+    "please pick up milk on the way home",
+    "my phone battery died, call you later",
+    "the meeting moved to 3pm",
+    "i sent the photos from the trip",
+]
+
+TRAIN_MESSAGES = 20_000
+TEST_MESSAGES = 5_000
+DURATION_SECONDS = 2.0
+
+
+def make_corpus(n: int, rng: random.Random) -> List[str]:
+    corpus = []
+    for _ in range(n):
+        pool = SCAM_FRAGMENTS if rng.random() < 0.5 else BENIGN_FRAGMENTS
+        parts = rng.sample(pool, rng.randint(1, 2))
+        if rng.random() < 0.3:
+            parts.append(rng.choice(BENIGN_FRAGMENTS))
+        rng.shuffle(parts)
+        text = ". ".join(parts)
+        corpus.append(text.capitalize() if rng.random() < 0.5 else text.upper())
+    return corpus
+
+
+def _throughput(fn: Callable[[List[str]], object], corpus: List[str], batch: int) -> float:
+    count = 0
+    start = time.perf_counter()
+    deadline = start + DURATION_SECONDS
+    while time.perf_counter() < deadline:
+        for i in range(0, len(corpus), batch):
+            fn(corpus[i:i + batch])
+        count += len(corpus)
+    return count / (time.perf_counter() - start)
+
+
+def main() -> None:
+    rng = random.Random(7)
+    rules = ScamDetector()
+    train_texts = make_corpus(TRAIN_MESSAGES, rng)
+    test_texts = make_corpus(TEST_MESSAGES, rng)
+    labels = [rules.detect_scam(t) for t in train_texts]
+
+    started = time.perf_counter()
+    model = train(train_texts, [l[0] for l in labels], [l[1] for l in labels])
+    print(f"trained on {len(train_texts)} messages in {time.perf_counter() - started:.1f}s")
+
+    # Round-trip through the on-disk format the API loads
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.npz")
+        model.save(path)
+        size = os.path.getsize(path)
+        loaded = LinearScamClassifier.load(path)
+    drift = np.abs(loaded.predict_proba(test_texts) - model.predict_proba(test_texts)).max()
+    print(f"model file: {size / 1024:.0f} KiB, max score drift after reload: {drift:.1e}")
+
+    expected = [rules.detect_scam(t) for t in test_texts]
+    predicted = loaded.detect_batch(test_texts)
+    verdicts = np.mean([p[0] == e[0] for p, e in zip(predicted, expected)])
+    top_category = np.mean([
+        not e[1] or (bool(p[1]) and p[1][0] in e[1])
+        for p, e in zip(predicted, expected)
+    ])
+    print(f"agreement with rules: verdict {verdicts:.1%}, top category {top_category:.1%}")
+
+    corpus = test_texts[:1000]
+    rules_rate = _throughput(lambda b: [rules.detect_scam(t) for t in b], corpus, 1)
+    print(f"rules:            {rules_rate:>12,.0f} msg/s")
+    for batch in (1, 100, 1000):
+        rate = _throughput(loaded.detect_batch, corpus, batch)
+        print(f"model batch {batch:<5} {rate:>12,.0f} msg/s  ({rate / rules_rate:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+SessionManager.get_or_create latency as the number of live sessions
+grows, against the previous full-scan-under-one-lock implementation.
+
+Run from the repo root:
+    python -m benchmarks.bench_session_manager
+"""
+import asyncio
+import random
+import time
+from threading import Lock
+
+from app.core.session_manager import SESSION_TTL_SECONDS, SessionManager
+from app.storage.models import SessionState
+
+SIZES = (1_000, 10_000, 100_000)
+LOOKUPS = 2_000
+LEGACY_LOOKUPS = 50
+
+
+class LegacySessionManager:
+    """Previous behaviour: O(n) expiry scan on every call, single lock."""
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = Lock()
+
+    async def get_or_create(self, session_id: str) -> SessionState:
+        with self._lock:
+            now = time.time()
+            expired = [
+                sid for sid, s in self._sessions.items()
+                if now - s.createdAt > SESSION_TTL_SECONDS
+            ]
+            for sid in expired:
+                del self._sessions[sid]
+            if session_id not in self._sessions:
+                self._sessions[session_id] = SessionState(sessionId=session_id)
+            return self._sessions[session_id]
+
+
+async def _populate(manager, size: int) -> None:
+    if isinstance(manager, LegacySessionManager):
+        # Filling through get_or_create would itself be quadratic
+        for i in range(size):
+            sid = f"session-{i}"
+            manager._sessions[sid] = SessionState(sessionId=sid)
+        return
+    for i in range(size):
+        await manager.get_or_create(f"session-{i}")
+
+
+async def _mean_latency_us(manager, size: int) -> float:
+    await _populate(manager, size)
+
+    lookups = LEGACY_LOOKUPS if isinstance(manager, LegacySessionManager) else LOOKUPS
+    ids = [f"session-{random.randrange(size)}" for _ in range(lookups)]
+    start = time.perf_counter()
+    for sid in ids:
+        await manager.get_or_create(sid)
+    return (time.perf_counter() - start) / lookups * 1e6
+
+
+async def main() -> None:
+    random.seed(7)
+    print(f"{'sessions':>10} {'legacy (us)':>14} {'striped (us)':>14}")
+    for size in SIZES:
+        legacy = await _mean_latency_us(LegacySessionManager(), size)
+        striped = await _mean_latency_us(SessionManager(), size)
+        print(f"{size:>10} {legacy:>14.1f} {striped:>14.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
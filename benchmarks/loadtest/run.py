@@ -0,0 +1,334 @@
+"""
+End-to-end load test for /honeypot, fully offline.
+
+Starts the API with a stub inference router and a stub callback sink,
+drives concurrent multi-turn scam sessions against it, and reports
+latency percentiles, throughput, LLM calls per turn and memory growth
+per session count and history length.
+
+Run from the repo root:
+    python -m benchmarks.loadtest.run --sessions 10,100,500 --turns 12
+    python -m benchmarks.loadtest.run --json results.json   # compare builds
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import httpx
+import psutil
+
+API_KEY = "loadtest-key"
+
+SCRIPTS = {
+    "bank_kyc": [
+        "Dear customer, your SBI bank account will be blocked today.",
+        "You must update KYC immediately to avoid suspension.",
+        "Click https://sbi-kyc-update.example.com/verify to verify your account.",
+        "Share the OTP you received, this is urgent.",
+        "Transfer Rs 10 to account no 123456789012 IFSC sbin0001234 for verification.",
+        "Call our officer on +919876543210 if the link does not open.",
+        "Sir why are you delaying, your account will be deactivated in 2 hours.",
+        "Send the CVV and card number to complete the process.",
+    ],
+    "lottery": [
+        "Congratulations! You have been selected as lottery winner of Rs 25 lakh.",
+        "To claim reward pay processing fee of Rs 4999.",
+        "Pay to winner.desk@paytm and send screenshot.",
+        "Offer valid for limited time only, act now.",
+        "Our manager will call you from 8877665544.",
+        "Visit http://bit.ly/claim-prize-now to fill your details.",
+    ],
+    "upi_refund": [
+        "Hello, your refund of Rs 2300 is pending from Google Pay.",
+        "Please share your UPI ID so we can process the refund.",
+        "Enter your UPI pin to receive the money.",
+        "Payment failed, try again with refund.team@ybl.",
+        "This is your last chance, the refund will expire today.",
+    ],
+    "tax_officer": [
+        "This is the income tax department, you have an unpaid penalty.",
+        "A case is registered at the cyber cell police station in your name.",
+        "Pay the fine immediately to government officer UPI taxdept@oksbi.",
+        "Call 9123456780 to speak to the RBI official handling your case.",
+        "Failure to pay within 24 hours will lead to arrest.",
+    ],
+}
+
+HISTORY_BUCKETS = ((1, 2), (3, 5), (6, 10), (11, 20), (21, 10**9))
+
+
+def _bucket(turn: int) -> str:
+    for low, high in HISTORY_BUCKETS:
+        if low <= turn <= high:
+            return f"{low}+" if high >= 10**9 else f"{low}-{high}"
+    return "?"
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _summary(latencies: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(latencies),
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+    }
+
+
+# ─────────────────────────────────────────────
+# Process management
+# ─────────────────────────────────────────────
+
+def _spawn(args: List[str], env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, *args],
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def _wait_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url, timeout=1.0)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+# ─────────────────────────────────────────────
+# Load generation
+# ─────────────────────────────────────────────
+
+async def _run_session(
+    client: httpx.AsyncClient,
+    session_id: str,
+    script: List[str],
+    turns: int,
+    latencies: Dict[str, List[float]],
+    errors: List[int],
+) -> None:
+    for turn in range(1, turns + 1):
+        text = script[(turn - 1) % len(script)]
+        # Vary amounts/numbers like real campaigns do
+        text = text.replace("Rs ", f"Rs {random.randint(1, 9)}")
+        payload = {
+            "sessionId": session_id,
+            "message": {
+                "sender": "scammer",
+                "text": text,
+                "timestamp": int(time.time() * 1000),
+            },
+        }
+        start = time.perf_counter()
+        try:
+            response = await client.post("/honeypot", json=payload)
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        elapsed = time.perf_counter() - start
+
+        if ok:
+            latencies[_bucket(turn)].append(elapsed)
+        else:
+            errors.append(turn)
+
+
+async def _run_level(
+    app_url: str,
+    llm_url: str,
+    app_pid: int,
+    sessions: int,
+    turns: int,
+) -> Dict:
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: List[int] = []
+    process = psutil.Process(app_pid)
+
+    async with httpx.AsyncClient(
+        base_url=app_url,
+        headers={"x-api-key": API_KEY},
+        timeout=60.0,
+        limits=httpx.Limits(
+            max_connections=sessions,
+            max_keepalive_connections=sessions,
+        ),
+    ) as client:
+        llm_before = (await client.get(f"{llm_url}/stats")).json()["calls"]
+        rss_before = process.memory_info().rss
+
+        scripts = list(SCRIPTS.values())
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            _run_session(
+                client,
+                f"lt-{sessions}-{i}-{random.getrandbits(32):08x}",
+                scripts[i % len(scripts)],
+                turns,
+                latencies,
+                errors,
+            )
+            for i in range(sessions)
+        ))
+        wall = time.perf_counter() - start
+
+        llm_after = (await client.get(f"{llm_url}/stats")).json()["calls"]
+        rss_after = process.memory_info().rss
+
+    all_latencies = [v for values in latencies.values() for v in values]
+    completed = len(all_latencies)
+    return {
+        "sessions": sessions,
+        "turns_per_session": turns,
+        "requests": completed + len(errors),
+        "errors": len(errors),
+        "wall_seconds": wall,
+        "rps": completed / wall if wall else 0.0,
+        "llm_calls_per_turn": (llm_after - llm_before) / max(completed, 1),
+        "rss_growth_mb": (rss_after - rss_before) / 2**20,
+        "latency": _summary(all_latencies),
+        "by_history_length": {
+            bucket: _summary(latencies[bucket])
+            for bucket in map(_bucket, (low for low, _ in HISTORY_BUCKETS))
+            if bucket in latencies
+        },
+    }
+
+
+def _print_level(result: Dict) -> None:
+    lat = result["latency"]
+    print(
+        f"\nsessions={result['sessions']} turns={result['turns_per_session']} "
+        f"requests={result['requests']} errors={result['errors']}"
+    )
+    print(
+        f"  p50={lat['p50_ms']:.1f}ms p95={lat['p95_ms']:.1f}ms "
+        f"p99={lat['p99_ms']:.1f}ms  rps={result['rps']:.1f}  "
+        f"llm_calls/turn={result['llm_calls_per_turn']:.2f}  "
+        f"rss_growth={result['rss_growth_mb']:.1f}MB"
+    )
+    print(f"  {'turns':>8} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for bucket, summary in result["by_history_length"].items():
+        print(
+            f"  {bucket:>8} {summary['count']:>7} {summary['p50_ms']:>9.1f} "
+            f"{summary['p95_ms']:>9.1f} {summary['p99_ms']:>9.1f}"
+        )
+
+
+async def _main(args: argparse.Namespace) -> None:
+    random.seed(args.seed)
+    workdir = tempfile.mkdtemp(prefix="honeypot-loadtest-")
+    llm_url = f"http://127.0.0.1:{args.llm_port}"
+    callback_url = f"http://127.0.0.1:{args.callback_port}"
+    app_url = f"http://127.0.0.1:{args.app_port}"
+
+    procs = [
+        _spawn(
+            [
+                "-m", "benchmarks.loadtest.stubs", "llm",
+                "--port", str(args.llm_port),
+                "--latency-ms", str(args.llm_latency_ms),
+                "--latency-sigma", str(args.llm_latency_sigma),
+                "--error-rate", str(args.llm_error_rate),
+            ],
+            {},
+        ),
+        _spawn(
+            [
+                "-m", "benchmarks.loadtest.stubs", "callback",
+                "--port", str(args.callback_port),
+            ],
+            {},
+        ),
+    ]
+    app_proc = _spawn(
+        [
+            "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1",
+            "--port", str(args.app_port),
+            "--log-level", "warning",
+        ],
+        {
+            "HONEYPOT_API_KEY": API_KEY,
+            "HUGGINGFACE_API_KEY": "stub",
+            "HF_API_URL": f"{llm_url}/models/stub",
+            "GUVI_CALLBACK_URL": f"{callback_url}/callback",
+            "CALLBACK_OUTBOX_PATH": os.path.join(workdir, "outbox.db"),
+            "HISTORY_SPILL_DIR": os.path.join(workdir, "history"),
+            "REDIS_ENABLED": "false",
+            # One client replays sessions back to back, far faster than
+            # real scammers type: admission limits would measure themselves
+            "RATE_LIMIT_KEY_RPS": "0",
+            "RATE_LIMIT_SESSION_RPS": "0",
+        },
+    )
+    procs.append(app_proc)
+
+    results = []
+    try:
+        await _wait_ready(f"{llm_url}/stats")
+        await _wait_ready(f"{callback_url}/stats")
+        await _wait_ready(f"{app_url}/health")
+
+        for sessions in args.sessions:
+            result = await _run_level(
+                app_url, llm_url, app_proc.pid, sessions, args.turns
+            )
+            _print_level(result)
+            results.append(result)
+
+        async with httpx.AsyncClient() as client:
+            await asyncio.sleep(2)  # let the outbox drain
+            sink = (await client.get(f"{callback_url}/stats")).json()
+        print(f"\ncallbacks received={sink['received']} sessions={sink['sessions']}")
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait(timeout=10)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--sessions", default="10,100,500",
+                        type=lambda s: [int(x) for x in s.split(",")],
+                        help="comma-separated concurrent session counts")
+    parser.add_argument("--turns", type=int, default=12, help="scammer turns per session")
+    parser.add_argument("--llm-latency-ms", type=float, default=400)
+    parser.add_argument("--llm-latency-sigma", type=float, default=0.5)
+    parser.add_argument("--llm-error-rate", type=float, default=0.02)
+    parser.add_argument("--app-port", type=int, default=9100)
+    parser.add_argument("--llm-port", type=int, default=9101)
+    parser.add_argument("--callback-port", type=int, default=9102)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="write results to this file")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Local stand-ins for the Hugging Face inference router and the
+callback endpoint, used by the load-test harness.
+
+    python -m benchmarks.loadtest.stubs llm --port 9101 --latency-ms 400
+    python -m benchmarks.loadtest.stubs callback --port 9102
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+STUB_REPLIES = [
+    "Oh dear, which branch are you calling from? I need to tell my son.",
+    "I am not sure I understand, can you send the details again?",
+    "Wait, what number should I call back on? My phone is very slow.",
+    "Is this really from the bank? Please give me your employee ID.",
+    "Okay, where do I send the money? I don't use these apps much.",
+]
+
+
+def create_llm_stub(
+    latency_ms: float,
+    latency_sigma: float,
+    error_rate: float,
+) -> FastAPI:
+    """
+    Fake inference router. Latency is log-normal around `latency_ms`
+    (median) with shape `latency_sigma`; `error_rate` of calls get 503.
+    """
+    app = FastAPI()
+    stats = {"calls": 0, "errors": 0}
+
+    def _latency_seconds() -> float:
+        return random.lognormvariate(math.log(latency_ms), latency_sigma) / 1000
+
+    @app.post("/models/{model:path}")
+    async def generate(model: str, request: Request):
+        body = await request.json()
+        stats["calls"] += 1
+
+        if random.random() < error_rate:
+            stats["errors"] += 1
+            await asyncio.sleep(_latency_seconds())
+            return JSONResponse({"error": "stub overloaded"}, status_code=503)
+
+        reply = random.choice(STUB_REPLIES)
+
+        if body.get("stream"):
+            delay = _latency_seconds()
+            words = reply.split(" ")
+
+            async def tokens():
+                await asyncio.sleep(delay / 2)
+                for i, word in enumerate(words):
+                    await asyncio.sleep(delay / 2 / len(words))
+                    text = word if i == 0 else " " + word
+                    yield f"data: {json.dumps({'token': {'text': text}})}\n\n"
+
+            return StreamingResponse(tokens(), media_type="text/event-stream")
+
+        await asyncio.sleep(_latency_seconds())
+        return [{"generated_text": reply}]
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def create_callback_sink() -> FastAPI:
+    app = FastAPI()
+    stats = {"received": 0, "sessions": set()}
+
+    @app.post("/callback")
+    async def callback(request: Request):
+        payload = await request.json()
+        stats["received"] += 1
+        stats["sessions"].add(payload.get("sessionId"))
+        return {"status": "ok"}
+
+    @app.get("/stats")
+    async def get_stats():
+        return {"received": stats["received"], "sessions": len(stats["sessions"])}
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("kind", choices=("llm", "callback"))
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--latency-ms", type=float, default=400)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    args = parser.parse_args()
+
+    if args.kind == "llm":
+        app = create_llm_stub(args.latency_ms, args.latency_sigma, args.error_rate)
+    else:
+        app = create_callback_sink()
+
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
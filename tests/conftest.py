@@ -0,0 +1,9 @@
+import os
+import tempfile
+
+# app.config reads the environment at import time; keep test runs from
+# writing outbox databases or spill files into the working tree
+_data_dir = tempfile.mkdtemp(prefix="honeypot-tests-")
+os.environ.setdefault("HISTORY_SPILL_DIR", os.path.join(_data_dir, "history_spill"))
+os.environ.setdefault("CALLBACK_OUTBOX_PATH", os.path.join(_data_dir, "outbox.db"))
+os.environ.setdefault("HONEYPOT_API_KEY", "test-key")
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+import app.core.admission as admission_module
+from app.core.admission import KeyedRateLimiter, LLMAdmission
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(admission_module.time, "monotonic", clock)
+    return clock
+
+
+def test_bucket_refills_at_rate_up_to_burst(clock):
+    limiter = KeyedRateLimiter(rate=2, burst=3)
+
+    assert [limiter.allow("k") for _ in range(4)] == [True, True, True, False]
+    clock.now = 0.5
+    assert limiter.allow("k")
+    assert not limiter.allow("k")
+
+    clock.now = 100
+    assert [limiter.allow("k") for _ in range(4)] == [True, True, True, False]
+    # Other keys have buckets of their own
+    assert limiter.allow("other")
+
+
+def test_cost_above_burst_is_admitted_once_full_and_leaves_debt(clock):
+    limiter = KeyedRateLimiter(rate=1, burst=5)
+
+    assert limiter.allow("k", cost=8)
+    assert limiter._buckets["k"].tokens == -3
+    # The debt refills before the next token does
+    clock.now = 3.9
+    assert not limiter.allow("k")
+    clock.now = 4
+    assert limiter.allow("k")
+    assert limiter.retry_after(cost=8) == 5
+
+
+def test_partial_bucket_refuses_a_cost_above_burst(clock):
+    limiter = KeyedRateLimiter(rate=1, burst=5)
+    limiter.allow("k")
+
+    assert not limiter.allow("k", cost=8)
+    assert limiter._buckets["k"].tokens == 4
+
+
+def test_least_recently_used_key_is_evicted(clock):
+    limiter = KeyedRateLimiter(rate=1, burst=1, max_keys=2)
+    limiter.allow("a")
+    limiter.allow("b")
+    limiter.allow("a")
+    limiter.allow("c")
+
+    assert list(limiter._buckets) == ["a", "c"]
+    # An evicted key starts again with a full bucket
+    assert limiter.allow("b")
+
+
+def test_zero_rate_disables_the_limit():
+    limiter = KeyedRateLimiter(rate=0, burst=0)
+
+    assert all(limiter.allow("k", cost=100) for _ in range(10))
+
+
+def test_try_acquire_takes_only_a_free_slot():
+    async def run():
+        admission = LLMAdmission(max_concurrency=1, max_queue=1)
+        assert await admission.try_acquire()
+        assert not await admission.try_acquire()
+
+        # A queued reply keeps the slot from background work
+        waiter = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        assert admission.waiting == 1
+        admission.release()
+        assert not await admission.try_acquire()
+
+        assert await waiter
+        admission.release()
+        assert await admission.try_acquire()
+        admission.release()
+        return admission.stats()
+
+    assert asyncio.run(run()) == {
+        "inFlight": 0, "waiting": 0, "maxConcurrency": 1, "maxQueue": 1,
+    }
+
+
+def test_acquire_sheds_once_the_queue_is_full():
+    async def run():
+        admission = LLMAdmission(max_concurrency=1, max_queue=1)
+        assert await admission.acquire()
+        waiter = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+
+        assert not await admission.acquire()
+
+        admission.release()
+        assert await waiter
+        admission.release()
+
+    asyncio.run(run())
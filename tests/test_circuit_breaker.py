@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from app.llm.providers.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    guard,
+    guard_stream,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class StubProvider:
+    """`prompt -> text` provider that fails while `down` is set."""
+
+    def __init__(self):
+        self.down = True
+        self.calls = 0
+
+    async def __call__(self, prompt):
+        self.calls += 1
+        if self.down:
+            raise RuntimeError("provider down")
+        return "reply"
+
+
+def _breaker(clock):
+    return CircuitBreaker(
+        "stub",
+        window_seconds=60,
+        min_calls=4,
+        failure_rate=0.5,
+        slow_call_seconds=60,
+        slow_call_rate=1.0,
+        open_seconds=10,
+        clock=clock,
+    )
+
+
+def _call(fn):
+    return asyncio.run(fn("hi"))
+
+
+def test_opens_after_failures_probes_half_open_and_recovers():
+    clock, provider = Clock(), StubProvider()
+    breaker = _breaker(clock)
+    call = guard("stub", provider, breaker)
+
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            _call(call)
+    assert breaker.state == CLOSED
+    with pytest.raises(RuntimeError):
+        _call(call)
+    assert breaker.state == OPEN
+
+    # Open: fails fast without calling the provider
+    with pytest.raises(CircuitOpenError):
+        _call(call)
+    assert provider.calls == 4
+
+    # After open_seconds a single probe is let through; it fails
+    clock.now = 10
+    with pytest.raises(RuntimeError):
+        _call(call)
+    assert provider.calls == 5
+    assert breaker.state == OPEN
+
+    # The next probe succeeds and closes the circuit
+    clock.now = 20
+    provider.down = False
+    assert _call(call) == "reply"
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["opens"] == 2
+
+
+def test_half_open_lets_one_probe_through_at_a_time():
+    clock = Clock()
+    breaker = _breaker(clock)
+    for _ in range(4):
+        breaker.record_failure()
+    clock.now = 10
+
+    gate = asyncio.Event()
+
+    async def slow_provider(prompt):
+        await gate.wait()
+        return "reply"
+
+    call = guard("stub", slow_provider, breaker)
+
+    async def run():
+        probe = asyncio.create_task(call("hi"))
+        await asyncio.sleep(0)
+        assert breaker.state == HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            await call("hi")
+        gate.set()
+        return await probe
+
+    assert asyncio.run(run()) == "reply"
+    assert breaker.state == CLOSED
+
+
+def test_stream_closed_after_first_token_counts_as_success():
+    clock = Clock()
+    breaker = _breaker(clock)
+    for _ in range(4):
+        breaker.record_failure()
+    clock.now = 10
+
+    async def stream(prompt):
+        yield "first"
+        yield "second"
+
+    call = guard_stream("stub", stream, breaker)
+
+    async def run():
+        tokens = call("hi")
+        assert await tokens.__anext__() == "first"
+        await tokens.aclose()
+
+    asyncio.run(run())
+    assert breaker.state == CLOSED
@@ -0,0 +1,117 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+import app.cluster.dispatcher as dispatcher_module
+from app.cluster.dispatcher import Dispatcher, WorkerProcess
+from app.cluster.hash_ring import ConsistentHashRing
+
+
+class FakeWorkers:
+    """Workers' /internal session API over an httpx mock transport."""
+
+    def __init__(self, sessions, successful_imports=None):
+        # worker url -> session ids held
+        self.sessions = sessions
+        # Imports after this many fail
+        self.successful_imports = successful_imports
+        self.removes = 0
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        url = f"{request.url.scheme}://{request.url.host}:{request.url.port}"
+        held = self.sessions[url]
+        path = request.url.path
+        if path == "/internal/sessions":
+            return httpx.Response(200, json={"sessionIds": sorted(held)})
+        body = json.loads(request.content)
+        if path == "/internal/sessions/export":
+            exported = [{"sessionId": s} for s in body["sessionIds"] if s in held]
+            return httpx.Response(200, json={"sessions": exported, "callbacks": {}})
+        if path == "/internal/sessions/import":
+            if self.successful_imports is not None:
+                if self.successful_imports == 0:
+                    return httpx.Response(500)
+                self.successful_imports -= 1
+            held.update(s["sessionId"] for s in body["sessions"])
+            return httpx.Response(200, json={"imported": len(body["sessions"])})
+        if path == "/internal/sessions/remove":
+            self.removes += 1
+            removed = held & set(body["sessionIds"])
+            held -= removed
+            return httpx.Response(200, json={"removed": len(removed)})
+        return httpx.Response(404)
+
+
+def _setup(successful_imports=None):
+    workers = {
+        f"worker-{i}": WorkerProcess(i, "127.0.0.1", 9000 + i) for i in range(3)
+    }
+    old = {name: w for name, w in workers.items() if w.index < 2}
+    fake = FakeWorkers(
+        {
+            workers["worker-0"].url: {f"a{i}" for i in range(50)},
+            workers["worker-1"].url: {f"b{i}" for i in range(50)},
+            workers["worker-2"].url: set(),
+        },
+        successful_imports=successful_imports,
+    )
+    dispatcher = Dispatcher(2, "127.0.0.1", 9000, api_key="k")
+    dispatcher._client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handle))
+    return dispatcher, old, workers, fake
+
+
+def test_hand_over_moves_sessions_to_new_owners():
+    dispatcher, old, workers, fake = _setup()
+    ring = ConsistentHashRing(sorted(workers))
+
+    moved = asyncio.run(dispatcher._hand_over(old, workers, ring))
+
+    assert moved > 0
+    for name, worker in workers.items():
+        for session_id in fake.sessions[worker.url]:
+            assert ring.node_for(session_id) == name
+    assert sum(len(held) for held in fake.sessions.values()) == 100
+
+
+def test_failed_import_keeps_sessions_on_old_owners():
+    # The first copy (worker-0 -> worker-2) succeeds, the second fails
+    dispatcher, old, workers, fake = _setup(successful_imports=1)
+    before = {url: set(held) for url, held in fake.sessions.items()}
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(
+            dispatcher._hand_over(old, workers, ConsistentHashRing(sorted(workers)))
+        )
+
+    assert fake.removes == 1
+    assert fake.sessions == before
+
+
+def test_resize_aborts_when_requests_do_not_drain(monkeypatch):
+    dispatcher, old, workers, fake = _setup()
+    dispatcher._install(old)
+    dispatcher._open.set()
+    stopped = []
+    monkeypatch.setattr(workers["worker-2"], "stop", lambda: stopped.append("worker-2"))
+
+    async def spawn_all(indexes):
+        return [workers[f"worker-{i}"] for i in indexes]
+
+    monkeypatch.setattr(dispatcher, "_spawn_all", spawn_all)
+    monkeypatch.setattr(dispatcher_module, "DRAIN_TIMEOUT_SECONDS", 0.01)
+    # A turn is still running on an old owner
+    dispatcher._in_flight = 1
+    dispatcher._idle.clear()
+    before = {url: set(held) for url, held in fake.sessions.items()}
+
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(dispatcher.resize(3))
+
+    assert e.value.status_code == 503
+    assert stopped == ["worker-2"]
+    assert sorted(dispatcher.workers) == ["worker-0", "worker-1"]
+    assert dispatcher._open.is_set()
+    assert fake.sessions == before
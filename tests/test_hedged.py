@@ -0,0 +1,184 @@
+import asyncio
+
+import pytest
+
+from app.llm.providers.circuit_breaker import CircuitBreaker, HALF_OPEN, guard
+from app.llm.providers.hedged import HedgedGenerator, HedgedStreamer
+
+DELAY = 0.05
+
+
+class StubProvider:
+    """`prompt -> text` provider that answers when told to, or never."""
+
+    def __init__(self, text="reply", fail=False, wait=True):
+        self.text = text
+        self.fail = fail
+        self.release = asyncio.Event()
+        if not wait:
+            self.release.set()
+        self.started_at = None
+        self.cancelled = False
+
+    async def __call__(self, prompt):
+        self.started_at = asyncio.get_running_loop().time()
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.fail:
+            raise RuntimeError("provider down")
+        return self.text
+
+
+def _hedged(*providers, delay=DELAY):
+    return HedgedGenerator(
+        [(f"p{i}", p) for i, p in enumerate(providers)],
+        default_delay=delay,
+        min_delay=delay,
+        max_delay=delay,
+    )
+
+
+def test_no_hedge_when_the_first_provider_answers_in_time():
+    first, second = StubProvider("first", wait=False), StubProvider("second")
+    generator = _hedged(first, second)
+
+    assert asyncio.run(generator("hi")) == "first"
+    assert second.started_at is None
+    assert generator.hedges == 0
+
+
+def test_hedge_fires_after_the_delay_and_the_loser_is_cancelled():
+    first, second = StubProvider("first"), StubProvider("second", wait=False)
+    generator = _hedged(first, second)
+
+    assert asyncio.run(generator("hi")) == "second"
+    # The loop may run a timer up to its clock resolution early
+    assert second.started_at - first.started_at >= DELAY * 0.9
+    assert first.cancelled
+    assert generator.hedges == 1
+    assert generator.wins == {"p0": 0, "p1": 1}
+
+
+def test_failure_fires_the_next_provider_without_waiting():
+    first = StubProvider(fail=True, wait=False)
+    second = StubProvider("second", wait=False)
+    generator = _hedged(first, second, delay=60)
+
+    assert asyncio.run(asyncio.wait_for(generator("hi"), timeout=5)) == "second"
+    assert generator.hedges == 0
+
+
+def test_all_providers_failing_raises():
+    generator = _hedged(
+        StubProvider(fail=True, wait=False), StubProvider("  ", wait=False)
+    )
+
+    with pytest.raises(RuntimeError, match="All LLM providers failed"):
+        asyncio.run(generator("hi"))
+
+
+def test_cancelled_loser_frees_its_half_open_probe():
+    now = [0.0]
+    breaker = CircuitBreaker(
+        "p0", min_calls=1, failure_rate=0.5, open_seconds=10, clock=lambda: now[0]
+    )
+    breaker.record_failure()
+    now[0] = 10.0
+
+    first, second = StubProvider("first"), StubProvider("second", wait=False)
+    generator = HedgedGenerator(
+        [("p0", guard("p0", first, breaker)), ("p1", second)],
+        default_delay=DELAY,
+        min_delay=DELAY,
+        max_delay=DELAY,
+    )
+
+    assert asyncio.run(generator("hi")) == "second"
+    assert first.cancelled
+    # The lost race gave no verdict, so another probe may go through
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+class StubStream:
+    """Stream provider whose first token waits for `release`, or fails."""
+
+    def __init__(self, tokens=("hello", " there"), fail=False, wait=True):
+        self.tokens = tokens
+        self.fail = fail
+        self.release = asyncio.Event()
+        if not wait:
+            self.release.set()
+        self.started_at = None
+        self.closed = False
+
+    async def __call__(self, prompt):
+        self.started_at = asyncio.get_running_loop().time()
+        try:
+            await self.release.wait()
+            if self.fail:
+                raise RuntimeError("provider down")
+            for token in self.tokens:
+                yield token
+        finally:
+            self.closed = True
+
+
+def _streamer(*providers, delay=DELAY):
+    return HedgedStreamer(
+        [(f"p{i}", p) for i, p in enumerate(providers)],
+        default_delay=delay,
+        min_delay=delay,
+        max_delay=delay,
+    )
+
+
+async def _collect(stream):
+    return [token async for token in stream]
+
+
+def test_stream_hedge_fires_after_the_delay_and_the_loser_is_closed():
+    first = StubStream(("slow",))
+    second = StubStream(("fast", " reply"), wait=False)
+    streamer = _streamer(first, second)
+
+    assert asyncio.run(_collect(streamer("hi"))) == ["fast", " reply"]
+    assert second.started_at - first.started_at >= DELAY * 0.9
+    assert first.closed
+    assert streamer.hedges == 1
+    assert streamer.wins == {"p0": 0, "p1": 1}
+
+
+def test_stream_failure_before_first_token_fails_over_at_once():
+    first = StubStream(fail=True, wait=False)
+    second = StubStream(("second",), wait=False)
+    streamer = _streamer(first, second, delay=60)
+
+    tokens = asyncio.run(asyncio.wait_for(_collect(streamer("hi")), timeout=5))
+    assert tokens == ["second"]
+    assert streamer.hedges == 0
+
+
+def test_stream_all_providers_failing_raises():
+    streamer = _streamer(
+        StubStream(fail=True, wait=False), StubStream(tokens=(), wait=False)
+    )
+
+    with pytest.raises(RuntimeError, match="All LLM providers failed"):
+        asyncio.run(_collect(streamer("hi")))
+
+
+def test_closing_the_hedged_stream_closes_the_winner():
+    winner = StubStream(("one", "two", "three"), wait=False)
+    streamer = _streamer(winner, StubStream())
+
+    async def run():
+        stream = streamer("hi")
+        assert await stream.__anext__() == "one"
+        await stream.aclose()
+
+    asyncio.run(run())
+    assert winner.closed
@@ -0,0 +1,38 @@
+import asyncio
+
+from app.storage import history as history_module
+from app.storage.history import ConversationHistory
+from app.storage.models import Message
+
+
+def _history(path, n):
+    history = ConversationHistory(hot_window=4, spill_path=str(path))
+    for i in range(n):
+        history.append(Message(sender="scammer", text=str(i), timestamp=i))
+    return history
+
+
+def test_read_range_matches_slices_of_the_full_transcript(tmp_path):
+    history = _history(tmp_path / "s.jsonl", 11)
+
+    async def ranges():
+        full = [r.text for r in await history.read_full()]
+        return full, {
+            (start, end): [r.text for r in await history.read_range(start, end)]
+            for start in range(13)
+            for end in range(13)
+        }
+
+    full, ranges = asyncio.run(ranges())
+    assert full == [str(n) for n in range(11)]
+    for (start, end), texts in ranges.items():
+        assert texts == full[start:end], (start, end)
+
+
+def test_discard_drops_queued_spill_lines(tmp_path):
+    path = tmp_path / "s.jsonl"
+    history = _history(path, 50)
+    history.discard()
+    history_module._spill_writer.submit(lambda: None).result()
+
+    assert not path.exists()
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from fastapi import BackgroundTasks, HTTPException
+
+import app.api.deps as deps
+import app.api.honeypot as honeypot
+from app.core.admission import KeyedRateLimiter
+from app.storage.models import HoneypotBatchRequest
+
+
+def _item(session_id, n):
+    return {
+        "sessionId": session_id,
+        "message": {"sender": "scammer", "text": f"hello {n}", "timestamp": n},
+    }
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    calls = []
+
+    async def generate_response(session_data):
+        calls.append(session_data["allowLLM"]())
+        return "ok"
+
+    monkeypatch.setattr(
+        honeypot.conversation_agent, "generate_response", generate_response
+    )
+    monkeypatch.setattr(deps, "api_key_limiter", KeyedRateLimiter(1, 10))
+    monkeypatch.setattr(honeypot, "session_limiter", KeyedRateLimiter(1, 5))
+    return calls
+
+
+def _run(items):
+    batch = HoneypotBatchRequest(items=items)
+    return asyncio.run(
+        honeypot.honeypot_batch_endpoint(batch, BackgroundTasks(), "test-key")
+    )
+
+
+def test_batch_charges_the_key_per_item(agent):
+    _run([_item("batch-key", n) for n in range(8)])
+
+    assert deps.api_key_limiter._buckets["test-key"].tokens < 3
+    with pytest.raises(HTTPException) as e:
+        _run([_item("batch-key", n) for n in range(8, 12)])
+    assert e.value.status_code == 429
+
+
+def test_batch_charges_the_session_only_for_llm_turns(monkeypatch):
+    prompts = []
+
+    async def generate_text(prompt):
+        prompts.append(prompt)
+        return "Oh dear, which bank did you say this was?"
+
+    agent = honeypot.conversation_agent
+    monkeypatch.setattr(agent, "generate_text", generate_text)
+    monkeypatch.setattr(agent, "reply_cache", None)
+    monkeypatch.setattr(honeypot, "script_index", None)
+    monkeypatch.setattr(deps, "api_key_limiter", KeyedRateLimiter(1, 10))
+    monkeypatch.setattr(honeypot, "session_limiter", KeyedRateLimiter(0.001, 5))
+
+    response = _run([_item("batch-session", n) for n in range(8)])
+
+    assert [r.status for r in response.results] == ["success"] * 8
+    # Two early-naive turns are free; of the six LLM turns, five fit the
+    # session's burst and the sixth gets a fallback
+    assert len(prompts) == 5
+
+
+def test_batch_non_object_item_fails_alone(agent):
+    response = _run([_item("batch-mixed", 0), "not an item", 7])
+
+    assert [r.status for r in response.results] == ["success", "error", "error"]
+    assert "must be an object" in response.results[1].error
+
+
+def test_batch_detects_all_items_in_one_call(agent, monkeypatch):
+    batches = []
+
+    class Detector:
+        def detect_batch(self, texts):
+            batches.append(list(texts))
+            return [(True, ["bank_fraud"], 0.9)] * len(texts)
+
+        def detect_scam(self, text):
+            raise AssertionError("batch items must not be detected one by one")
+
+    monkeypatch.setattr(honeypot, "scam_detector", Detector())
+    monkeypatch.setattr(honeypot, "script_index", None)
+
+    response = _run(
+        [_item("batch-detect-a", 0), _item("batch-detect-b", 1), _item("batch-detect-a", 2)]
+    )
+
+    assert [r.status for r in response.results] == ["success"] * 3
+    assert batches == [["hello 0", "hello 1", "hello 2"]]
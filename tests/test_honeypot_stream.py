@@ -0,0 +1,74 @@
+import asyncio
+
+from fastapi import BackgroundTasks
+
+import app.api.honeypot as honeypot
+from app.core.ioc_index import ioc_index
+from app.core.session_manager import session_manager
+from app.storage.models import HoneypotRequest
+
+
+def test_disconnect_mid_stream_still_finishes_the_turn(monkeypatch):
+    async def stream_response(session_data):
+        yield "Which UPI "
+        yield "should I use? "
+        yield "Is it the same one?"
+
+    monkeypatch.setattr(honeypot.conversation_agent, "stream_response", stream_response)
+
+    payload = HoneypotRequest.model_validate({
+        "sessionId": "stream-disconnect",
+        "message": {
+            "sender": "scammer",
+            "text": (
+                "Your bank account will be blocked, verify your account "
+                "immediately and pay the fee to thief@ybl"
+            ),
+            "timestamp": 1,
+        },
+    })
+
+    async def run():
+        response = await honeypot.honeypot_stream_endpoint(payload, BackgroundTasks())
+        events = response.body_iterator
+        assert (await events.__anext__()).startswith("event: token")
+        # The client disconnects after the first token
+        await events.aclose()
+        await asyncio.gather(*honeypot._finishing)
+        return await session_manager.get("stream-disconnect")
+
+    session = asyncio.run(run())
+
+    assert "thief@ybl" in session.extractedIntelligence.upiIds
+    assert [m.sender for m in session.conversationHistory] == ["scammer", "agent"]
+    assert session.conversationHistory[-1].text == "Which UPI "
+    assert session.callbackQueued
+
+
+def test_agent_replies_stay_out_of_the_ioc_index(monkeypatch):
+    async def stream_response(session_data):
+        yield "Is it 9812345678 or helper@paytm? "
+
+    monkeypatch.setattr(honeypot.conversation_agent, "stream_response", stream_response)
+
+    payload = HoneypotRequest.model_validate({
+        "sessionId": "stream-reply-iocs",
+        "message": {
+            "sender": "scammer",
+            "text": "Your account will be blocked, pay the fee to crook@ybl now",
+            "timestamp": 1,
+        },
+    })
+
+    async def run():
+        response = await honeypot.honeypot_stream_endpoint(payload, BackgroundTasks())
+        return [event async for event in response.body_iterator]
+
+    asyncio.run(run())
+
+    def sessions(kind, value):
+        return [m["sessionId"] for m in ioc_index.lookup(kind, value)[1]]
+
+    assert sessions("upi", "crook@ybl") == ["stream-reply-iocs"]
+    assert sessions("upi", "helper@paytm") == []
+    assert sessions("phone", "9812345678") == []
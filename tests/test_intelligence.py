@@ -0,0 +1,139 @@
+import random
+import re
+
+import pytest
+
+import app.core.intelligence as intelligence
+from app.core.intelligence import (
+    SUSPICIOUS_KEYWORDS,
+    VALID_UPI_PROVIDERS,
+    IntelligenceExtractor,
+)
+from app.storage.models import Message, SessionState
+
+# The extractor's patterns before they were bounded
+LEGACY_IFSC = re.compile(r"\b[a-z]{4}0[a-z0-9]{6}\b")
+LEGACY_ACCOUNT = re.compile(
+    r"(?:account|a/c|acct|acc)\s*(?:no\.?|number|num|#)?\s*:?\s*(\d{9,18})"
+)
+LEGACY_UPI = re.compile(r"\b[\w\.-]+@[\w\.-]+\b")
+LEGACY_LINK = re.compile(
+    r"http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|"
+    r"[!*\\(\\),]|(?:%[0-9a-fA-F]{2}))+"
+)
+LEGACY_PHONE = re.compile(r"(?<!\d)\+?\d{10,13}(?!\d)")
+
+NORMAL_LINES = [
+    "Your bank account will be blocked today, verify immediately.",
+    "Send the OTP to 9876543210 to avoid suspension.",
+    "Call +919876543210 or 08041234567 now",
+    "Pay the refund fee to refund.desk@paytm right now.",
+    "UPI: ramesh.k-99@oksbi, or scan the QR",
+    "My email is john@gmail.com, not a upi id",
+    "Click https://secure-kyc-update.example.com/login?id=42&ref=sms to update KYC.",
+    "Visit http://bit.ly/3xYz_9 (fast) or https://www.incometax.gov.in/iec/",
+    "Transfer to account no: 123456789012, IFSC sbin0001234.",
+    "A/C number 00112233445566 with acct#987654321",
+    "Reset password here: https://login.example.com/reset?token=ab%20cd",
+    "Hi, are we still meeting for lunch tomorrow?",
+]
+
+
+def legacy_scan(text):
+    bank_accounts = set(LEGACY_IFSC.findall(text))
+    bank_accounts.update(LEGACY_ACCOUNT.findall(text))
+    return {
+        "bankAccounts": bank_accounts,
+        "upiIds": {
+            u for u in LEGACY_UPI.findall(text)
+            if any(p in u for p in VALID_UPI_PROVIDERS)
+        },
+        "phishingLinks": set(LEGACY_LINK.findall(text)),
+        "phoneNumbers": set(LEGACY_PHONE.findall(text)),
+        "suspiciousKeywords": {kw for kw in SUSPICIOUS_KEYWORDS if kw in text},
+    }
+
+
+def test_matches_legacy_extractor_on_normal_messages():
+    rng = random.Random(7)
+    corpus = list(NORMAL_LINES)
+    for _ in range(500):
+        parts = rng.sample(NORMAL_LINES, rng.randint(1, 4))
+        corpus.append(rng.choice((" ", "\n", " and ")).join(parts))
+
+    for text in corpus:
+        text = text.lower()
+        assert IntelligenceExtractor._scan(text) == legacy_scan(text), text
+
+
+@pytest.mark.parametrize(
+    "scanner",
+    [
+        intelligence._IFSC,
+        intelligence._ACCOUNT,
+        intelligence._UPI,
+        intelligence._LINK,
+        intelligence._PHONE,
+    ],
+)
+def test_chunked_scan_matches_whole_text_scan(scanner):
+    rng = random.Random(3)
+    tokens = [
+        "account no: ", "123456789012", " ", "a.b@ybl", "x-y", "http://",
+        "evil.com/a?b=1", "sbin0001234", "+919876543210", "\n", "@", "a/c ",
+    ]
+    for _ in range(200):
+        text = "".join(rng.choice(tokens) for _ in range(rng.randint(50, 300)))
+        chunk_chars = rng.randint(5, 60)
+        assert scanner.findall(text, chunk_chars) == scanner.regex.findall(text)
+
+
+def test_link_range_no_longer_swallows_angle_brackets():
+    found = IntelligenceExtractor._scan("see <http://evil.example/pay>")
+    assert found["phishingLinks"] == {"http://evil.example/pay"}
+
+
+def test_message_cap(monkeypatch):
+    monkeypatch.setattr(intelligence, "SCAN_MAX_MESSAGE_CHARS", 100)
+    session = SessionState(sessionId="s")
+    text = "pay to early@ybl " + "x" * 200 + " pay to late@ybl"
+    intel = IntelligenceExtractor.update(
+        session, [Message(sender="scammer", text=text, timestamp=0)]
+    )
+    assert intel.upiIds == ["early@ybl"]
+    assert session.scannedChars == 100
+
+
+def test_session_cap(monkeypatch):
+    monkeypatch.setattr(intelligence, "SCAN_MAX_SESSION_CHARS", 30)
+    session = SessionState(sessionId="s")
+    first = Message(sender="scammer", text="pay to first@ybl now", timestamp=0)
+    second = Message(sender="scammer", text="pay to second@ybl now", timestamp=1)
+    IntelligenceExtractor.update(session, [first])
+    intel = IntelligenceExtractor.update(session, [second])
+    # 20 chars of budget were spent on the first message, 10 are left
+    assert intel.upiIds == ["first@ybl"]
+    assert session.scannedChars == 30
+
+
+def test_agent_replies_do_not_use_the_session_budget(monkeypatch, caplog):
+    monkeypatch.setattr(intelligence, "SCAN_MAX_SESSION_CHARS", 30)
+    capped = intelligence.SCAN_CAPPED.value()
+    session = SessionState(sessionId="s")
+    reply = Message(sender="agent", text="x" * 100 + " is it agent@ybl?", timestamp=0)
+    scam = Message(sender="scammer", text="pay to first@ybl now", timestamp=1)
+    found = IntelligenceExtractor.update(session, [reply, scam])
+
+    assert session.scannedChars == len(scam.text)
+    assert {"agent@ybl", "first@ybl"} <= set(found.upiIds)
+    assert intelligence.SCAN_CAPPED.value() == capped
+
+    with caplog.at_level("INFO", logger="app.core.intelligence"):
+        later = Message(sender="scammer", text="and to second@ybl", timestamp=2)
+        last = Message(sender="scammer", text="or third@ybl", timestamp=3)
+        found = IntelligenceExtractor.update(session, [later, last])
+
+    assert session.scannedChars == 30
+    assert "third@ybl" not in found.upiIds
+    assert intelligence.SCAN_CAPPED.value() == capped + 1
+    assert "reached SCAN_MAX_SESSION_CHARS" in caplog.text
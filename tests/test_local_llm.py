@@ -0,0 +1,85 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.llm.providers.local_llm import MicroBatcher
+
+DELAY = 0.05
+
+
+class StubModel:
+    """Blocking batch_fn that records each batch and may hold it."""
+
+    def __init__(self):
+        self.batches = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, prompts):
+        self.batches.append(list(prompts))
+        self.release.wait(timeout=5)
+        return [f"reply to {prompt}" for prompt in prompts]
+
+
+def _run(batcher, main):
+    async def run():
+        try:
+            return await main()
+        finally:
+            await batcher.close()
+
+    return asyncio.run(run())
+
+
+def test_batches_respect_max_size_and_results_reach_their_callers():
+    model = StubModel()
+    batcher = MicroBatcher(model, max_batch=4, max_wait=DELAY)
+    prompts = [f"p{i}" for i in range(10)]
+
+    async def main():
+        return await asyncio.gather(*(batcher.submit(p) for p in prompts))
+
+    assert _run(batcher, main) == [f"reply to {p}" for p in prompts]
+    assert [len(batch) for batch in model.batches] == [4, 4, 2]
+    assert sorted(p for batch in model.batches for p in batch) == sorted(prompts)
+    assert batcher.stats()["meanBatchSize"] == pytest.approx(10 / 3)
+
+
+def test_partial_batch_waits_at_most_max_wait():
+    model = StubModel()
+    batcher = MicroBatcher(model, max_batch=8, max_wait=DELAY)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        first = asyncio.create_task(batcher.submit("first"))
+        await asyncio.sleep(DELAY / 5)
+        second = await batcher.submit("second")
+        return await first, second, loop.time() - started
+
+    first, second, elapsed = _run(batcher, main)
+    assert (first, second) == ("reply to first", "reply to second")
+    assert model.batches == [["first", "second"]]
+    # The loop may run a timer up to its clock resolution early
+    assert DELAY * 0.9 <= elapsed < 1
+
+
+def test_caller_times_out_and_a_queued_prompt_is_dropped():
+    model = StubModel()
+    model.release.clear()
+    batcher = MicroBatcher(model, max_batch=1, max_wait=0, timeout=DELAY)
+
+    async def main():
+        running = asyncio.create_task(batcher.submit("running"))
+        await asyncio.sleep(0)
+        with pytest.raises(RuntimeError, match="timeout"):
+            await batcher.submit("queued")
+        with pytest.raises(RuntimeError, match="timeout"):
+            await running
+        model.release.set()
+        # The worker is still free to serve the next caller
+        return await batcher.submit("next")
+
+    assert _run(batcher, main) == "reply to next"
+    assert model.batches == [["running"], ["next"]]
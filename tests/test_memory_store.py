@@ -0,0 +1,41 @@
+import asyncio
+
+from app.core.session_manager import SessionManager
+from app.storage.memory import InMemorySessionStore
+from app.storage.models import Message
+
+
+def _walked_bytes(store):
+    return sum(
+        session.conversationHistory.hot_bytes
+        for stripe in store._stripes
+        for session in stripe.sessions.values()
+    )
+
+
+def test_stats_counters_follow_inserts_and_evictions():
+    store = InMemorySessionStore(ttl_seconds=60)
+    manager = SessionManager(store)
+
+    async def run():
+        for n in range(150):
+            session = await manager.get_or_create(f"s{n % 5}")
+            await manager.add_message(
+                session, Message(sender="scammer", text="x" * n, timestamp=n)
+            )
+        checks = [(store.stats(), 5, _walked_bytes(store))]
+
+        exported = await store.export_sessions(["s0", "s1"])
+        await store.import_sessions(exported)
+        checks.append((store.stats(), 5, _walked_bytes(store)))
+
+        await store.remove_sessions(["s0", "s1"])
+        checks.append((store.stats(), 3, _walked_bytes(store)))
+
+        store._ttl = -1
+        store.sweep_expired()
+        checks.append((store.stats(), 0, 0))
+        return checks
+
+    for stats, sessions, history_bytes in asyncio.run(run()):
+        assert stats == {"sessions": sessions, "historyBytes": history_bytes}
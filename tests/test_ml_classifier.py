@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+import app.core.scam_detector as scam_detector_module
+from app.core.ml_classifier import (
+    HashedNgramVectorizer,
+    LinearScamClassifier,
+    train,
+)
+from app.core.scam_detector import ScamDetector, build_scam_detector
+
+EXAMPLES = [
+    ("Your bank account will be blocked, verify your KYC now", True, ["bank_fraud"]),
+    ("Send your OTP to unblock the account immediately", True, ["bank_fraud"]),
+    ("Pay the fee to my UPI id scammer@upi to claim the prize", True, ["upi_fraud"]),
+    ("You won a lottery, share your UPI PIN to receive it", True, ["upi_fraud"]),
+    ("Click http://kyc-update.example to avoid suspension", True, ["phishing"]),
+    ("Are we still meeting for lunch tomorrow?", False, []),
+    ("Thanks for the photos from the trip", False, []),
+    ("Can you pick up milk on the way home", False, []),
+]
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    texts, labels, categories = zip(*EXAMPLES)
+    return train(
+        texts * 10,
+        labels * 10,
+        categories * 10,
+        vectorizer=HashedNgramVectorizer(n_features=1 << 12),
+        epochs=10,
+    )
+
+
+def test_trained_model_separates_its_training_examples(classifier):
+    verdicts = classifier.detect_batch([text for text, _, _ in EXAMPLES])
+
+    assert [is_scam for is_scam, _, _ in verdicts] == [label for _, label, _ in EXAMPLES]
+    assert verdicts[0][1][0] == "bank_fraud"
+    assert classifier.categories == ["bank_fraud", "phishing", "upi_fraud"]
+
+
+def test_save_and_load_round_trip(classifier, tmp_path):
+    path = str(tmp_path / "model.npz")
+    classifier.save(path)
+    loaded = LinearScamClassifier.load(path)
+
+    assert loaded.categories == classifier.categories
+    assert loaded.vectorizer.n_features == classifier.vectorizer.n_features
+    assert loaded.vectorizer.char_ngrams == classifier.vectorizer.char_ngrams
+    assert loaded.vectorizer.word_ngrams == classifier.vectorizer.word_ngrams
+    texts = [text for text, _, _ in EXAMPLES]
+    # Weights are stored as float16
+    np.testing.assert_allclose(
+        loaded.predict_proba(texts), classifier.predict_proba(texts), atol=1e-3
+    )
+    assert [v[:2] for v in loaded.detect_batch(texts)] == [
+        v[:2] for v in classifier.detect_batch(texts)
+    ]
+
+
+def test_empty_batch(classifier):
+    assert classifier.detect_batch([]) == []
+
+
+def test_detect_scam_agrees_with_detect_batch(classifier):
+    texts = [text for text, _, _ in EXAMPLES] + ["", "  ", "ünïcödé ₹500 नमस्ते"]
+    batch = classifier.detect_batch(texts)
+
+    for text, (is_scam, categories, confidence) in zip(texts, batch):
+        single = classifier.detect_scam(text)
+        assert single[:2] == (is_scam, categories)
+        assert single[2] == pytest.approx(confidence, abs=1e-6)
+
+
+def test_build_scam_detector_selects_the_model(classifier, tmp_path, monkeypatch):
+    path = str(tmp_path / "model.npz")
+    classifier.save(path)
+    monkeypatch.setattr(scam_detector_module, "SCAM_CLASSIFIER", "ml")
+    monkeypatch.setattr(scam_detector_module, "SCAM_MODEL_PATH", path)
+
+    detector = build_scam_detector()
+    assert isinstance(detector, LinearScamClassifier)
+    assert detector.categories == classifier.categories
+
+    # A missing model falls back to the rules
+    monkeypatch.setattr(scam_detector_module, "SCAM_MODEL_PATH", str(tmp_path / "none.npz"))
+    assert isinstance(build_scam_detector(), ScamDetector)
+
+    monkeypatch.setattr(scam_detector_module, "SCAM_CLASSIFIER", "rules")
+    assert isinstance(build_scam_detector(), ScamDetector)
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+import app.services.outbox as outbox_module
+from app.services.outbox import (
+    BACKOFF_BASE_SECONDS,
+    BACKOFF_MAX_SECONDS,
+    MAX_ATTEMPTS,
+    CallbackOutbox,
+    OutboxWorker,
+)
+from app.utils.metrics import CALLBACKS
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    outbox = CallbackOutbox(str(tmp_path / "outbox.db"))
+    yield outbox
+    outbox.close()
+
+
+def _payload(session_id):
+    return {"sessionId": session_id, "scamDetected": True}
+
+
+def test_enqueue_is_idempotent_per_session(outbox):
+    outbox.enqueue(_payload("s1"))
+    outbox.enqueue({**_payload("s1"), "scamDetected": False})
+
+    assert outbox.due() == [("s1", _payload("s1"), 0)]
+    assert outbox.pending_count() == 1
+
+
+def test_failed_attempts_back_off_exponentially(outbox, monkeypatch):
+    monkeypatch.setattr(outbox_module.random, "uniform", lambda low, high: high)
+    outbox.enqueue(_payload("s1"))
+
+    for attempts in range(12):
+        before = outbox_module.time.time()
+        outbox.mark_failed("s1", attempts, "boom")
+        row = outbox.export_pending(["s1"])["s1"]
+        delay = min(BACKOFF_BASE_SECONDS * 2 ** attempts, BACKOFF_MAX_SECONDS)
+        assert row["attempts"] == attempts + 1
+        assert before + delay <= row["nextAttemptAt"] <= before + delay + 5
+        assert outbox.due() == []
+
+
+def test_row_is_abandoned_at_max_attempts(outbox, monkeypatch):
+    outbox.enqueue(_payload("s1"))
+    outbox.import_pending({
+        "s1": {
+            "payload": _payload("s1"),
+            "attempts": MAX_ATTEMPTS - 1,
+            "nextAttemptAt": 0,
+            "createdAt": 0,
+        }
+    })
+    abandoned = CALLBACKS.value(result="abandoned")
+
+    async def deliver(payload):
+        return False
+
+    assert asyncio.run(OutboxWorker(outbox, deliver=deliver).drain_once()) == 1
+    assert CALLBACKS.value(result="abandoned") == abandoned + 1
+    assert outbox.pending_count() == 0
+
+    # Never retried, however long we wait
+    monkeypatch.setattr(outbox_module.time, "time", lambda: 1e12)
+    assert outbox.due() == []
+
+
+def test_on_delivered_runs_only_for_confirmed_deliveries(outbox):
+    for session_id in ("ok", "refused", "raised", "truthy"):
+        outbox.enqueue(_payload(session_id))
+    outcomes = {"ok": True, "refused": False, "raised": RuntimeError("down"), "truthy": 1}
+
+    async def deliver(payload):
+        outcome = outcomes[payload["sessionId"]]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    delivered = []
+
+    async def on_delivered(session_id):
+        delivered.append(session_id)
+
+    worker = OutboxWorker(outbox, on_delivered=on_delivered, deliver=deliver)
+    assert asyncio.run(worker.drain_once()) == 4
+
+    assert delivered == ["ok"]
+    assert outbox.pending_count() == 3
+    assert sorted(outbox.export_pending(["ok", "refused", "raised", "truthy"])) == [
+        "raised", "refused", "truthy",
+    ]
+
+
+def test_rows_survive_reopening_the_database(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    first = CallbackOutbox(path)
+    first.enqueue(_payload("pending"))
+    first.enqueue(_payload("done"))
+    first.mark_delivered("done")
+    first.close()
+
+    reopened = CallbackOutbox(path)
+    try:
+        assert reopened.due() == [("pending", _payload("pending"), 0)]
+        assert reopened.pending_count() == 1
+    finally:
+        reopened.close()
+
+
+def test_prune_deletes_old_delivered_and_abandoned_rows(outbox, monkeypatch):
+    for session_id in ("pending", "delivered", "abandoned"):
+        outbox.enqueue(_payload(session_id))
+    outbox.mark_delivered("delivered")
+    outbox.mark_failed("abandoned", MAX_ATTEMPTS - 1, "boom")
+
+    assert outbox.prune(retention_seconds=3600) == 0
+
+    now = outbox_module.time.time()
+    monkeypatch.setattr(outbox_module.time, "time", lambda: now + 7200)
+    assert outbox.prune(retention_seconds=3600) == 2
+    assert outbox.due() == [("pending", _payload("pending"), 0)]
+    assert outbox.pending_count() == 1
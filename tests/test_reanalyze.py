@@ -0,0 +1,33 @@
+import json
+import os
+
+from app.tools import reanalyze
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "transcripts.jsonl")
+
+
+def test_cli_rescores_transcripts_like_the_api(tmp_path, capsys):
+    output = tmp_path / "rescored.jsonl"
+    reanalyze.main([FIXTURE, "-o", str(output), "--workers", "1", "--chunk-lines", "2"])
+
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [r.get("sessionId") for r in results] == ["scam", "split", "chat", None]
+
+    scam, split, chat, broken = results
+    assert scam["scamDetected"]
+    assert scam["detectedAtMessage"] == 2
+    assert scam["upiIds"] == ["kyc.desk@ybl"]
+
+    # The API scans each message on its own, so an account number in
+    # the message after "account" is not picked up
+    assert split["bankAccounts"] == []
+    assert split["messages"] == 2
+
+    assert not chat["scamDetected"]
+    assert chat["detectedAtMessage"] is None
+
+    assert broken["error"].startswith("JSONDecodeError")
+    assert "done: 4 conversations (1 errors)" in capsys.readouterr().err
+    assert json.loads((tmp_path / "rescored.jsonl.checkpoint").read_text())[
+        "offset"
+    ] == os.path.getsize(FIXTURE)
@@ -0,0 +1,69 @@
+import asyncio
+
+import fakeredis
+
+from app.storage.models import Message
+from app.storage.redis import RedisSessionStore
+
+
+def _store():
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    return RedisSessionStore("redis://unused", ttl_seconds=60, client=client)
+
+
+def test_save_does_not_reset_callback_sent():
+    store = _store()
+
+    async def run():
+        session = await store.get_or_create("s")
+        session.callbackQueued = True
+        await store.save(session)
+
+        # The outbox worker confirms delivery while a turn holds an old copy
+        await store.set_fields("s", callbackSent=True)
+        assert not session.callbackSent
+        await store.save(session)
+
+        return await store.get("s")
+
+    assert asyncio.run(run()).callbackSent
+
+
+def test_message_counter_survives_stale_save():
+    store = _store()
+
+    async def run():
+        first = await store.get_or_create("s")
+        second = await store.get("s")
+        message = Message(sender="scammer", text="hi", timestamp=1)
+        first.conversationHistory.append(message)
+        await store.append_messages(first, [message])
+        await store.save(second)
+        return await store.get("s")
+
+    session = asyncio.run(run())
+    assert session.totalMessagesExchanged == 1
+    assert [m.text for m in session.conversationHistory] == ["hi"]
+
+
+def test_load_history_range_reads_only_the_range():
+    store = _store()
+
+    async def run():
+        session = await store.get_or_create("s")
+        messages = [
+            Message(sender="scammer", text=str(n), timestamp=n) for n in range(10)
+        ]
+        for message in messages:
+            session.conversationHistory.append(message)
+        await store.append_messages(session, messages)
+        return (
+            await store.load_history_range("s", 3, 7),
+            await store.load_history_range("s", 8, 20),
+            await store.load_history_range("s", 5, 5),
+        )
+
+    middle, tail, empty = asyncio.run(run())
+    assert [m.text for m in middle] == ["3", "4", "5", "6"]
+    assert [m.text for m in tail] == ["8", "9"]
+    assert empty == []
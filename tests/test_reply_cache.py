@@ -0,0 +1,89 @@
+import pytest
+
+import app.llm.reply_cache as reply_cache_module
+from app.llm.reply_cache import ReplyCache, conversation_fingerprint
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(reply_cache_module.time, "monotonic", clock)
+    return clock
+
+
+def _cache(**options):
+    return ReplyCache(**{"explore_probability": 0.0, **options})
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = _cache(max_entries=2)
+    cache.put("a", "reply a")
+    cache.put("b", "reply b")
+    assert cache.get("a") == "reply a"
+
+    cache.put("c", "reply c")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "reply a"
+    assert cache.get("c") == "reply c"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = _cache(ttl_seconds=60)
+    cache.put("a", "reply")
+
+    clock.now = 59
+    assert cache.get("a") == "reply"
+    clock.now = 60
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_variants_are_capped_and_oldest_is_replaced(clock):
+    cache = _cache(max_variants=2)
+    for reply in ("one", "two", "two", "three"):
+        cache.put("a", reply)
+
+    assert {cache.get("a") for _ in range(50)} == {"two", "three"}
+
+
+def test_explore_probability_misses_only_while_short_of_variants(clock, monkeypatch):
+    cache = ReplyCache(max_variants=2, explore_probability=0.5)
+    cache.put("a", "one")
+
+    monkeypatch.setattr(reply_cache_module.random, "random", lambda: 0.4)
+    assert cache.get("a") is None
+    monkeypatch.setattr(reply_cache_module.random, "random", lambda: 0.6)
+    assert cache.get("a") == "one"
+
+    cache.put("a", "two")
+    monkeypatch.setattr(reply_cache_module.random, "random", lambda: 0.0)
+    assert cache.get("a") in {"one", "two"}
+
+
+def test_fingerprint_keys_on_the_last_scammer_turns():
+    def key(*texts):
+        history = [
+            {"sender": "agent" if text.startswith("agent") else "scammer", "text": text}
+            for text in texts
+        ]
+        return conversation_fingerprint("p", ["upi"], history, 2)
+
+    hello, blocked, share = "hello sir", "account blocked", "share the code"
+    base = key(hello, "agent a", blocked, "agent b", share)
+
+    # Agent replies in between don't change the key
+    assert base == key(blocked, "agent x", "agent y", share, "agent z")
+    # Neither do scammer turns older than last_n
+    assert base == key("send otp", blocked, share)
+    assert base != key(hello, share)
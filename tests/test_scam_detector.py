@@ -0,0 +1,27 @@
+import random
+import re
+
+from app.core.scam_detector import ScamDetector
+
+
+def test_linear_matching_agrees_with_regex():
+    detector = ScamDetector()
+    rng = random.Random(1)
+    tokens = [
+        "bank account", "block", "verify", "account", "\n", "http://", "https://",
+        "x.gov", ".bank", "kyc", "update", " ", "here", "link", "click", "upi", "id",
+    ]
+    for _ in range(5000):
+        text = "".join(rng.choice(tokens) for _ in range(rng.randint(0, 12)))
+        for _, patterns in detector._compiled:
+            for pattern in patterns:
+                expected = re.search(pattern.regex.pattern, text) is not None
+                assert pattern.search(text) == expected, (pattern.regex.pattern, text)
+
+
+def test_link_lookahead_uses_last_link_on_the_line():
+    detector = ScamDetector()
+    _, categories, _ = detector.detect_scam("http://a.example then https://b.gov")
+    assert "phishing" not in categories
+    _, categories, _ = detector.detect_scam("https://b.gov\nhttp://a.example")
+    assert "phishing" in categories
@@ -0,0 +1,63 @@
+import asyncio
+
+import app.api.honeypot as honeypot
+from app.core.script_index import ScriptIndex
+from app.storage.models import HoneypotRequest
+
+BENIGN = (
+    "Dear customer your savings account statement for this month "
+    "is ready please check"
+)
+PHISHING = BENIGN + " please click link http://sbi-verify.co"
+
+
+def _turn(session_id, text):
+    payload = HoneypotRequest.model_validate({
+        "sessionId": session_id,
+        "message": {"sender": "scammer", "text": text, "timestamp": 1},
+    })
+    return asyncio.run(honeypot._begin_turn(payload))
+
+
+def test_variants_match_one_script():
+    index = ScriptIndex()
+    base = (
+        "Dear customer your SBI account will be blocked today please update "
+        "your KYC by clicking the link and share OTP with our officer Rahul"
+    )
+    script = index.observe(base)
+    assert index.observe(base.replace("Rahul", "Amit")) is script
+    assert index.observe(base.replace("SBI", "HDFC")) is script
+    assert index.observe("are we still meeting for lunch tomorrow at noon") is not script
+    assert index.observe("ok thanks") is None
+
+
+def test_benign_verdict_is_not_reused_for_phishing_variant(monkeypatch):
+    monkeypatch.setattr(honeypot, "script_index", ScriptIndex())
+
+    session, script = _turn("benign-script", BENIGN)
+    assert not session.scamDetected
+    assert script.verdict is None
+
+    session, variant = _turn("phishing-variant", PHISHING)
+    assert variant is script
+    assert session.scamDetected
+    assert "phishing" in session.scamCategories
+    assert script.verdict[0]
+
+
+def test_scam_verdict_is_reused(monkeypatch):
+    monkeypatch.setattr(honeypot, "script_index", ScriptIndex())
+    calls = []
+    detect = honeypot.scam_detector.detect_scam
+
+    def counting_detect(text):
+        calls.append(text)
+        return detect(text)
+
+    monkeypatch.setattr(honeypot.scam_detector, "detect_scam", counting_detect)
+
+    _turn("scam-a", PHISHING)
+    session, _ = _turn("scam-b", PHISHING.replace("savings", "current"))
+    assert session.scamDetected
+    assert len(calls) == 1
@@ -0,0 +1,30 @@
+import asyncio
+
+from app.llm.providers import hugging_face, local_llm
+from app.llm.providers.hedged import build_streamer
+
+
+async def _collect(stream):
+    return [token async for token in stream]
+
+
+def test_local_provider_streams_one_generate_text_call(monkeypatch):
+    prompts = []
+
+    async def generate_text(prompt):
+        prompts.append(prompt)
+        return "I am not sure, which bank is this?"
+
+    async def hosted_stream(prompt, **kwargs):
+        raise AssertionError("must not call the hosted provider")
+        yield
+
+    monkeypatch.setattr(local_llm, "generate_text", generate_text)
+    monkeypatch.setattr(hugging_face, "stream_text", hosted_stream)
+
+    stream_text = build_streamer(["local"])
+
+    assert asyncio.run(_collect(stream_text("hi"))) == [
+        "I am not sure, which bank is this?"
+    ]
+    assert prompts == ["hi"]